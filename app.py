@@ -1,66 +1,49 @@
+import os
+import logging
 from flask import Flask
-from flask_cors import CORS
-from routes.recommendations import recommendation
-from routes.chatbot import chatbot
-
-app = Flask(__name__)
-
-# Configure CORS for the entire app
-CORS(app, resources={
-    r"/api/*": {
-        "origins": ["*"],  # Allow any origin
-        
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
-        "supports_credentials": True,
-        "max_age": 3600
-    }
-})
-
-# Apply CORS to the recommendation blueprint
-CORS(recommendation, origins="*", supports_credentials=True)
-
-# Register blueprints
-app.register_blueprint(recommendation)
-app.register_blueprint(chatbot)
+from lib import log
 
-if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5050, debug=True)
+# Structured JSON logs written by a background thread; see lib/log.py for the LOG_* settings.
+# Configured before the routes are imported so model loading is logged the same way.
+log.configure_logging()
 
-import os
-import logging
+from routes.recommendations import recommendation
+from routes.chatbot import chatbot
+from routes.profile import profile
+from lib import metrics
+from lib import profiling
+from lib import compression
+from lib import json_provider
+from lib import cors
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Configure CORS to allow requests from any origin with proper preflight handling
-CORS(app, 
-     resources={r"/*": {
-         "origins": "*", 
-         "methods": ["GET", "POST", "OPTIONS"],
-         "allow_headers": ["Content-Type", "Authorization"]
-     }},
-     supports_credentials=True)
+# orjson-backed jsonify when orjson is installed
+json_provider.init_app(app)
 
-logger.info("CORS configured successfully")
+# Request IDs for every log line, echoed back in X-Request-ID
+log.init_app(app)
 
-# Add a route to handle OPTIONS requests explicitly
-@app.route('/', defaults={'path': ''}, methods=['OPTIONS'])
-@app.route('/<path:path>', methods=['OPTIONS'])
-def handle_options(path):
-    return '', 200
+# Preflights are answered ahead of routing with a long Access-Control-Max-Age; see lib/cors.py for the CORS_* settings
+cors.init_app(app)
 
 app.register_blueprint(recommendation)
 app.register_blueprint(chatbot)
+app.register_blueprint(profile)
 
 logger.info("Blueprints registered successfully")
 
+# Per-route latency histograms, status counts and in-flight requests, served at /metrics
+metrics.init_app(app)
+
+# Stack-sampling profiles of admin requests sent with X-Profile: 1 (or PROFILE_SAMPLE_RATE of all requests)
+profiling.init_app(app)
+
+# br/gzip for JSON and text bodies above COMPRESSION_MIN_SIZE; catalog payloads are precompressed
+compression.init_app(app)
+
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 8080))
     logger.info(f"Starting server on port {port}")
@@ -0,0 +1,146 @@
+"""
+Local stand-in for the AI service and the recommender-ai modules, for load tests.
+
+``AIStub`` serves the HTTP endpoints the backend calls (``/predict`` and
+``/career-details``) and ``install_ai_modules`` puts in-process replacements
+for the recommender-ai imports into ``sys.modules``. Both share the stub's
+injected latency and error rate, so a run can model a slow or flaky AI
+service without touching the real one.
+"""
+import json
+import random
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CAREERS = ["Software Engineer", "Data Scientist", "Doctor", "Teacher", "Lawyer", "Nurse",
+           "Architect", "Accountant", "Pharmacist", "Civil Engineer"]
+
+
+class StubError(Exception):
+    """Raised by the in-process AI modules when an error is injected."""
+
+
+class AIStub:
+    """Fake AI service with ``latency_ms`` (+/- ``jitter_ms``) per call and an ``error_rate``."""
+
+    def __init__(self, latency_ms=20.0, jitter_ms=5.0, error_rate=0.0, seed=0, host="127.0.0.1", port=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ai-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def call(self):
+        """Sleep for the injected latency; returns False when this call should fail."""
+        with self._lock:
+            self.calls += 1
+            delay = max(self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms), 0.0)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        time.sleep(delay / 1000.0)
+        return not failed
+
+    def check(self):
+        """``call`` for in-process modules: raises StubError on an injected failure."""
+        if not self.call():
+            raise StubError("Injected AI failure")
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not stub.call():
+                    return self._send(503, {"error": "Injected AI failure"})
+                if self.path.endswith("/predict"):
+                    scores = [v for v in body.values() if isinstance(v, (int, float))]
+                    return self._send(200, {"career": CAREERS[int(sum(scores)) % len(CAREERS)]})
+                if self.path.endswith("/career-details"):
+                    career = body.get("career", "Unknown")
+                    return self._send(200, {"career": career, "description": f"About {career}.", "success": True})
+                return self._send(404, {"error": "Not found"})
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def install_ai_modules(stub):
+    """Register stand-ins for the recommender-ai modules the routes import."""
+
+    class CareerChatbot:
+        def recommend(self, gpa, career):
+            stub.check()
+            return ["University A", "University B"], [c for c in CAREERS if c != career][:3]
+
+    def handle_chat(message, career, gpa, subject_grades, session_id):
+        stub.check()
+        return f"Advice for {career or 'you'}: keep building skills."
+
+    def handle_chat_stream(message, career, gpa, subject_grades, session_id):
+        stub.check()
+        for word in handle_chat(message, career, gpa, subject_grades, session_id).split(" "):
+            yield word + " "
+
+    def generate_career_roadmap(career, subject_grades, gpa):
+        stub.check()
+        return {"success": True, "data": {"career": career, "steps": ["Study", "Intern", "Apply"]}}
+
+    class UniversitySummaryGenerator:
+        def generate_summary(self, university_name, additional_info):
+            stub.check()
+            return {key: f"{university_name} {key}" for key in
+                    ("overview", "academic_programs", "campus_life", "achievements", "unique_features")}
+
+    class AlternativeCareersAnalyzer:
+        def analyze_career_match(self, career, academic_scores, predicted_career):
+            stub.check()
+            return {"matching_score": len(career) * 7 % 100, "explanation": "Stub analysis", "key_skills": ["x"]}
+
+    modules = {
+        "chatbot": {"CareerChatbot": CareerChatbot},
+        "gpt_chatbot": {"handle_chat": handle_chat, "handle_chat_stream": handle_chat_stream},
+        "career_roadmap": {"generate_career_roadmap": generate_career_roadmap},
+        "university_summaries": {"university_summary_generator": UniversitySummaryGenerator()},
+        "alternative_careers": {"AlternativeCareersAnalyzer": AlternativeCareersAnalyzer},
+    }
+    for name, attributes in modules.items():
+        module = types.ModuleType(name)
+        module.__dict__.update(attributes)
+        sys.modules[name] = module
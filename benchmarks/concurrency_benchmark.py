@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Compare how many upstream-bound requests one gunicorn worker serves at once
+with the sync, gthread and gevent worker classes.
+
+Starts the AI service stub with a fixed latency. Then, for each worker
+class, it runs gunicorn with this repo's gunicorn.conf.py and a single
+worker, serving benchmarks/stub_app.py (app:app with the recommender-ai
+modules stubbed at the same latency). It fires --concurrency simultaneous
+requests at /api/predict (forwarded to the AI service) and /api/chat (the GPT
+stand-in).
+
+    python benchmarks/concurrency_benchmark.py
+    python benchmarks/concurrency_benchmark.py --latency-ms 1000 --concurrency 300 --worker-classes sync,gevent
+
+A sync worker finishes about 1000 / latency-ms requests per second, whatever
+the concurrency. A gevent worker overlaps the waits, so its throughput grows
+with concurrency until the CPU is busy. "upstream in flight" is the average
+number of requests the worker had waiting on the AI service (throughput x
+latency). Needs gunicorn, and gevent for the gevent run.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from benchmarks.ai_stub import AIStub
+from benchmarks.load_test import random_scores, run_scenario
+
+SCENARIOS = {
+    "predict": ("POST", "/api/predict", random_scores),
+    "chat": ("POST", "/api/chat", lambda rng: {"message": f"What should I study? #{rng.random()}", "career": "Doctor"}),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(worker_class, args, stub, workdir):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        WEB_CONCURRENCY="1",
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_THREADS=str(args.threads if worker_class == "gthread" else 1),
+        GUNICORN_WORKER_CONNECTIONS=str(max(args.concurrency, 100)),
+        AI_SERVICE_URL=f"{stub.url}/predict",
+        AI_STUB_LATENCY_MS=str(args.latency_ms),
+        # No local model, so every prediction is a call to the AI service
+        INFERENCE_ROUTE="remote",
+        MODEL_HOT_RELOAD="false",
+        GENERATION_CACHE_PATH=os.path.join(workdir, f"{worker_class}-generation_cache.sqlite3"),
+        PERSISTENCE_BACKEND="none",
+        CHAT_SESSION_PERSIST="false",
+        LOG_LEVEL="WARNING",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(ROOT, "gunicorn.conf.py"),
+         "--bind", f"127.0.0.1:{port}", "--timeout", "300", "benchmarks.stub_app:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn ({worker_class}) exited with {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/api/ready", timeout=1).status_code == 200:
+                return process, base_url
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"gunicorn ({worker_class}) did not become ready")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--worker-classes', default="sync,gthread,gevent")
+    parser.add_argument('--threads', type=int, default=8, help="threads per gthread worker")
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=400, help="requests per route")
+    parser.add_argument('--latency-ms', type=float, default=500.0, help="AI service latency per call")
+    parser.add_argument('--routes', default=",".join(SCENARIOS))
+    args = parser.parse_args(argv)
+
+    stub = AIStub(latency_ms=args.latency_ms, jitter_ms=0.0).start()
+    print(f"AI stub at {stub.url}, {args.latency_ms:.0f}ms per call; "
+          f"{args.requests} requests per route at concurrency {args.concurrency}, one worker\n")
+    print(f"{'worker':<10}{'route':<10}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}{'upstream in flight':>20}")
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for worker_class in args.worker_classes.split(","):
+                try:
+                    process, base_url = start_server(worker_class, args, stub, workdir)
+                except RuntimeError as e:
+                    print(f"{worker_class:<10}skipped: {str(e)}")
+                    continue
+                try:
+                    for route in args.routes.split(","):
+                        result = run_scenario(base_url, SCENARIOS[route], args.requests, args.concurrency, seed=0)
+                        in_flight = result["rps"] * args.latency_ms / 1000.0
+                        print(f"{worker_class:<10}{route:<10}{result['rps']:>8.1f}{result['p50_ms']:>10.0f}"
+                              f"{result['p95_ms']:>10.0f}{result['errors']:>8}{in_flight:>20.1f}")
+                finally:
+                    process.terminate()
+                    process.wait(timeout=30)
+    finally:
+        stub.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
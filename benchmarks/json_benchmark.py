@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Measure what JSON encoding and response compression cost per endpoint.
+
+Imports the app with the recommender-ai modules replaced by
+benchmarks/ai_stub.py and a small local model. It takes one real response
+body from each load-test route that returns JSON, then reports:
+
+- the time to serialize that payload with Flask's default provider and
+  with lib/json_provider.OrjsonProvider
+- the bytes on the wire as identity, gzip and br (brotli only when
+  installed), using the per-request levels from lib/compression.py
+
+    python benchmarks/json_benchmark.py
+    python benchmarks/json_benchmark.py --iterations 5000 --routes predict_batch,careers
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from benchmarks.ai_stub import AIStub
+from benchmarks.load_test import ADMIN_TOKEN, SCENARIOS, install_ai_modules, write_model_artifacts
+
+# Streams, mutations and the Prometheus text are not JSON payloads worth timing
+SKIPPED = {"chat_stream", "admin_models_reload", "admin_prediction_cache_clear", "metrics"}
+
+
+def load_app(stub, workdir):
+    model_dir = os.path.join(workdir, "models")
+    os.makedirs(model_dir)
+    write_model_artifacts(model_dir)
+    os.environ.update({
+        "AI_SERVICE_URL": f"{stub.url}/predict",
+        "AI_CAREER_DETAILS_URL": f"{stub.url}/career-details",
+        "GENERATION_CACHE_PATH": os.path.join(workdir, "generation_cache.sqlite3"),
+        "ADMIN_TOKEN": ADMIN_TOKEN,
+        "PERSISTENCE_BACKEND": "none",
+        "CHAT_SESSION_PERSIST": "false",
+        "MODEL_HOT_RELOAD": "false",
+        "MODEL_DIR": model_dir,
+        "LOG_LEVEL": "WARNING",
+    })
+    install_ai_modules(stub)
+    from app import app
+    return app
+
+
+def sample_payload(client, scenario, rng):
+    method, path, build_body = scenario
+    response = client.open(
+        path(rng) if callable(path) else path, method=method, json=build_body(rng) if build_body else None,
+        headers={"X-Admin-Token": ADMIN_TOKEN, "Accept-Encoding": "identity"}
+    )
+    if response.mimetype != "application/json":
+        return None
+    return response.get_json()
+
+
+def time_per_call_us(fn, payload, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(payload)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000, help="serializations per provider and route")
+    parser.add_argument('--routes', default=",".join(name for name in SCENARIOS if name not in SKIPPED))
+    args = parser.parse_args(argv)
+
+    from flask.json.provider import DefaultJSONProvider
+    from lib import compression
+    from lib.json_provider import OrjsonProvider, orjson
+
+    stub = AIStub(latency_ms=0.0, jitter_ms=0.0).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            app = load_app(stub, workdir)
+            client = app.test_client()
+            rng = random.Random(0)
+            payloads = {}
+            for name in args.routes.split(","):
+                payload = sample_payload(client, SCENARIOS[name], rng)
+                if payload is not None:
+                    payloads[name] = payload
+    finally:
+        stub.stop()
+
+    default = DefaultJSONProvider(app)
+    fast = OrjsonProvider(app) if orjson is not None else None
+    codings = compression.available_codings()
+    if fast is None:
+        print("orjson is not installed; only the default provider is timed")
+    print(f"{args.iterations} serializations per route; sizes use gzip level {compression.COMPRESSION_GZIP_LEVEL}"
+          f" and brotli quality {compression.COMPRESSION_BROTLI_QUALITY}\n")
+
+    header = f"{'route':<30}{'json us':>9}{'orjson us':>11}{'speedup':>9}{'identity B':>12}"
+    print(header + "".join(f"{coding + ' B':>10}" for coding in reversed(codings)))
+    for name, payload in payloads.items():
+        json_us = time_per_call_us(default.dumps, payload, args.iterations)
+        line = f"{name:<30}{json_us:>9.1f}"
+        if fast is not None:
+            orjson_us = time_per_call_us(fast.dumps, payload, args.iterations)
+            line += f"{orjson_us:>11.1f}{json_us / orjson_us:>8.1f}x"
+        else:
+            line += f"{'-':>11}{'-':>9}"
+        body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        line += f"{len(body):>12}"
+        line += "".join(f"{len(compression.compress(body, coding)):>10}" for coding in reversed(codings))
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Load test every blueprint route against a local AI-service stub.
+
+Starts the app on a local port with the recommender-ai modules and the AI
+HTTP service replaced by benchmarks/ai_stub.py, then drives each route in
+turn at the given concurrency. Records p50/p95/p99 latency, throughput,
+error counts and process RSS. Results are compared with a JSON baseline,
+and the run fails if p50/p95 latency, throughput or RSS regress past
+--threshold.
+
+    python benchmarks/load_test.py                      # compare with benchmarks/baseline.json
+    python benchmarks/load_test.py --update-baseline    # record a new baseline
+    python benchmarks/load_test.py --latency-ms 200 --error-rate 0.05 --routes predict,chat
+    python run_tests.py --benchmark --concurrency 16    # same, via the test runner
+
+Baselines are machine-specific: record one on the machine you compare on.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from benchmarks.ai_stub import AIStub, CAREERS, install_ai_modules
+from lib.models import rss_mb
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+ADMIN_TOKEN = 'load-test'
+FEATURES = ['math_score', 'history_score', 'physics_score', 'chemistry_score',
+            'biology_score', 'english_score', 'geography_score']
+
+
+def random_scores(rng):
+    return {feature: rng.randint(40, 100) for feature in FEATURES}
+
+
+# name -> (method, path, body builder taking a random.Random); bodies vary so caches do not answer everything
+SCENARIOS = {
+    "predict": ("POST", "/api/predict", random_scores),
+    "predict_top_k": ("POST", "/api/predict?top_k=3", random_scores),
+    "predict_batch": ("POST", "/api/predict/batch", lambda rng: {"records": [random_scores(rng) for _ in range(50)]}),
+    "ready": ("GET", "/api/ready", None),
+    "batching_stats": ("GET", "/api/predict/batching-stats", None),
+    "admin_models": ("GET", "/api/admin/models", None),
+    "admin_models_reload": ("POST", "/api/admin/models/reload", None),
+    "admin_prediction_cache": ("GET", "/api/admin/prediction-cache", None),
+    "admin_prediction_cache_clear": ("POST", "/api/admin/prediction-cache/clear", None),
+    "careers": ("GET", "/api/careers", None),
+    "career": ("GET", lambda rng: f"/api/careers/{rng.choice(CAREERS)}", None),
+    "career_details": ("POST", "/api/career-details", lambda rng: {"career": rng.choice(CAREERS)}),
+    "career_roadmap": ("POST", "/api/career-roadmap", lambda rng: {"career": rng.choice(CAREERS)}),
+    "analyze_careers": ("POST", "/api/analyze-careers", lambda rng: {
+        "careers": rng.sample(CAREERS, 3), "academic_scores": random_scores(rng), "predicted_career": rng.choice(CAREERS)
+    }),
+    "chatbot_recommend": ("POST", "/api/chatbot-recommend", lambda rng: {
+        "gpa": round(rng.uniform(2.0, 4.0), 2), "career": rng.choice(CAREERS)
+    }),
+    "chat": ("POST", "/api/chat", lambda rng: {
+        "message": "What should I study?", "career": rng.choice(CAREERS), "session_id": f"bench-{rng.randint(0, 99)}"
+    }),
+    "chat_stream": ("POST", "/api/chat", lambda rng: {
+        "message": "What should I study?", "career": rng.choice(CAREERS), "stream": True
+    }),
+    "chat_history": ("GET", lambda rng: f"/api/chat/history/bench-{rng.randint(0, 99)}", None),
+    "university_summary": ("POST", "/api/university-summary", lambda rng: {
+        "university_name": f"University {rng.randint(0, 999)}"
+    }),
+    "career_profile": ("POST", "/api/career-profile", lambda rng: {
+        "scores": random_scores(rng), "gpa": round(rng.uniform(2.0, 4.0), 2)
+    }),
+}
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(math.ceil(p / 100.0 * len(sorted_values)) - 1, 0))]
+
+
+def write_model_artifacts(directory, seed=0):
+    """Train a small model so the local inference routes have something to serve."""
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+    rng = np.random.RandomState(seed)
+    X = pd.DataFrame(rng.uniform(40, 100, size=(2000, len(FEATURES))), columns=FEATURES)
+    careers = np.array(CAREERS)[(X.values.sum(axis=1) * 7).astype(int) % len(CAREERS)]
+    scaler = StandardScaler().fit(X)
+    label_encoder = LabelEncoder().fit(careers)
+    model = RandomForestClassifier(n_estimators=50, max_depth=8, random_state=seed)
+    model.fit(scaler.transform(X), label_encoder.transform(careers))
+    joblib.dump(model, os.path.join(directory, "career_xgb.pkl"))
+    joblib.dump(scaler, os.path.join(directory, "scaler.pkl"))
+    joblib.dump(label_encoder, os.path.join(directory, "label_encoder.pkl"))
+
+
+def start_app(stub, workdir, local_model):
+    """Configure the environment for the stub, import the app and serve it on a free port."""
+    os.environ.update({
+        "AI_SERVICE_URL": f"{stub.url}/predict",
+        "AI_CAREER_DETAILS_URL": f"{stub.url}/career-details",
+        "GENERATION_CACHE_PATH": os.path.join(workdir, "generation_cache.sqlite3"),
+        "ADMIN_TOKEN": ADMIN_TOKEN,
+        "PERSISTENCE_BACKEND": "none",
+        "CHAT_SESSION_PERSIST": "false",
+        "MODEL_HOT_RELOAD": "false",
+    })
+    if local_model:
+        model_dir = os.path.join(workdir, "models")
+        os.makedirs(model_dir)
+        write_model_artifacts(model_dir)
+        os.environ["MODEL_DIR"] = model_dir
+    install_ai_modules(stub)
+
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="load-test-app", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def run_scenario(base_url, scenario, total, concurrency, seed):
+    method, path, build_body = scenario
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    # next() on itertools.count is atomic under the GIL, so workers can share it
+    counter = itertools.count()
+
+    def worker(worker_id):
+        nonlocal errors
+        session = requests.Session()
+        session.headers["X-Admin-Token"] = ADMIN_TOKEN
+        rng = random.Random(seed * 1000 + worker_id)
+        while next(counter) < total:
+            url = base_url + (path(rng) if callable(path) else path)
+            body = build_body(rng) if build_body else None
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, json=body, timeout=120)
+                failed = response.status_code >= 500
+            except requests.exceptions.RequestException:
+                failed = True
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            with lock:
+                latencies.append(elapsed_ms)
+                errors += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "rps": round(len(latencies) / wall, 1),
+        "rss_mb": rss_mb()
+    }
+
+
+def compare(results, baseline, threshold, slack_ms):
+    """Regressions of ``results`` against ``baseline``, as human-readable strings."""
+    failures = []
+    for name, current in results["routes"].items():
+        previous = baseline.get("routes", {}).get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            # Absolute slack keeps sub-millisecond routes from failing on noise
+            limit = previous[metric] * (1 + threshold) + slack_ms
+            if current[metric] > limit:
+                failures.append(f"{name}: {metric} {current[metric]} > {round(limit, 3)} (baseline {previous[metric]})")
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            failures.append(f"{name}: rps {current['rps']} < baseline {previous['rps']} - {threshold:.0%}")
+        if current["errors"] > previous["errors"] + max(1, previous["requests"] * 0.01):
+            failures.append(f"{name}: errors {current['errors']} (baseline {previous['errors']})")
+    if baseline.get("rss_mb") and results.get("rss_mb") and results["rss_mb"] > baseline["rss_mb"] * (1 + threshold):
+        failures.append(f"rss_mb {results['rss_mb']} > baseline {baseline['rss_mb']} + {threshold:.0%}")
+    return failures
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="requests per route")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="injected AI latency per call")
+    parser.add_argument('--jitter-ms', type=float, default=5.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of AI calls that fail")
+    parser.add_argument('--routes', help="comma-separated scenario names (default: all)")
+    parser.add_argument('--no-local-model', action='store_true', help="serve predictions only through the stub")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help="write results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed regression, 0.25 = 25%%")
+    parser.add_argument('--slack-ms', type=float, default=2.0)
+    parser.add_argument('--output', help="also write results to this JSON file")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="keep the app's request logging")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = args.routes.split(",") if args.routes else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown routes: {', '.join(unknown)}. Choose from: {', '.join(SCENARIOS)}")
+        return 2
+
+    config = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "local_model": not args.no_local_model,
+    }
+    stub = AIStub(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed).start()
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+
+    routes = {}
+    with quiet:
+        server, base_url = start_app(stub, workdir, config["local_model"])
+        for name in names:
+            routes[name] = run_scenario(base_url, SCENARIOS[name], args.requests, args.concurrency, args.seed)
+        server.shutdown()
+    stub.stop()
+
+    results = {
+        "config": config,
+        "routes": routes,
+        "rss_mb": max((r["rss_mb"] for r in routes.values() if r["rss_mb"] is not None), default=None),
+        "ai_calls": stub.calls,
+        "ai_errors": stub.errors,
+    }
+
+    print(f"{'route':<30}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errors':>8}")
+    for name, r in routes.items():
+        print(f"{name:<30}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['rps']:>10.1f}{r['errors']:>8}")
+    print(f"RSS {results['rss_mb']}MB, AI stub calls {stub.calls} ({stub.errors} failed)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("config") != config:
+        print(f"⚠️ Baseline was recorded with {baseline.get('config')}; comparisons may not be meaningful")
+    failures = compare(results, baseline, args.threshold, args.slack_ms)
+    for failure in failures:
+        print(f"❌ Regression: {failure}")
+    if not failures:
+        print("✅ No regressions against the baseline")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
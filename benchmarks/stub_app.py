@@ -0,0 +1,18 @@
+"""
+WSGI entry point serving ``app:app`` with the recommender-ai modules replaced
+by the in-process stubs from benchmarks/ai_stub.py, for benchmarks that run
+the app under gunicorn:
+
+    AI_STUB_LATENCY_MS=500 gunicorn benchmarks.stub_app:app
+"""
+import os
+
+from benchmarks.ai_stub import AIStub, install_ai_modules
+
+install_ai_modules(AIStub(
+    latency_ms=float(os.getenv('AI_STUB_LATENCY_MS', '500')),
+    jitter_ms=float(os.getenv('AI_STUB_JITTER_MS', '0')),
+    error_rate=float(os.getenv('AI_STUB_ERROR_RATE', '0'))
+))
+
+from app import app  # noqa: E402
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Compare the native tree engine with the scikit-learn/XGBoost prediction path.
+
+Uses the real artifacts when --model-dir points at a directory holding
+career_xgb.pkl, scaler.pkl and label_encoder.pkl; otherwise trains a
+synthetic model with the same shape (7 scores, a few dozen careers).
+
+    python benchmarks/tree_engine_benchmark.py --model-dir recommender-models
+"""
+import argparse
+import os
+import pickle
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lib.models import load_artifacts
+from lib.tree_engine import TreeEnsemble
+
+FEATURES = ['math_score', 'history_score', 'physics_score', 'chemistry_score',
+            'biology_score', 'english_score', 'geography_score']
+
+
+def synthetic_model(n_rows=5000, n_careers=30, seed=0):
+    """A boosted model shaped like career_xgb.pkl, trained on random scores."""
+    from sklearn.preprocessing import StandardScaler
+    rng = np.random.RandomState(seed)
+    X = pd.DataFrame(rng.uniform(40, 100, size=(n_rows, len(FEATURES))), columns=FEATURES)
+    y = (X.values @ rng.uniform(-1, 1, size=len(FEATURES))).argsort().argsort() * n_careers // n_rows
+    scaler = StandardScaler().fit(X)
+    try:
+        from xgboost import XGBClassifier
+        model = XGBClassifier(n_estimators=100, max_depth=6, random_state=seed)
+    except ImportError:
+        from sklearn.ensemble import RandomForestClassifier
+        print("xgboost is not installed; benchmarking a random forest instead")
+        model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=seed)
+    model.fit(scaler.transform(X), y)
+    return model, scaler, X.values
+
+
+def library_predict(model, scaler, rows):
+    # Same steps as routes.recommendations.predict_matrix without the engine
+    features = pd.DataFrame(np.asarray(rows, dtype=float), columns=FEATURES)
+    return model.predict(scaler.transform(features))
+
+
+def latency(fn, rows, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 4),
+        "mean_ms": round(statistics.fmean(samples), 4)
+    }
+
+
+def peak_alloc_kb(fn, rows):
+    tracemalloc.start()
+    fn(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 1024.0, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-dir', help="directory with career_xgb.pkl, scaler.pkl and label_encoder.pkl")
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.model_dir:
+        model, scaler, _, version, _ = load_artifacts(args.model_dir)
+        rng = np.random.RandomState(0)
+        data = rng.uniform(40, 100, size=(5000, len(FEATURES)))
+        print(f"Model {version} from {args.model_dir}")
+    else:
+        model, scaler, data = synthetic_model()
+
+    start = time.perf_counter()
+    engine = TreeEnsemble.from_model(model, scaler)
+    convert_ms = (time.perf_counter() - start) * 1000.0
+    print(f"Converted in {convert_ms:.1f}ms: {engine.stats()}")
+
+    expected = library_predict(model, scaler, data)
+    actual = engine.predict(data)
+    mismatches = int(np.sum(np.asarray(expected) != actual))
+    print(f"Agreement on {len(data)} rows: {len(data) - mismatches}/{len(data)}")
+
+    paths = {
+        "library": lambda rows: library_predict(model, scaler, rows),
+        "native": engine.predict
+    }
+    single = data[:1]
+    batch = data[:args.batch_size]
+    print(f"\n{'path':<10}{'1 row p50':>12}{'1 row p95':>12}{f'{len(batch)} rows p50':>16}{'peak KB/call':>14}")
+    for name, fn in paths.items():
+        one = latency(fn, single, args.repeat)
+        many = latency(fn, batch, max(args.repeat // 20, 5))
+        print(f"{name:<10}{one['p50_ms']:>10.3f}ms{one['p95_ms']:>10.3f}ms{many['p50_ms']:>14.3f}ms"
+              f"{peak_alloc_kb(fn, single):>14}")
+
+    pickled_kb = len(pickle.dumps((model, scaler))) / 1024.0
+    print(f"\nModel + scaler pickled: {pickled_kb:.1f}KB, native arrays: {engine.nbytes / 1024.0:.1f}KB")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
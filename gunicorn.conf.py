@@ -0,0 +1,39 @@
+import gc
+import os
+
+# Picked up automatically by `gunicorn app:app` from the working directory
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+
+# "sync" handles one request per worker at a time. "gthread" runs GUNICORN_THREADS
+# per worker. "gevent" makes every socket wait (the AI service, GPT chats,
+# Supabase) yield to other requests, so one worker holds up to
+# GUNICORN_WORKER_CONNECTIONS in-flight requests without any handler changes.
+# gevent is optional: pip install -r gevent-requirements.txt
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '500'))
+
+if worker_class == 'gevent':
+    # Patch before the app is preloaded below: requests/urllib3, the locks in
+    # lib/ and the background threads must all be created gevent-aware, which
+    # the gevent worker's own patching after fork would be too late for
+    from gevent import monkey
+    monkey.patch_all()
+    # Keep-alive connections per upstream; sized for the in-flight requests
+    os.environ.setdefault('UPSTREAM_POOL_SIZE', str(worker_connections))
+
+# Import the app (and load the models) once in the master so forked workers
+# share the model pages copy-on-write instead of each deserializing a copy
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the GC's reach, so collections in
+    # the workers do not touch (and un-share) the preloaded objects' pages
+    if preload_app:
+        gc.freeze()
+
+def post_fork(server, worker):
+    from lib.models import rss_mb
+    server.log.info(f"Worker {worker.pid} started, RSS {rss_mb()}MB")
@@ -0,0 +1,25 @@
+import hmac
+import os
+from functools import wraps
+
+from flask import request, jsonify
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+def is_admin_request():
+    """True if the request carries the configured X-Admin-Token header."""
+    token = request.headers.get('X-Admin-Token', '')
+    # compare_digest refuses non-ASCII str, so compare the UTF-8 bytes
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+def admin_required(view):
+    """Reject requests to ``view`` that do not carry a valid X-Admin-Token."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "Admin endpoints are disabled"}), 403
+        if not is_admin_request():
+            return jsonify({"error": "Invalid admin token"}), 401
+        return view(*args, **kwargs)
+    return wrapper
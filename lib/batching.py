@@ -0,0 +1,85 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Collects single-row inference requests and runs them as one batch.
+
+    Callers block in ``submit`` while a background thread gathers rows until
+    ``max_batch_size`` is reached or ``max_wait_ms`` has passed since the first
+    row arrived, then calls ``predict_fn`` once with the whole batch.
+    ``predict_fn`` takes a list of rows and returns one result per row.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "errors": 0,
+            "max_batch_size_seen": 0,
+            "max_queue_depth_seen": 0,
+        }
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, row, timeout=None):
+        """Queue one row and wait for its result."""
+        future = Future()
+        self._queue.put((row, future))
+        depth = self._queue.qsize()
+        with self._lock:
+            if depth > self._stats["max_queue_depth_seen"]:
+                self._stats["max_queue_depth_seen"] = depth
+        return future.result(timeout=timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_batch_size"] = round(stats["items"] / stats["batches"], 2) if stats["batches"] else 0
+        stats["max_batch_size"] = self.max_batch_size
+        stats["max_wait_ms"] = self.max_wait * 1000.0
+        return stats
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = [row for row, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                results = list(self.predict_fn(rows))
+                # zip would leave the extra futures unresolved until their callers time out
+                if len(results) != len(futures):
+                    raise ValueError(f"predict_fn returned {len(results)} results for {len(futures)} rows")
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                for future in futures:
+                    future.set_exception(e)
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["items"] += len(batch)
+                if len(batch) > self._stats["max_batch_size_seen"]:
+                    self._stats["max_batch_size_seen"] = len(batch)
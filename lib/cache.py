@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Returned by get() on a miss so that None can be cached as a value
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries also expire after ``ttl`` seconds.
+
+    ``max_size`` caps the number of entries; the least recently used entry is
+    evicted first. A ``ttl`` of None keeps entries until they are evicted.
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            cleared = len(self._data)
+            self._data.clear()
+        return cleared
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SWRCache:
+    """Stale-while-revalidate cache with single-flight loading.
+
+    Entries younger than ``ttl`` are served as-is. Entries up to
+    ``ttl + stale_ttl`` old are served immediately while one background
+    refresh runs. Concurrent misses for the same key share a single
+    ``loader()`` call. Loader errors are never cached; a failed background
+    refresh keeps serving the stale value. ``cacheable(value)`` can veto
+    storing a loaded value.
+    """
+
+    def __init__(self, ttl, stale_ttl, max_size=1024, refresh_workers=2, cacheable=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.cacheable = cacheable or (lambda value: True)
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="swr-refresh")
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "errors": 0,
+            "evictions": 0,
+        }
+
+    def get_or_load(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, loaded_at = entry
+                age = now - loaded_at
+                if age < self.ttl:
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self._data.move_to_end(key)
+                    self._stats["stale_hits"] += 1
+                    if key not in self._inflight:
+                        self._stats["refreshes"] += 1
+                        self._inflight[key] = self._executor.submit(self._load, key, loader)
+                    return value
+                del self._data[key]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self._stats["misses"] += 1
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+
+        # This thread owns the load; waiters block on the same future
+        try:
+            future.set_result(self._load(key, loader))
+        except Exception as e:
+            future.set_exception(e)
+        return future.result()
+
+    def _load(self, key, loader):
+        # A raising cacheable() counts as a loader error, so the in-flight entry is always removed
+        try:
+            value = loader()
+            store = self.cacheable(value)
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+                self._inflight.pop(key, None)
+            raise
+        with self._lock:
+            if store:
+                self._data[key] = (value, time.monotonic())
+                self._data.move_to_end(key)
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+                    self._stats["evictions"] += 1
+            self._inflight.pop(key, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            cleared = len(self._data)
+            self._data.clear()
+        return cleared
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._data)
+            stats["inflight"] = len(self._inflight)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
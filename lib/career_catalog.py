@@ -0,0 +1,305 @@
+import hashlib
+import json
+
+from lib.compression import precompress
+
+# Career details served by /api/career-details and /api/careers
+CAREER_DETAILS = {
+    "Software Engineer": {
+        "description": "Designs, develops, and maintains software systems and applications.",
+        "skills": ["Programming", "Problem Solving", "Algorithms", "Data Structures"],
+        "salary_range": "$70,000 - $150,000",
+        "education": "Bachelor's degree in Computer Science or related field",
+        "difficulty": 7,
+        "job_outlook": "Excellent growth projected over the next decade with increasing demand for software solutions.",
+        "day_to_day": "Writing code, debugging, attending meetings, collaborating with team members, and testing applications.",
+        "advancement": "Can progress to senior developer, technical lead, architect, or management roles.",
+        "work_life_balance": {
+            "rating": 7,
+            "explanation": "Generally good balance, though may require occasional overtime during project deadlines."
+        },
+        "pros": ["High demand", "Good compensation", "Remote work options", "Creative problem solving"],
+        "cons": ["Can be stressful during deadlines", "Requires continuous learning", "Some positions have long hours"]
+    },
+    "Data Scientist": {
+        "description": "Analyzes and interprets complex data to help organizations make better decisions.",
+        "skills": ["Statistics", "Machine Learning", "Python/R", "Data Visualization"],
+        "salary_range": "$90,000 - $160,000",
+        "education": "Master's or PhD in Statistics, Computer Science, or related field",
+        "difficulty": 8,
+        "job_outlook": "Strong growth expected as businesses increasingly rely on data-driven decision making.",
+        "day_to_day": "Analyzing data, building models, creating visualizations, presenting findings to stakeholders.",
+        "advancement": "Can advance to senior data scientist, lead data scientist, or management positions.",
+        "work_life_balance": {
+            "rating": 8,
+            "explanation": "Generally good work-life balance with flexible hours in many organizations."
+        },
+        "pros": ["Intellectually stimulating", "High demand", "Good compensation", "Opportunity to make business impact"],
+        "cons": ["Requires extensive education", "Can be challenging to explain complex concepts", "May involve cleaning messy data"]
+    },
+    "Doctor": {
+        "description": "Diagnoses and treats illnesses and injuries.",
+        "skills": ["Medical Knowledge", "Diagnostic Skills", "Patient Care", "Communication"],
+        "salary_range": "$150,000 - $300,000+",
+        "education": "Medical Doctor (MD) degree and residency",
+        "difficulty": 9,
+        "job_outlook": "Consistent demand with growth in specialized fields and aging population needs.",
+        "day_to_day": "Patient consultations, diagnoses, treatments, record-keeping, continuing education.",
+        "advancement": "Can specialize in various fields, become a department head, or open a private practice.",
+        "work_life_balance": {
+            "rating": 5,
+            "explanation": "Often challenging with long hours, especially during residency and for certain specialties."
+        },
+        "pros": ["Respected profession", "High compensation", "Opportunity to help others", "Job security"],
+        "cons": ["Long training period", "High stress", "Long hours", "High stakes decisions"]
+    },
+    "Lawyer": {
+        "description": "Provides legal advice and representation to individuals and organizations.",
+        "skills": ["Legal Research", "Negotiation", "Analytical Thinking", "Communication"],
+        "salary_range": "$70,000 - $200,000+",
+        "education": "Juris Doctor (JD) degree",
+        "difficulty": 8,
+        "job_outlook": "Steady demand with growth in areas like intellectual property and healthcare law.",
+        "day_to_day": "Client meetings, legal research, drafting documents, negotiations, court appearances.",
+        "advancement": "Can become a partner in a firm, specialize in a legal area, or become a judge.",
+        "work_life_balance": {
+            "rating": 6,
+            "explanation": "Often demanding hours, especially in large firms, though some specialties offer better balance."
+        },
+        "pros": ["Intellectually challenging", "Potential for high income", "Prestigious career", "Opportunity to help others"],
+        "cons": ["Long hours", "High stress", "Competitive field", "Extensive education requirements"]
+    },
+    "Architect": {
+        "description": "Designs buildings and structures, creating plans and specifications.",
+        "skills": ["Design", "Spatial Reasoning", "Technical Drawing", "Project Management"],
+        "salary_range": "$60,000 - $130,000",
+        "education": "Bachelor's or Master's degree in Architecture",
+        "difficulty": 7,
+        "job_outlook": "Moderate growth tied to construction industry trends and economic conditions.",
+        "day_to_day": "Creating designs, drafting plans, meeting with clients, coordinating with engineers and contractors.",
+        "advancement": "Can progress to senior architect, partner, or start own firm.",
+        "work_life_balance": {
+            "rating": 7,
+            "explanation": "Generally reasonable hours, though deadlines can require occasional overtime."
+        },
+        "pros": ["Creative expression", "Seeing designs become reality", "Varied projects", "Blend of art and science"],
+        "cons": ["Long education and licensure process", "Affected by economic cycles", "Competitive field"]
+    },
+    "Teacher": {
+        "description": "Educates students in various subjects and helps them develop knowledge and skills.",
+        "skills": ["Communication", "Patience", "Organization", "Subject Expertise"],
+        "salary_range": "$40,000 - $90,000",
+        "education": "Bachelor's degree in Education or subject area",
+        "difficulty": 7,
+        "job_outlook": "Stable demand with regional variations; growing need in STEM subjects.",
+        "day_to_day": "Lesson planning, teaching classes, grading assignments, meeting with students and parents.",
+        "advancement": "Can become department head, administrator, curriculum developer, or educational consultant.",
+        "work_life_balance": {
+            "rating": 7,
+            "explanation": "Regular schedule with summers off, though often involves after-hours work grading and planning."
+        },
+        "pros": ["Making a difference in students' lives", "Job security", "Regular schedule", "Breaks during the year"],
+        "cons": ["Can be emotionally demanding", "Moderate compensation", "Administrative challenges", "Need to handle difficult classroom situations"]
+    },
+    "Accountant": {
+        "description": "Prepares and examines financial records and ensures accuracy of financial operations.",
+        "skills": ["Mathematics", "Attention to Detail", "Financial Analysis", "Organization"],
+        "salary_range": "$50,000 - $110,000",
+        "education": "Bachelor's degree in Accounting or Finance",
+        "difficulty": 7,
+        "job_outlook": "Stable demand with consistent need for financial expertise in all sectors.",
+        "day_to_day": "Analyzing financial data, preparing reports, ensuring regulatory compliance, auditing records.",
+        "advancement": "Can progress to senior accountant, controller, financial manager, or partner in a firm.",
+        "work_life_balance": {
+            "rating": 6,
+            "explanation": "Generally good, though tax season can be demanding with long hours."
+        },
+        "pros": ["Job stability", "Clear career path", "Variety of industries to work in", "Analytical work"],
+        "cons": ["Seasonal workload fluctuations", "Keeping up with changing regulations", "Can be repetitive"]
+    },
+    "Mechanical Engineer": {
+        "description": "Designs, develops, and tests mechanical devices and systems.",
+        "skills": ["Mathematics", "CAD Software", "Problem Solving", "Technical Knowledge"],
+        "salary_range": "$65,000 - $120,000",
+        "education": "Bachelor's degree in Mechanical Engineering",
+        "difficulty": 8,
+        "job_outlook": "Steady demand across manufacturing, automotive, aerospace, and energy sectors.",
+        "day_to_day": "Designing mechanical systems, testing prototypes, analyzing test data, collaborating with other engineers.",
+        "advancement": "Can become senior engineer, engineering manager, or technical specialist.",
+        "work_life_balance": {
+            "rating": 7,
+            "explanation": "Generally good balance with standard hours, though project deadlines may require overtime."
+        },
+        "pros": ["Problem-solving challenges", "Tangible results", "Diverse applications", "Good compensation"],
+        "cons": ["Requires continuous learning", "Complex problems", "Manufacturing jobs may be affected by economic cycles"]
+    }
+}
+
+# Other names for catalog careers, resolved by lib.career_index before any lookup
+CAREER_ALIASES = {
+    "Software Developer": "Software Engineer",
+    "Programmer": "Software Engineer",
+    "Computer Programmer": "Software Engineer",
+    "Coder": "Software Engineer",
+    "Machine Learning Engineer": "Data Scientist",
+    "Physician": "Doctor",
+    "Medical Doctor": "Doctor",
+    "Medicine": "Doctor",
+    "Attorney": "Lawyer",
+    "Law": "Lawyer",
+    "Solicitor": "Lawyer",
+    "Barrister": "Lawyer",
+    "Educator": "Teacher",
+    "Education": "Teacher",
+    "Schoolteacher": "Teacher",
+    "Bookkeeper": "Accountant",
+    "Mechanical Engineering": "Mechanical Engineer",
+}
+
+# Generic details for any career not in the hardcoded list
+GENERIC_DETAILS_TEMPLATE = {
+    "description": "Professional in the field of {career}.",
+    "skills": ["Relevant technical skills", "Communication", "Problem solving"],
+    "salary_range": "Varies based on experience and location",
+    "education": "Related degree or certification",
+    "difficulty": 7,
+    "job_outlook": "Varies by region and economic conditions.",
+    "day_to_day": "Performing tasks related to the profession, collaborating with colleagues, and developing expertise.",
+    "advancement": "Career progression typically involves gaining expertise and taking on more responsibility.",
+    "work_life_balance": {
+        "rating": 7,
+        "explanation": "Balance varies depending on employer and specific role."
+    },
+    "pros": ["Career growth opportunities", "Professional development", "Applying specialized knowledge"],
+    "cons": ["May require continued education", "Competitive job market", "Industry-specific challenges"]
+}
+
+# Simple roadmap returned by /api/career-roadmap; {career} is filled in per request
+ROADMAP_TEMPLATE = {
+    "short-term goals": [
+        "Complete a bachelor's degree in a field related to {career}",
+        "Take relevant courses and gain foundational knowledge",
+        "Build a portfolio of projects or work samples"
+    ],
+    "mid-term goals": [
+        "Obtain entry-level position in the field",
+        "Develop specialization in a particular area",
+        "Build professional network through industry events"
+    ],
+    "long-term goals": [
+        "Advance to senior-level positions",
+        "Become a subject matter expert",
+        "Consider leadership or management roles"
+    ],
+    "education requirements": [
+        "Bachelor's degree in {career} or related field",
+        "Relevant certifications",
+        "Continuing education to stay current"
+    ],
+    "skills to develop": [
+        "Technical skills specific to the field",
+        "Communication and teamwork",
+        "Problem-solving and critical thinking"
+    ],
+    "experience needed": [
+        "Entry-level positions or internships",
+        "Volunteer work in related areas",
+        "Collaborative projects"
+    ],
+    "industry certifications": [
+        "Professional certifications relevant to the field",
+        "Specialized training programs",
+        "Online courses and workshops"
+    ],
+    "personal development recommendations": [
+        "Develop time management skills",
+        "Work on presentation and public speaking",
+        "Build resilience and adaptability"
+    ],
+    "networking suggestions": [
+        "Join professional associations",
+        "Attend industry conferences",
+        "Connect with professionals on LinkedIn"
+    ],
+    "milestones and checkpoints": [
+        "First year: Complete foundational education",
+        "3-5 years: Gain specialized experience",
+        "5-10 years: Move into advanced roles"
+    ]
+}
+
+
+def encode(payload):
+    """Serialize a payload to compact UTF-8 JSON bytes."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def make_etag(body):
+    """Strong ETag for an encoded body."""
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+class EncodedTemplate:
+    """A JSON payload encoded once, with ``{career}`` filled in per request.
+
+    Substitution happens on the encoded text, so a request costs one string
+    replace instead of rebuilding and re-serializing the nested dict.
+    """
+
+    PLACEHOLDER = "{career}"
+
+    def __init__(self, payload):
+        self._text = encode(payload).decode("utf-8")
+
+    def render(self, career):
+        # Escape the career name exactly as the JSON encoder would, minus the quotes
+        escaped = json.dumps(career, ensure_ascii=False)[1:-1]
+        return self._text.replace(self.PLACEHOLDER, escaped).encode("utf-8")
+
+
+class CareerCatalog:
+    """Career details and roadmaps pre-encoded once at startup.
+
+    Each known career maps to ``(body, etag)`` so handlers can write the bytes
+    straight to the response and answer conditional requests without
+    touching the payload. Bodies large enough to compress are also
+    precompressed for every content coding.
+    """
+
+    def __init__(self, details, generic_template, roadmap_template):
+        self.details = details
+        self._entries = {}
+        for career, payload in details.items():
+            body = encode(payload)
+            self._entries[career] = (body, make_etag(body))
+        index_body = encode({"careers": details})
+        self._index = (index_body, make_etag(index_body))
+        # Static bodies are compressed once here rather than on every response
+        for body, etag in list(self._entries.values()) + [self._index]:
+            precompress(body, etag)
+        self._generic = EncodedTemplate(generic_template)
+        self._roadmap = EncodedTemplate({"success": True, "data": roadmap_template})
+
+    def __contains__(self, career):
+        return career in self._entries
+
+    def names(self):
+        return list(self._entries)
+
+    def index(self):
+        """Encoded body and ETag for the whole catalog."""
+        return self._index
+
+    def details_for(self, career):
+        """Encoded details body and ETag, falling back to the generic template."""
+        entry = self._entries.get(career)
+        if entry is not None:
+            return entry
+        body = self._generic.render(career)
+        return body, make_etag(body)
+
+    def roadmap_for(self, career):
+        """Encoded ``{"success": true, "data": roadmap}`` body for a career."""
+        return self._roadmap.render(career)
+
+
+career_catalog = CareerCatalog(CAREER_DETAILS, GENERIC_DETAILS_TEMPLATE, ROADMAP_TEMPLATE)
@@ -0,0 +1,213 @@
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from lib.cache import MISSING, TTLCache
+from lib.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Minimum similarity (0-1) for a fuzzy match; below it the name is passed through as given
+CAREER_MATCH_THRESHOLD = float(os.getenv('CAREER_MATCH_THRESHOLD', '0.75'))
+# Fuzzy candidates (by shared trigrams) that are also scored by edit distance
+CAREER_MATCH_CANDIDATES = 5
+# Distinct spellings whose resolution is remembered
+CAREER_MATCH_CACHE_SIZE = int(os.getenv('CAREER_MATCH_CACHE_SIZE', '4096'))
+
+resolutions = registry.counter(
+    "career_name_resolutions_total", "Career names resolved to a canonical career, by how they matched.", ("method",))
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Occupation and field suffixes, longest first, so "teaching"/"teachers" and "pharmacy"/"pharmacist" share a stem
+_SUFFIXES = ("istry", "ical", "ists", "ance", "ence", "ants", "ures", "ism", "ist", "ics", "ing",
+             "ers", "ors", "ant", "ure", "ies", "er", "or", "ic", "ce", "es", "y", "s", "e")
+
+
+def normalize(name):
+    """Casefolded ASCII words separated by single spaces: " Software-Engineer " -> "software engineer"."""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii").casefold()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def stem_word(word):
+    for suffix in _SUFFIXES:
+        # "-eer" is part of the word (engineer, volunteer), not an agent suffix
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4 and not (suffix == "er" and word.endswith("eer")):
+            return word[:-len(suffix)]
+    return word
+
+
+def stem(key):
+    """A normalized name with each word's suffix stripped: "civil engineering" -> "civil engineer"."""
+    return " ".join(stem_word(word) for word in key.split())
+
+
+def trigrams(text):
+    padded = f" {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or ``limit + 1`` as soon as it is known to exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class CareerIndex:
+    """Maps free-text career names to canonical ones.
+
+    Lookup goes from cheapest to most expensive: exact name, then
+    normalized name, then alias, then stem ("teaching" -> "Teacher"), then
+    fuzzy. Fuzzy lookup uses an inverted index to collect the names and
+    aliases whose stems share character trigrams with the query's stem. It
+    scores them by trigram overlap (Dice), counts a name within one edit
+    per six characters as a typo, and accepts the best one at or above
+    ``threshold``. That catches "data science" for "Data Scientist" and
+    typos like "docter". ``resolve`` returns ``(canonical or None, method)``.
+    """
+
+    def __init__(self, names, aliases=None, threshold=CAREER_MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._exact = {}
+        self._normalized = {}
+        for name in names:
+            name = str(name)
+            self._exact.setdefault(name, name)
+            self._normalized.setdefault(normalize(name), name)
+        self._aliases = {}
+        for alias, name in (aliases or {}).items():
+            canonical = self._exact.get(name)
+            if canonical is None:
+                logger.warning("Career alias points at an unknown career", extra={"alias": alias, "career": name})
+                continue
+            self._aliases.setdefault(normalize(alias), canonical)
+        # Stems shared by different careers ("engineer" alone) are ambiguous and left out
+        self._stems = {}
+        for key, canonical in list(self._aliases.items()) + list(self._normalized.items()):
+            stemmed = stem(key)
+            if self._stems.setdefault(stemmed, canonical) != canonical:
+                self._stems[stemmed] = None
+        self._stems = {stemmed: canonical for stemmed, canonical in self._stems.items() if canonical is not None}
+        # Fuzzy keys are every normalized name and alias, indexed by the trigrams of their stems
+        self._keys = {**self._aliases, **self._normalized}
+        self._grams = {key: trigrams(stem(key)) for key in self._keys}
+        self._sizes = {key: sum(grams.values()) for key, grams in self._grams.items()}
+        self._postings = {}
+        for key, grams in self._grams.items():
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(key)
+
+    def __len__(self):
+        return len(self._exact)
+
+    def __contains__(self, name):
+        return name in self._exact
+
+    def names(self):
+        return list(self._exact)
+
+    def resolve(self, name):
+        canonical = self._exact.get(name)
+        if canonical is not None:
+            return canonical, "exact"
+        key = normalize(name)
+        if not key:
+            return None, "unmatched"
+        canonical = self._normalized.get(key)
+        if canonical is not None:
+            return canonical, "normalized"
+        canonical = self._aliases.get(key)
+        if canonical is not None:
+            return canonical, "alias"
+        stemmed = stem(key)
+        canonical = self._stems.get(stemmed)
+        if canonical is not None:
+            return canonical, "stem"
+        canonical = self._fuzzy(key, stemmed)
+        if canonical is not None:
+            return canonical, "fuzzy"
+        return None, "unmatched"
+
+    def _fuzzy(self, key, stemmed):
+        grams = trigrams(stemmed)
+        size = sum(grams.values())
+        shared = Counter()
+        for gram, count in grams.items():
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] += min(count, self._grams[candidate][gram])
+        # One typo per six characters; edit similarity alone would pair short names like "chemist" and "chef"
+        limit = len(key) // 6
+        best, best_score = None, 0.0
+        for candidate, overlap in shared.most_common(CAREER_MATCH_CANDIDATES):
+            score = 2.0 * overlap / (size + self._sizes[candidate])
+            if score < self.threshold and limit:
+                distance = edit_distance(key, candidate, limit)
+                if distance <= limit:
+                    score = max(score, 1.0 - distance / max(len(key), len(candidate)))
+            if score > best_score:
+                best, best_score = candidate, score
+        return self._keys[best] if best is not None and best_score >= self.threshold else None
+
+
+class CareerResolver:
+    """The shared CareerIndex, rebuilt when the model's career list changes.
+
+    ``model_names()`` returns the active model's careers
+    (``label_encoder.classes_``). It returns the same object until a new
+    model is installed, and only then is the index rebuilt. Resolutions
+    past the exact lookup are remembered in ``cache`` for repeated
+    spellings.
+    """
+
+    def __init__(self, names, aliases=None, model_names=lambda: None, cache_size=CAREER_MATCH_CACHE_SIZE):
+        self.names = list(names)
+        self.aliases = dict(aliases or {})
+        self.model_names = model_names
+        self.cache = TTLCache(max_size=cache_size)
+        self._lock = threading.Lock()
+        self._built = (None, None)
+
+    def index(self):
+        source = self.model_names()
+        built_for, index = self._built
+        if index is None or built_for is not source:
+            with self._lock:
+                built_for, index = self._built
+                if index is None or built_for is not source:
+                    index = CareerIndex(self.names + ([] if source is None else list(source)), self.aliases)
+                    self._built = (source, index)
+                    self.cache.clear()
+                    logger.info("Built career name index", extra={"careers": len(index)})
+        return index
+
+    def resolve(self, name):
+        """Canonical career for ``name``, or ``name`` stripped of surrounding whitespace when nothing matches."""
+        if not isinstance(name, str):
+            return name
+        index = self.index()
+        if name in index:
+            resolutions.inc("exact")
+            return name
+        result = self.cache.get(name)
+        if result is MISSING:
+            result = index.resolve(name)
+            self.cache.set(name, result)
+        canonical, method = result
+        resolutions.inc(method)
+        if canonical is None:
+            return name.strip()
+        logger.debug("Resolved career name", extra={"career": name, "canonical": canonical, "method": method})
+        return canonical
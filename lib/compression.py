@@ -0,0 +1,85 @@
+import gzip
+import os
+import threading
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+# Bodies smaller than this go out as-is; compressing them saves less than it costs
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+# Per-request levels favour speed; precompressed payloads always use the maximum
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+
+# Streamed responses (chat Server-Sent Events) are never compressed, so each event is flushed as it comes
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html", "text/css", "application/javascript", "text/csv"}
+
+_precompressed = {}
+_precompressed_lock = threading.Lock()
+
+
+def available_codings():
+    """Content codings this process can produce, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(body, coding, best=False):
+    if coding == "br":
+        return brotli.compress(body, quality=11 if best else COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output (and anything keyed on it) identical across runs
+    return gzip.compress(body, compresslevel=9 if best else COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def precompress(body, etag):
+    """Compress a payload that never changes once, at the highest level, for every coding.
+
+    Responses carrying the same strong ``etag`` then reuse these bytes
+    instead of compressing per request.
+    """
+    if not COMPRESSION_ENABLED or len(body) < COMPRESSION_MIN_SIZE:
+        return
+    variants = {coding: compress(body, coding, best=True) for coding in available_codings()}
+    with _precompressed_lock:
+        _precompressed[etag.strip('"')] = variants
+
+
+def negotiate():
+    """Best coding the client accepts (honouring q-values), or None."""
+    return request.accept_encodings.best_match(available_codings())
+
+
+def _compress_response(response):
+    if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+            or response.status_code in (204, 206, 304) or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    response.vary.add('Accept-Encoding')
+    coding = negotiate()
+    if coding is None:
+        return response
+    etag, weak = response.get_etag()
+    compressed = _precompressed.get(etag, {}).get(coding) if etag and not weak else None
+    if compressed is None:
+        compressed = compress(body, coding)
+        if len(compressed) >= len(body):
+            return response
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = coding
+    if etag and not weak:
+        # The compressed bytes differ from the identity body, so the ETag can only be weak
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """Compress JSON and text responses above COMPRESSION_MIN_SIZE with br or gzip, as negotiated."""
+    if COMPRESSION_ENABLED:
+        app.after_request(_compress_response)
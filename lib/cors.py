@@ -0,0 +1,81 @@
+import logging
+import os
+import time
+
+from flask_cors import CORS
+
+from lib.metrics import INFERENCE_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+# "*" or a comma-separated list of exact origins
+CORS_ORIGINS = [origin.strip() for origin in os.getenv('CORS_ORIGINS', '*').split(',') if origin.strip()]
+CORS_METHODS = [method.strip().upper() for method in os.getenv('CORS_METHODS', 'GET,POST,OPTIONS').split(',') if method.strip()]
+CORS_HEADERS = [header.strip() for header in
+                os.getenv('CORS_HEADERS', 'Content-Type,Authorization,X-Request-ID').split(',') if header.strip()]
+CORS_ALLOW_CREDENTIALS = os.getenv('CORS_ALLOW_CREDENTIALS', 'true').lower() == 'true'
+# Seconds browsers may reuse a preflight answer; Chromium caps this at 7200, Firefox at 86400
+CORS_MAX_AGE = int(os.getenv('CORS_MAX_AGE', '86400'))
+
+preflight_count = registry.counter(
+    "cors_preflight_requests_total", "CORS preflight requests answered before routing, by outcome.", ("outcome",))
+preflight_latency = registry.histogram(
+    "cors_preflight_duration_seconds", "Time to answer a CORS preflight.", (), INFERENCE_BUCKETS)
+
+
+def origin_allowed(origin):
+    return "*" in CORS_ORIGINS or origin in CORS_ORIGINS
+
+
+class PreflightMiddleware:
+    """WSGI middleware that answers CORS preflights before Flask sees them.
+
+    An ``OPTIONS`` request carrying ``Access-Control-Request-Method`` gets
+    a ``204`` straight from here: no request context, URL matching,
+    before_request hooks or blueprint dispatch. The headers are built once.
+    A disallowed origin or method gets the ``204`` without CORS headers,
+    which the browser treats as a refusal. Other requests pass through to
+    the app, where flask-cors adds headers to the actual responses.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+        self.methods = set(CORS_METHODS)
+        self.allowed_headers = [
+            ("Access-Control-Allow-Methods", ", ".join(CORS_METHODS)),
+            ("Access-Control-Allow-Headers", ", ".join(CORS_HEADERS)),
+            ("Access-Control-Max-Age", str(CORS_MAX_AGE)),
+        ]
+        if CORS_ALLOW_CREDENTIALS:
+            self.allowed_headers.append(("Access-Control-Allow-Credentials", "true"))
+        # With credentials a literal "*" is refused by browsers, so the origin is echoed
+        self.echo_origin = CORS_ALLOW_CREDENTIALS or "*" not in CORS_ORIGINS
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "OPTIONS" or "HTTP_ACCESS_CONTROL_REQUEST_METHOD" not in environ:
+            return self.wsgi_app(environ, start_response)
+        start = time.perf_counter()
+        origin = environ.get("HTTP_ORIGIN")
+        method = environ["HTTP_ACCESS_CONTROL_REQUEST_METHOD"].upper()
+        headers = [("Content-Length", "0"), ("Vary", "Origin")]
+        if origin and origin_allowed(origin) and method in self.methods:
+            headers.append(("Access-Control-Allow-Origin", origin if self.echo_origin else "*"))
+            headers.extend(self.allowed_headers)
+            outcome = "allowed"
+        else:
+            outcome = "rejected"
+            logger.debug("Refused CORS preflight", extra={"origin": origin, "method": method,
+                                                          "path": environ.get("PATH_INFO")})
+        start_response("204 No Content", headers)
+        preflight_latency.observe(time.perf_counter() - start)
+        preflight_count.inc(outcome)
+        return [b""]
+
+
+def init_app(app):
+    """Answer CORS preflights ahead of routing and add CORS headers to every other response."""
+    CORS(app, resources={r"/*": {"origins": CORS_ORIGINS, "methods": CORS_METHODS,
+                                 "allow_headers": CORS_HEADERS, "max_age": CORS_MAX_AGE}},
+         supports_credentials=CORS_ALLOW_CREDENTIALS)
+    app.wsgi_app = PreflightMiddleware(app.wsgi_app)
+    logger.info("CORS configured", extra={"origins": CORS_ORIGINS, "max_age": CORS_MAX_AGE})
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from lib.cache import MISSING
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_key(namespace, payload):
+    """Stable hash of ``payload`` (any JSON-serializable value) within ``namespace``."""
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return namespace + ":" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SQLiteCache:
+    """Disk-backed JSON value cache in a local SQLite file.
+
+    The file survives restarts and is shared by every gunicorn worker on the
+    machine: each process (and thread) opens its own connection and SQLite's
+    WAL mode lets readers proceed while another worker writes. Entries expire
+    after ``ttl`` seconds; once the table exceeds ``max_entries`` rows or
+    ``max_bytes`` of stored values, the least recently read entries are
+    evicted. A falsy ``path`` disables the cache.
+    """
+
+    def __init__(self, path, ttl=None, max_entries=10000, max_bytes=100 * 1024 * 1024, prune_every=50):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "errors": 0}
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connection(self):
+        # Connections must not cross a fork, so they are keyed on the pid as well
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache(accessed_at)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, key, default=MISSING):
+        if not self.enabled:
+            return default
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._count("misses")
+                return default
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._count("hits")
+            return json.loads(row[0])
+        except (sqlite3.Error, OSError) as e:
+            # An unopenable file or directory (read-only disk, bad path) degrades to a miss
+            logger.error(f"Generation cache read failed: {str(e)}")
+            self._count("errors")
+            return default
+
+    def set(self, key, value, ttl=None):
+        if not self.enabled:
+            return
+        ttl = ttl if ttl is not None else self.ttl
+        now = time.time()
+        try:
+            text = json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            # Values that cannot round-trip through JSON are simply not cached
+            return
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, text, len(text), now + ttl if ttl is not None else None, now)
+            )
+            self._count("sets")
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % self.prune_every == 0
+            if prune:
+                self.prune()
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Generation cache write failed: {str(e)}")
+            self._count("errors")
+
+    def get_or_compute(self, key, compute, cacheable=None):
+        """Return the cached value for ``key`` or compute, store and return it."""
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        value = compute()
+        if cacheable is None or cacheable(value):
+            self.set(key, value)
+        return value
+
+    def prune(self):
+        """Drop expired entries, then evict least recently read ones over the limits."""
+        conn = self._connection()
+        evicted = conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                               (time.time(),)).rowcount
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        while count > self.max_entries or total > self.max_bytes:
+            excess = max(count - self.max_entries, 1)
+            rows = conn.execute("SELECT key, size FROM cache ORDER BY accessed_at LIMIT ?", (excess,)).fetchall()
+            if not rows:
+                break
+            conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key, _ in rows])
+            evicted += len(rows)
+            count -= len(rows)
+            total -= sum(size for _, size in rows)
+        if evicted:
+            self._count("evictions", evicted)
+        return evicted
+
+    def clear(self):
+        if not self.enabled:
+            return 0
+        try:
+            return self._connection().execute("DELETE FROM cache").rowcount
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Generation cache clear failed: {str(e)}")
+            self._count("errors")
+            return 0
+
+    def stats(self):
+        if self.enabled:
+            try:
+                count, total = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+            except (sqlite3.Error, OSError) as e:
+                logger.error(f"Generation cache stats failed: {str(e)}")
+                self._count("errors")
+                count, total = 0, 0
+        with self._lock:
+            stats = dict(self._stats)
+        stats["enabled"] = self.enabled
+        if self.enabled:
+            stats["size"] = count
+            stats["bytes"] = total
+        return stats
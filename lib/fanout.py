@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class TaskResult:
+    """Outcome of one fanned-out task: a value, an error, or a timeout."""
+
+    __slots__ = ("value", "error", "timed_out", "elapsed_ms")
+
+    def __init__(self, value=None, error=None, timed_out=False, elapsed_ms=None):
+        self.value = value
+        self.error = error
+        self.timed_out = timed_out
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def ok(self):
+        return self.error is None and not self.timed_out
+
+
+def fan_out(executor, tasks, task_timeout=None, overall_timeout=None):
+    """Run ``tasks`` (a dict of key -> zero-argument callable) on ``executor``.
+
+    Each task gets ``task_timeout`` seconds from when it starts running (a
+    dict of key -> seconds gives each task its own budget), and the whole
+    fan-out gets ``overall_timeout`` seconds. A task that misses its
+    deadline comes back with ``timed_out=True``. It keeps its worker until it
+    returns, but its result is discarded. Tasks still queued at the overall
+    deadline are cancelled. Returns a dict of key -> TaskResult, in the order
+    of ``tasks``.
+    """
+    start = time.monotonic()
+    overall_deadline = start + overall_timeout if overall_timeout is not None else None
+    started = {}
+    lock = threading.Lock()
+    if isinstance(task_timeout, dict):
+        timeouts = {key: task_timeout.get(key) for key in tasks}
+    else:
+        timeouts = {key: task_timeout for key in tasks}
+
+    def run(key, fn):
+        with lock:
+            started[key] = time.monotonic()
+        return fn()
+
+    futures = {executor.submit(run, key, fn): key for key, fn in tasks.items()}
+    results = {}
+    pending = set(futures)
+
+    while pending:
+        now = time.monotonic()
+        # Nearest deadline among running tasks and the overall deadline
+        deadlines = [overall_deadline] if overall_deadline is not None else []
+        with lock:
+            for future in pending:
+                key = futures[future]
+                if timeouts[key] is not None and key in started:
+                    deadlines.append(started[key] + timeouts[key])
+        timeout = max(0.0, min(deadlines) - now) if deadlines else None
+
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            key = futures[future]
+            elapsed_ms = (time.monotonic() - started.get(key, start)) * 1000.0
+            try:
+                results[key] = TaskResult(value=future.result(), elapsed_ms=elapsed_ms)
+            except Exception as e:
+                results[key] = TaskResult(error=e, elapsed_ms=elapsed_ms)
+
+        now = time.monotonic()
+        for future in list(pending):
+            key = futures[future]
+            with lock:
+                started_at = started.get(key)
+            task_expired = (timeouts[key] is not None and started_at is not None
+                            and now >= started_at + timeouts[key])
+            overall_expired = overall_deadline is not None and now >= overall_deadline
+            if task_expired or overall_expired:
+                future.cancel()
+                pending.discard(future)
+                elapsed_ms = (now - started_at) * 1000.0 if started_at is not None else 0.0
+                results[key] = TaskResult(timed_out=True, elapsed_ms=elapsed_ms)
+
+    return {key: results[key] for key in tasks}
@@ -0,0 +1,65 @@
+import logging
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# "orjson" when it is installed, "default" for Flask's json-module provider
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson').lower()
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson.
+
+    Output matches the default provider's: keys sorted, compact unless the
+    app is in debug mode, and dates and dataclasses still go through Flask's
+    ``default`` hook. NumPy arrays and scalars (model outputs) serialize
+    natively. Anything orjson rejects, such as integers beyond 64 bits, and
+    calls with ``json.dumps`` keyword arguments fall back to the default
+    provider.
+    """
+
+    if orjson is not None:
+        OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                   | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+    def _encode(self, obj, option=0):
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS | option)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._encode(obj).decode("utf-8")
+        except orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._encode(obj, (orjson.OPT_INDENT_2 if pretty else 0) | orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app):
+    """Use orjson for ``jsonify`` and ``request.json`` when it is installed and enabled."""
+    if JSON_PROVIDER != 'orjson':
+        return
+    if orjson is None:
+        logger.info("orjson is not installed, using the default JSON provider")
+        return
+    app.json = OrjsonProvider(app)
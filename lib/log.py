@@ -0,0 +1,243 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import traceback
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+from lib.metrics import registry
+
+# Root level, plus per-logger overrides such as "routes.chatbot=DEBUG,lib.upstream=WARNING"
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+# json for log shippers, text for reading a terminal
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+# Fraction of DEBUG records kept; INFO and above are never sampled
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.1'))
+# Records waiting for the writer thread; further records are dropped, never waited on
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# Request bodies are only logged when this is on, and always through redact()
+LOG_PAYLOADS = os.getenv('LOG_PAYLOADS', 'false').lower() == 'true'
+REDACT_KEYS = frozenset(key.strip().lower() for key in os.getenv(
+    'LOG_REDACT_KEYS', 'password,token,authorization,api_key,secret,email,phone,name,message,session_id'
+).split(',') if key.strip())
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# LogRecord attributes that are not caller-supplied ``extra`` fields
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+
+
+def redact(payload):
+    """Copy of ``payload`` with values under sensitive keys masked, recursively."""
+    if isinstance(payload, dict):
+        return {key: "[redacted]" if str(key).lower() in REDACT_KEYS else redact(value)
+                for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [redact(value) for value in payload]
+    return payload
+
+
+def log_payload(log, label, payload):
+    """Log a redacted request body at DEBUG, only when LOG_PAYLOADS is on."""
+    if LOG_PAYLOADS and log.isEnabledFor(logging.DEBUG):
+        log.debug(label, extra={"payload": redact(payload)})
+
+
+def current_request_id():
+    if has_request_context():
+        return g.get('request_id', '-')
+    return '-'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, request_id, any ``extra`` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, 'request_id', '-')
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s - %(levelname)s - %(name)s [%(request_id)s] - %(message)s")
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp the request ID and drop all but LOG_DEBUG_SAMPLE_RATE of DEBUG records.
+
+    Runs on the calling thread, before the record is queued, so it can still
+    see the Flask request context and sampled-out records cost nothing more.
+    """
+
+    def __init__(self, sample_rate=LOG_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if record.levelno <= logging.DEBUG and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        record.request_id = current_request_id()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking the request."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message and traceback now; args and exc_info may not survive the queue
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Pipeline:
+    """The queue handler installed on the root logger and the thread writing its records."""
+
+    def __init__(self):
+        self.queue = None
+        self.handler = None
+        self.listener = None
+        self.lock = threading.Lock()
+
+    def start_listener(self):
+        if LOG_FORMAT == 'text':
+            formatter = TextFormatter()
+        else:
+            formatter = JsonFormatter()
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(formatter)
+        self.listener = QueueListener(self.queue, stream, respect_handler_level=False)
+        self.listener.start()
+
+    def restart_after_fork(self):
+        # The writer thread does not survive a fork (gunicorn --preload); start a fresh one
+        if self.listener is not None:
+            self.queue = queue.Queue(LOG_QUEUE_SIZE)
+            self.handler.queue = self.queue
+            self.start_listener()
+
+    def stop(self):
+        with self.lock:
+            if self.listener is not None:
+                try:
+                    self.listener.stop()
+                except Exception:
+                    pass
+                self.listener = None
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "dropped": self.handler.dropped if self.handler is not None else 0,
+            "format": LOG_FORMAT,
+            "debug_sample_rate": LOG_DEBUG_SAMPLE_RATE,
+            "payloads": LOG_PAYLOADS
+        }
+
+
+pipeline = _Pipeline()
+
+
+def collect_log_metrics():
+    return [("log_records_dropped_total", "counter", "Log records dropped because the log queue was full.",
+             [({}, pipeline.stats()["dropped"])])]
+
+
+registry.register_collector(collect_log_metrics)
+
+
+def parse_levels(spec):
+    """``"routes.chatbot=DEBUG,lib.upstream=WARNING"`` -> ``{"routes.chatbot": "DEBUG", ...}``."""
+    levels = {}
+    for item in spec.split(','):
+        name, sep, level = item.partition('=')
+        if not sep or not name.strip():
+            continue
+        level = level.strip().upper()
+        if not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Unknown log level {level!r} for {name.strip()}")
+        levels[name.strip()] = level
+    return levels
+
+
+def configure_logging():
+    """Route every logger through one bounded queue and a background writer thread.
+
+    The request thread only resolves the message and enqueues the record;
+    formatting and the stdout write happen on the listener thread. Safe to
+    call more than once.
+    """
+    with pipeline.lock:
+        root = logging.getLogger()
+        root.setLevel(LOG_LEVEL)
+        for name, level in parse_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+        if pipeline.handler is not None:
+            return pipeline
+        pipeline.queue = queue.Queue(LOG_QUEUE_SIZE)
+        pipeline.handler = NonBlockingQueueHandler(pipeline.queue)
+        pipeline.handler.addFilter(RequestContextFilter())
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(pipeline.handler)
+        pipeline.start_listener()
+        atexit.register(pipeline.stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=pipeline.restart_after_fork)
+    return pipeline
+
+
+def _assign_request_id():
+    # Keep a caller-supplied ID (load balancer, frontend) so logs join up across services
+    incoming = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = incoming if _REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+
+
+def _echo_request_id(response):
+    request_id = g.get('request_id')
+    if request_id:
+        response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
+
+def init_app(app):
+    """Configure the logging pipeline and give every request an ID, echoed in ``X-Request-ID``."""
+    configure_logging()
+    app.before_request(_assign_request_id)
+    app.after_request(_echo_request_id)
@@ -0,0 +1,232 @@
+import bisect
+import logging
+import os
+import threading
+import time
+
+from flask import Response, g, request
+
+logger = logging.getLogger(__name__)
+
+# Set to false to drop the middleware and the /metrics endpoint
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Seconds; wide enough for sub-millisecond catalog hits and minute-long GPT calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+INFERENCE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; an observation is one bisect and three additions."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                # Per-bucket counts (last one is +Inf), sum, count
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = [(labelvalues, list(counts), total, count) for labelvalues, (counts, total, count) in self._values.items()]
+        for labelvalues, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered in the Prometheus text format.
+
+    Hot paths update counters and histograms directly. Collectors are
+    callables run at scrape time that read existing ``stats()`` dicts, so
+    caches and clients pay nothing extra per request.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """``collector()`` returns ``(name, kind, documentation, [(labels_dict, value), ...])`` tuples."""
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        families = {}
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {str(e)}")
+                continue
+            for name, kind, documentation, values in samples:
+                family = families.setdefault(name, (kind, documentation, []))
+                family[2].extend(values)
+        for name, (kind, documentation, values) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+request_latency = registry.histogram(
+    "http_request_duration_seconds", "Time to build the response, by route.", ("method", "route"))
+request_count = registry.counter(
+    "http_requests_total", "Requests by route and status code.", ("method", "route", "status"))
+requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Requests currently being handled by this worker.")
+upstream_latency = registry.histogram(
+    "upstream_request_duration_seconds", "Upstream calls including retries, by outcome.", ("upstream", "outcome"))
+inference_latency = registry.histogram(
+    "inference_stage_duration_seconds", "Local model inference time by stage.", ("stage",), INFERENCE_BUCKETS)
+
+
+def register_cache(name, cache):
+    """Export a cache's hit/miss counters and size, read from ``cache.stats()`` at scrape time."""
+    def collect():
+        stats = cache.stats()
+        labels = {"cache": name}
+        hits = stats.get("hits", 0) + stats.get("stale_hits", 0)
+        lookups = hits + stats.get("misses", 0) + stats.get("coalesced", 0)
+        samples = [
+            ("cache_hits_total", "counter", "Cache lookups answered from the cache.", [(labels, hits)]),
+            ("cache_misses_total", "counter", "Cache lookups that had to compute the value.", [(labels, stats.get("misses", 0))]),
+            ("cache_hit_ratio", "gauge", "Hits over all lookups since start.", [(labels, round(hits / lookups, 4) if lookups else 0.0)]),
+        ]
+        if "size" in stats:
+            samples.append(("cache_entries", "gauge", "Entries currently cached.", [(labels, stats["size"])]))
+        return samples
+    registry.register_collector(collect)
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    requests_in_flight.inc()
+
+
+def _after_request(response):
+    start = g.get("metrics_start")
+    if start is not None:
+        # Unmatched URLs share one label so 404 scans cannot blow up cardinality
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        request_latency.observe(time.perf_counter() - start, request.method, route)
+        request_count.inc(request.method, route, str(response.status_code))
+    return response
+
+
+def _teardown_request(exc):
+    # Runs even when the handler raised, so the gauge cannot drift upwards
+    if g.pop("metrics_start", None) is not None:
+        requests_in_flight.dec()
+
+
+def metrics_endpoint():
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """Record per-route latency, status counts and in-flight requests, and serve ``/metrics``.
+
+    Each gunicorn worker keeps its own metrics, so every scrape shows one worker.
+    """
+    if not METRICS_ENABLED:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint, methods=["GET"])
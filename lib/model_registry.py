@@ -0,0 +1,199 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from lib.models import (
+    MODEL_FILENAME, SCALER_FILENAME, ENCODER_FILENAME,
+    find_model_dir, load_artifacts
+)
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FILENAMES = (MODEL_FILENAME, SCALER_FILENAME, ENCODER_FILENAME)
+
+
+class ModelBundle:
+    """One loaded artifact set. Bundles are replaced as a whole, never edited piecemeal."""
+
+    __slots__ = ("model", "scaler", "label_encoder", "version", "source", "load_timings_ms",
+                 "loaded_at", "warmup_ms", "classes", "proba_labels", "engine", "__weakref__")
+
+    def __init__(self, model, scaler, label_encoder, version, source=None, load_timings_ms=None):
+        self.model = model
+        self.scaler = scaler
+        self.label_encoder = label_encoder
+        self.version = version
+        self.source = source
+        self.load_timings_ms = load_timings_ms or {}
+        self.loaded_at = time.time()
+        self.warmup_ms = None
+        # Optional lib.tree_engine.TreeEnsemble that replaces scaler + model at inference
+        self.engine = None
+        # Decode tables built once: encoded label -> career, and predict_proba column -> career
+        self.classes = np.asarray(label_encoder.classes_)
+        model_classes = getattr(model, "classes_", None)
+        self.proba_labels = self.classes[np.asarray(model_classes)] if model_classes is not None else self.classes
+
+    def decode(self, labels):
+        """Career names for encoded labels, by indexing instead of inverse_transform."""
+        return self.classes[np.asarray(labels, dtype=np.intp)]
+
+
+class ModelRegistry:
+    """Holds the active ModelBundle and hot-swaps in new versions.
+
+    New versions are directories under ``<model dir>/versions/<version>/``
+    holding all three artifacts. ``validate(bundle)`` runs against a
+    candidate before it goes live (it should do a warm-up inference and
+    raise if it fails). The swap is a single reference assignment, so a
+    request that already took ``current()`` finishes on the old version.
+    Versions that fail validation are remembered and not retried. The
+    initial load and each check-load-install run under their own locks,
+    so concurrent callers wait for the one load in progress instead of
+    seeing no bundle or loading the same version twice.
+    """
+
+    def __init__(self, possible_model_dirs, validate=None, mmap_mode=None, poll_interval=30.0, settle_seconds=5.0):
+        self.possible_model_dirs = possible_model_dirs
+        self.validate = validate
+        self.mmap_mode = mmap_mode
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.model_dir = None
+        self._current = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._load_attempted = False
+        self._watcher = None
+        self._watcher_pid = None
+        self._failed_versions = {}
+        self._history = []
+
+    def current(self):
+        return self._current
+
+    def install(self, bundle):
+        """Make ``bundle`` the active version."""
+        with self._lock:
+            previous = self._current
+            self._current = bundle
+            self._history.append({"version": bundle.version, "installed_at": time.time()})
+            del self._history[:-10]
+        logger.info(f"Model version {bundle.version} is live"
+                    + (f" (replaced {previous.version})" if previous is not None else ""))
+
+    def ensure_loaded(self):
+        """Load the initial bundle once per process: the newest version, else the root artifacts."""
+        if self._load_attempted:
+            return
+        # Held until the load finishes, so concurrent callers get the bundle rather than None
+        with self._load_lock:
+            if self._load_attempted:
+                return
+            try:
+                self._load_initial()
+            finally:
+                self._load_attempted = True
+
+    def _load_initial(self):
+        self.model_dir = find_model_dir(self.possible_model_dirs)
+        if not self.model_dir:
+            logger.warning("No model directory found, will use fallback responses")
+            return
+        try:
+            if not self.check_for_update():
+                self.install(self._load(self.model_dir, version=None))
+        except Exception as e:
+            logger.error(f"Error loading models: {str(e)}")
+            # Registry stays empty if loading fails
+
+    def load_failed(self):
+        """True when a model directory was found but no bundle could be installed."""
+        return self._load_attempted and bool(self.model_dir) and self._current is None
+
+    def _load(self, directory, version):
+        model, scaler, label_encoder, fingerprint, timings = load_artifacts(directory, mmap_mode=self.mmap_mode)
+        bundle = ModelBundle(model, scaler, label_encoder, version or fingerprint,
+                             source=directory, load_timings_ms=timings)
+        if self.validate is not None:
+            self.validate(bundle)
+        return bundle
+
+    def available_versions(self):
+        """Complete, settled version directories, oldest first."""
+        versions_dir = os.path.join(self.model_dir, "versions") if self.model_dir else None
+        if not versions_dir or not os.path.isdir(versions_dir):
+            return []
+        now = time.time()
+        found = []
+        for name in os.listdir(versions_dir):
+            path = os.path.join(versions_dir, name)
+            files = [os.path.join(path, filename) for filename in ARTIFACT_FILENAMES]
+            if not all(os.path.isfile(f) for f in files):
+                continue
+            newest = max(os.path.getmtime(f) for f in files)
+            # Skip artifact sets that may still be being copied in
+            if now - newest < self.settle_seconds:
+                continue
+            found.append((newest, name, path))
+        found.sort()
+        return [(name, path) for _, name, path in found]
+
+    def check_for_update(self):
+        """Load and install the newest version if it is not live yet. Returns True on swap."""
+        # The watcher and the admin reload must not both load the same new version
+        with self._reload_lock:
+            versions = self.available_versions()
+            if not versions:
+                return False
+            name, path = versions[-1]
+            current = self._current
+            if (current is not None and current.version == name) or name in self._failed_versions:
+                return False
+            try:
+                bundle = self._load(path, version=name)
+            except Exception as e:
+                logger.error(f"Model version {name} failed validation: {str(e)}")
+                self._failed_versions[name] = str(e)
+                return False
+            self.install(bundle)
+            return True
+
+    def start_watching(self):
+        """Poll for new versions in a background thread (one per worker process)."""
+        # Threads do not survive fork, so a watcher started in the gunicorn master does not count
+        if not self.poll_interval or self._watcher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+            self._watcher_pid = os.getpid()
+            self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.check_for_update()
+            except Exception as e:
+                logger.error(f"Model registry scan failed: {str(e)}")
+
+    def stats(self):
+        current = self._current
+        return {
+            "version": current.version if current is not None else None,
+            "source": current.source if current is not None else None,
+            "loaded_at": current.loaded_at if current is not None else None,
+            "warmup_ms": current.warmup_ms if current is not None else None,
+            "engine": current.engine.stats() if current is not None and current.engine is not None else None,
+            "load_timings_ms": current.load_timings_ms if current is not None else {},
+            "available_versions": [name for name, _ in self.available_versions()],
+            "failed_versions": dict(self._failed_versions),
+            "history": list(self._history),
+            "watching": self._watcher_pid == os.getpid(),
+        }
@@ -0,0 +1,76 @@
+import hashlib
+import logging
+import os
+import time
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILENAME = "career_xgb.pkl"
+SCALER_FILENAME = "scaler.pkl"
+ENCODER_FILENAME = "label_encoder.pkl"
+
+
+def find_model_dir(possible_model_dirs):
+    """First directory in ``possible_model_dirs`` that contains .pkl files or a versions/ directory."""
+    for dir_path in possible_model_dirs:
+        logger.debug(f"Checking for models in: {dir_path}")
+        if os.path.exists(dir_path):
+            try:
+                # Check if the directory contains model files
+                model_files = [f for f in os.listdir(dir_path) if f.endswith('.pkl')]
+                if model_files or os.path.isdir(os.path.join(dir_path, 'versions')):
+                    logger.info(f"Found models in: {dir_path}", extra={"model_files": model_files})
+                    return dir_path
+            except Exception as e:
+                logger.error(f"Error checking directory {dir_path}: {str(e)}")
+    logger.warning("Could not find a directory with model files.")
+    return None
+
+
+def artifact_version(paths):
+    """Short fingerprint of model artifacts based on their names, sizes and mtimes."""
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+
+def load_artifacts(model_dir, mmap_mode=None):
+    """Load model, scaler and label encoder from ``model_dir``.
+
+    ``mmap_mode='r'`` memory-maps the NumPy arrays inside the pickles, so
+    forked workers share those pages with the page cache instead of each
+    holding a private copy. Returns ``(model, scaler, label_encoder, version,
+    timings_ms)``.
+    """
+    paths = [os.path.join(model_dir, name) for name in (MODEL_FILENAME, SCALER_FILENAME, ENCODER_FILENAME)]
+    loaded = []
+    timings_ms = {}
+    for path in paths:
+        logger.info(f"Loading {os.path.basename(path)} from: {path}")
+        start = time.perf_counter()
+        loaded.append(joblib.load(path, mmap_mode=mmap_mode))
+        timings_ms[os.path.basename(path)] = round((time.perf_counter() - start) * 1000.0, 2)
+    model, scaler, label_encoder = loaded
+    return model, scaler, label_encoder, artifact_version(paths), timings_ms
+
+
+def rss_mb():
+    """Resident set size of this process in MB, or None if it cannot be read."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024.0 * 1024.0 if peak > 1 << 32 else 1024.0), 1)
+    except Exception:
+        return None
@@ -0,0 +1,230 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, jsonify, request, send_from_directory
+
+from lib.admin import admin_required, is_admin_request
+
+logger = logging.getLogger(__name__)
+
+# Fraction of requests profiled without being asked; 0 profiles only requests that ask
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'cache/profiles')
+# Stack sampling period; lower catches shorter calls but costs the request more
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+# Profiles kept on disk, newest first
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '50'))
+# Also sample other busy threads (micro-batcher, fan-out pools), each rooted at its thread name
+PROFILE_ALL_THREADS = os.getenv('PROFILE_ALL_THREADS', 'false').lower() == 'true'
+
+# Admin requests with this header set to 1 are profiled
+PROFILE_HEADER = 'X-Profile'
+
+# Innermost functions of a thread that is parked waiting for work
+_IDLE_FUNCTIONS = frozenset(('wait', 'select', 'poll', 'accept', '_worker'))
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _folded_stack(frame, root=None):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    if root:
+        labels.append(root)
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Samples a thread's call stack every ``interval`` seconds from a helper thread.
+
+    Stacks are counted in the collapsed format used by flamegraph.pl and
+    speedscope: one ``outer;...;inner count`` line per distinct stack.
+    Sampling only reads frames, so the profiled code runs unmodified; the
+    cost is the helper thread taking the GIL once per interval.
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL_MS / 1000.0, all_threads=PROFILE_ALL_THREADS,
+                 greenlet=None):
+        self.thread_id = thread_id
+        self.greenlet = greenlet
+        self.interval = interval
+        self.all_threads = all_threads
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            self.samples += 1
+            frame = self.greenlet.gr_frame if self.greenlet is not None else frames.get(self.thread_id)
+            if frame is not None:
+                self.stacks[_folded_stack(frame)] += 1
+            if not self.all_threads:
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id in (self.thread_id, own_id) or frame.f_code.co_name in _IDLE_FUNCTIONS:
+                    continue
+                self.stacks[_folded_stack(frame, root=f"thread:{names.get(thread_id, thread_id)}")] += 1
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _current_greenlet():
+    # Under gevent workers every request is a greenlet on the same OS thread, so
+    # the sampler (itself a greenlet) reads the request's frame whenever it yields
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is not None and monkey.is_module_patched('threading'):
+        import gevent
+        return gevent.getcurrent()
+    return None
+
+
+def should_profile():
+    if request.headers.get(PROFILE_HEADER) == '1' and is_admin_request():
+        return "header"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def _slug(path):
+    return re.sub(r'[^A-Za-z0-9]+', '-', path).strip('-')[:60] or 'root'
+
+
+def write_profile(sampler, metadata, directory=None):
+    """Write ``<name>.folded`` and its ``<name>.json`` metadata; returns the name."""
+    directory = directory or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(metadata["started_at"]))
+    name = f"{stamp}-{metadata['request_id']}-{_slug(metadata['path'])}"
+    with open(os.path.join(directory, name + ".folded"), "w") as f:
+        f.write(sampler.folded())
+    with open(os.path.join(directory, name + ".json"), "w") as f:
+        json.dump(dict(metadata, name=name, samples=sampler.samples, stacks=len(sampler.stacks)), f)
+    prune_profiles(directory)
+    return name
+
+
+def prune_profiles(directory=None, keep=None):
+    directory = directory or PROFILE_DIR
+    keep = PROFILE_MAX_FILES if keep is None else keep
+    names = sorted((f[:-len(".json")] for f in os.listdir(directory) if f.endswith(".json")), reverse=True)
+    for name in names[keep:]:
+        for suffix in (".json", ".folded"):
+            try:
+                os.remove(os.path.join(directory, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory=None, limit=None):
+    """Metadata of the newest profiles written by any worker."""
+    directory = directory or PROFILE_DIR
+    if not os.path.isdir(directory):
+        return []
+    names = sorted((f for f in os.listdir(directory) if f.endswith(".json")), reverse=True)
+    profiles = []
+    for filename in names[:limit]:
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            # Pruned or half-written by another worker
+            continue
+    return profiles
+
+
+def _start_profile():
+    reason = should_profile()
+    if reason is None:
+        return
+    g.profile = {
+        "reason": reason,
+        "started_at": time.time(),
+        "start": time.perf_counter(),
+        "sampler": StackSampler(threading.get_ident(), greenlet=_current_greenlet()).start()
+    }
+
+
+def _finish_profile(response):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    sampler = profile["sampler"].stop()
+    metadata = {
+        "request_id": g.get('request_id') or f"{os.getpid()}-{int(profile['started_at'] * 1000)}",
+        "method": request.method,
+        "path": request.path,
+        "route": request.url_rule.rule if request.url_rule is not None else None,
+        "status": response.status_code,
+        "duration_ms": round((time.perf_counter() - profile["start"]) * 1000.0, 2),
+        "reason": profile["reason"],
+        "started_at": profile["started_at"],
+        "pid": os.getpid()
+    }
+    try:
+        name = write_profile(sampler, metadata)
+    except OSError as e:
+        logger.error(f"Failed to write request profile: {str(e)}")
+        return response
+    response.headers['X-Profile-Id'] = name
+    logger.info(f"Profiled {request.method} {request.path}", extra={"profile": name, "samples": sampler.samples})
+    return response
+
+
+def _abandon_profile(exc):
+    # after_request is skipped when the handler raised; never leave a sampler running
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile["sampler"].stop()
+
+
+@admin_required
+def list_profiles_endpoint():
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), PROFILE_MAX_FILES)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify({"directory": PROFILE_DIR, "profiles": list_profiles(limit=limit)}), 200
+
+
+@admin_required
+def get_profile_endpoint(name):
+    # Collapsed stacks for flamegraph.pl or speedscope
+    return send_from_directory(os.path.abspath(PROFILE_DIR), name + ".folded", mimetype="text/plain")
+
+
+def init_app(app):
+    """Profile requests that ask for it (admin ``X-Profile: 1``) or are sampled, and serve the results."""
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abandon_profile)
+    app.add_url_rule('/api/admin/profiles', 'list_profiles', list_profiles_endpoint, methods=['GET'])
+    app.add_url_rule('/api/admin/profiles/<name>', 'get_profile', get_profile_endpoint, methods=['GET'])
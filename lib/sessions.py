@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+
+class SupabaseChatHistory:
+    """Persists chat turns to the ``chat_history`` table and reloads recent ones.
+
+    With a ``writer`` (a write-behind queue) turns are queued for bulk insert
+    instead of being written on the request path. ``restore=False`` skips
+    reading history back.
+    """
+
+    table = 'chat_history'
+
+    def __init__(self, client=None, writer=None, restore=True):
+        self._client = client
+        self.writer = writer
+        self.restore = restore
+
+    @property
+    def client(self):
+        # Imported lazily: lib.supabase connects at import time
+        if self._client is None:
+            from lib.supabase import supabase
+            self._client = supabase
+        return self._client
+
+    def save_turns(self, rows):
+        """Insert rows of ``{"session_id", "message", "response"}`` in one request."""
+        if self.writer is not None:
+            for row in rows:
+                self.writer.enqueue(self.table, row)
+        elif rows:
+            self.client.table(self.table).insert(rows).execute()
+
+    def load_turns(self, session_id, limit):
+        """Recent turns oldest first, or None when restoring is disabled."""
+        if not self.restore:
+            return None
+        result = (self.client.table(self.table)
+                  .select('message, response, created_at')
+                  .eq('session_id', session_id)
+                  .order('created_at', desc=True)
+                  .limit(limit)
+                  .execute())
+        return [{"message": row["message"], "response": row["response"]} for row in reversed(result.data or [])]
+
+
+class ChatSessionStore:
+    """Bounded in-memory chat sessions.
+
+    Each session keeps the last ``window`` turns. At most ``max_sessions``
+    sessions are held, and the least recently used one is evicted first.
+    Sessions idle for ``idle_timeout`` seconds are dropped. When a
+    ``backend`` is given, every turn is handed to ``backend.save_turns`` and
+    sessions missing from memory are restored with ``backend.load_turns``,
+    so memory stays bounded without losing history across restarts.
+    """
+
+    def __init__(self, max_sessions=10000, window=20, idle_timeout=1800, backend=None, sweep_every=100):
+        self.max_sessions = max_sessions
+        self.window = window
+        self.idle_timeout = idle_timeout
+        self.backend = backend
+        self.sweep_every = sweep_every
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._ops = 0
+        self._stats = {"evicted_lru": 0, "evicted_idle": 0, "restored": 0, "persist_errors": 0}
+
+    def _session(self, session_id, now):
+        """Fetch (or create) a session's turn deque; caller holds the lock."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = [deque(maxlen=self.window), now]
+            self._sessions[session_id] = entry
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._stats["evicted_lru"] += 1
+        entry[1] = now
+        self._sessions.move_to_end(session_id)
+        return entry[0]
+
+    def _maybe_sweep(self, now):
+        self._ops += 1
+        if self._ops % self.sweep_every:
+            return
+        # Sessions are in LRU order, so idle ones are at the front
+        cutoff = now - self.idle_timeout
+        while self._sessions:
+            session_id, (_, last_seen) = next(iter(self._sessions.items()))
+            if last_seen > cutoff:
+                break
+            del self._sessions[session_id]
+            self._stats["evicted_idle"] += 1
+
+    def history(self, session_id):
+        """Recent turns for a session, restoring them from the backend if needed."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and now - entry[1] <= self.idle_timeout:
+                return list(self._session(session_id, now))
+        if self.backend is None:
+            return []
+        try:
+            turns = self.backend.load_turns(session_id, self.window)
+            if turns is None:
+                return []
+        except Exception as e:
+            logger.error(f"Failed to restore chat session {session_id}: {str(e)}")
+            with self._lock:
+                self._stats["persist_errors"] += 1
+            return []
+        with self._lock:
+            session = self._session(session_id, now)
+            session.clear()
+            session.extend(turns)
+            self._stats["restored"] += 1
+            return list(session)
+
+    def append(self, session_id, message, response):
+        """Record one turn in memory and hand it to the backend."""
+        now = time.monotonic()
+        with self._lock:
+            self._session(session_id, now).append({"message": message, "response": response})
+            self._maybe_sweep(now)
+        if self.backend is not None:
+            try:
+                self.backend.save_turns([{"session_id": session_id, "message": message, "response": response}])
+            except Exception as e:
+                logger.error(f"Failed to persist chat turn for {session_id}: {str(e)}")
+                with self._lock:
+                    self._stats["persist_errors"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["sessions"] = len(self._sessions)
+        stats["max_sessions"] = self.max_sessions
+        stats["window"] = self.window
+        return stats
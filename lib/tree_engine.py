@@ -0,0 +1,264 @@
+import json
+
+import numpy as np
+
+
+class TreeEnsemble:
+    """A fitted tree classifier flattened into NumPy arrays, with its StandardScaler folded in.
+
+    All trees are walked together, one level per step, so a prediction costs
+    ``max_depth`` vectorized gathers instead of a trip through the
+    XGBoost/scikit-learn call stack. Inputs are raw feature rows: the scaler
+    is applied here, then values are cast to float32 and compared the way the
+    source library does, so predictions match ``model.predict``.
+
+    Supports XGBoost classifiers (``binary:logistic``, ``multi:softprob``,
+    ``multi:softmax``) and scikit-learn decision trees and random forests.
+    """
+
+    def __init__(self, kind, feature, threshold, left, right, default_left, leaf_value, roots,
+                 tree_group, base_margin, classes, mean, scale, objective=None):
+        self.kind = kind
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.base_margin = base_margin
+        self.classes = classes
+        self.mean = mean
+        self.scale = scale
+        self.objective = objective
+        self.max_depth = _max_depth(feature, left, right, roots)
+        self.split_feature = np.maximum(feature, 0)
+        # children[node, go_left] is the next node
+        self.children = np.stack([right, left], axis=1)
+        # (n_trees, n_groups) 0/1 matrix summing leaf margins per output group
+        self.group_matrix = np.zeros((len(roots), len(base_margin)))
+        self.group_matrix[np.arange(len(roots)), tree_group] = 1.0
+
+    @classmethod
+    def from_model(cls, model, scaler=None):
+        """Convert a fitted model (and the scaler it was trained behind)."""
+        mean, scale = _scaler_params(scaler)
+        if hasattr(model, "get_booster"):
+            return cls._from_xgboost(model, mean, scale)
+        if hasattr(model, "tree_") or hasattr(model, "estimators_"):
+            return cls._from_sklearn(model, mean, scale)
+        raise ValueError(f"Unsupported model type: {type(model).__name__}")
+
+    @classmethod
+    def _from_xgboost(cls, model, mean, scale):
+        booster = model.get_booster()
+        config = json.loads(booster.save_config())
+        learner = config["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in ("binary:logistic", "multi:softprob", "multi:softmax"):
+            raise ValueError(f"Unsupported XGBoost objective: {objective}")
+        # base_score is "5E-1" or, in newer releases, "[5E-1]" / one value per class
+        base_score = [float(v) for v in learner["learner_model_param"]["base_score"].strip("[]").split(",")]
+        num_class = max(int(learner["learner_model_param"].get("num_class", 0)), 1)
+        parallel = int(config["learner"]["gradient_booster"].get("gbtree_model_param", {})
+                       .get("num_parallel_tree", 1))
+        trees_per_round = num_class * parallel
+
+        dumps = booster.get_dump(dump_format="json")
+        # XGBoost >= 2 raises AttributeError when the model was not early-stopped
+        best_iteration = getattr(model, "best_iteration", None)
+        if best_iteration is not None:
+            # predict() stops at the early-stopping round, so do the same
+            dumps = dumps[:(best_iteration + 1) * trees_per_round]
+
+        feature_names = booster.feature_names
+        nodes = []
+        roots = []
+        tree_group = []
+        for index, dump in enumerate(dumps):
+            roots.append(len(nodes))
+            tree_group.append((index // parallel) % num_class)
+            _flatten_xgboost_tree(json.loads(dump), nodes, feature_names)
+
+        if objective == "binary:logistic":
+            score = min(max(base_score[0], 1e-16), 1 - 1e-16)
+            base_margin = np.array([np.log(score / (1.0 - score))])
+        else:
+            base_margin = np.resize(np.asarray(base_score, dtype=np.float64), num_class)
+
+        return cls(
+            "xgboost",
+            feature=np.array([n[0] for n in nodes], dtype=np.int32),
+            # XGBoost compares float32 inputs against float32 split values
+            threshold=np.array([n[1] for n in nodes], dtype=np.float32),
+            left=np.array([n[2] for n in nodes], dtype=np.int32),
+            right=np.array([n[3] for n in nodes], dtype=np.int32),
+            default_left=np.array([n[4] for n in nodes], dtype=bool),
+            leaf_value=np.array([n[5] for n in nodes], dtype=np.float64)[:, None],
+            roots=np.array(roots, dtype=np.int32),
+            tree_group=np.array(tree_group, dtype=np.int32),
+            base_margin=base_margin,
+            classes=np.asarray(getattr(model, "classes_", np.arange(max(num_class, 2)))),
+            mean=mean,
+            scale=scale,
+            objective=objective
+        )
+
+    @classmethod
+    def _from_sklearn(cls, model, mean, scale):
+        estimators = list(getattr(model, "estimators_", None) or [model])
+        if not all(hasattr(est, "tree_") for est in estimators) or getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError(f"Unsupported scikit-learn model: {type(model).__name__}")
+        features, thresholds, lefts, rights, defaults, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for est in estimators:
+            tree = est.tree_
+            ids = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            features.append(np.where(leaf, -1, tree.feature))
+            thresholds.append(tree.threshold)
+            # Leaves loop back to themselves so every tree can take max_depth steps
+            lefts.append(np.where(leaf, ids, tree.children_left) + offset)
+            rights.append(np.where(leaf, ids, tree.children_right) + offset)
+            missing_left = getattr(tree, "missing_go_to_left", None)
+            defaults.append(np.asarray(missing_left, dtype=bool) if missing_left is not None
+                            else np.zeros(tree.node_count, dtype=bool))
+            value = tree.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            values.append(value / np.where(totals == 0, 1.0, totals))
+            roots.append(offset)
+            offset += tree.node_count
+        n_classes = values[0].shape[1]
+        return cls(
+            "sklearn",
+            feature=np.concatenate(features).astype(np.int32),
+            # scikit-learn compares float32 inputs against float64 thresholds
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            default_left=np.concatenate(defaults),
+            leaf_value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int32),
+            tree_group=np.zeros(len(roots), dtype=np.int32),
+            base_margin=np.zeros(n_classes),
+            classes=np.asarray(model.classes_),
+            mean=mean,
+            scale=scale
+        )
+
+    def _leaves(self, rows):
+        """Leaf node reached in every tree, shape (n_rows, n_trees)."""
+        values = np.asarray(rows, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[None, :]
+        values = ((values - self.mean) / self.scale).astype(np.float32)
+        has_nan = bool(np.isnan(values).any())
+        n_rows, n_features = values.shape
+        flat = values.ravel()
+        row_base = (np.arange(n_rows) * n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            if self.feature.take(nodes).max() < 0:
+                break
+            # Leaves read column 0, but both of their branches point back to themselves
+            x = flat.take(row_base + self.split_feature.take(nodes))
+            threshold = self.threshold.take(nodes)
+            go_left = x < threshold if self.kind == "xgboost" else x <= threshold
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.default_left.take(nodes), go_left)
+            nodes = self.children[nodes, go_left.view(np.int8)]
+        return nodes
+
+    def _scores(self, rows):
+        """Summed margins (XGBoost) or averaged class probabilities (scikit-learn)."""
+        leaves = self._leaves(rows)
+        if self.kind == "xgboost":
+            return self.leaf_value[leaves, 0] @ self.group_matrix + self.base_margin
+        if leaves.size * self.leaf_value.shape[1] <= 1 << 16:
+            return self.leaf_value[leaves].mean(axis=1)
+        # Large batches accumulate tree by tree rather than materializing (rows, trees, classes)
+        total = np.zeros((leaves.shape[0], self.leaf_value.shape[1]))
+        for tree in range(leaves.shape[1]):
+            total += self.leaf_value[leaves[:, tree]]
+        return total / leaves.shape[1]
+
+    def predict_proba(self, rows):
+        """Class probabilities for raw feature rows, columns ordered like ``classes``."""
+        scores = self._scores(rows)
+        if self.kind == "sklearn":
+            return scores
+        if self.objective == "binary:logistic":
+            positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        shifted = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return shifted / shifted.sum(axis=1, keepdims=True)
+
+    def predict(self, rows):
+        """Encoded labels for raw feature rows, as ``model.predict`` would return them."""
+        scores = self._scores(rows)
+        if self.objective == "binary:logistic":
+            return self.classes[(scores[:, 0] > 0).astype(np.intp)]
+        return self.classes[np.argmax(scores, axis=1)]
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (
+            self.feature, self.threshold, self.left, self.right, self.default_left,
+            self.leaf_value, self.roots, self.base_margin, self.classes, self.mean,
+            self.scale, self.group_matrix, self.split_feature, self.children
+        ))
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "trees": len(self.roots),
+            "nodes": len(self.feature),
+            "max_depth": self.max_depth,
+            "bytes": self.nbytes
+        }
+
+
+def _scaler_params(scaler):
+    """Mean and scale arrays of a StandardScaler (identity when there is none)."""
+    if scaler is None:
+        return np.zeros(1), np.ones(1)
+    if type(scaler).__name__ != "StandardScaler":
+        raise ValueError(f"Unsupported scaler type: {type(scaler).__name__}")
+    mean = scaler.mean_ if getattr(scaler, "with_mean", True) and scaler.mean_ is not None else np.zeros(1)
+    scale = scaler.scale_ if getattr(scaler, "with_std", True) and scaler.scale_ is not None else np.ones(1)
+    return np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+
+
+def _flatten_xgboost_tree(root, nodes, feature_names):
+    """Append one dumped tree's nodes to ``nodes`` as (feature, threshold, left, right, default_left, leaf)."""
+    offset = len(nodes)
+    by_id = {}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        by_id[node["nodeid"]] = node
+        stack.extend(node.get("children", []))
+    count = max(by_id) + 1
+    nodes.extend([(-1, 0.0, 0, 0, False, 0.0)] * count)
+    for node_id, node in by_id.items():
+        index = offset + node_id
+        if "leaf" in node:
+            nodes[index] = (-1, 0.0, index, index, False, float(node["leaf"]))
+            continue
+        if "split_condition" not in node:
+            raise ValueError("Categorical XGBoost splits are not supported")
+        split = node["split"]
+        feature = feature_names.index(split) if feature_names else int(split.lstrip("f"))
+        nodes[index] = (feature, float(node["split_condition"]), offset + node["yes"], offset + node["no"],
+                        node.get("missing", node["yes"]) == node["yes"], 0.0)
+
+
+def _max_depth(feature, left, right, roots):
+    depth = 0
+    frontier = np.unique(roots)
+    while True:
+        internal = frontier[feature[frontier] >= 0]
+        if len(internal) == 0:
+            return depth
+        depth += 1
+        frontier = np.unique(np.concatenate([left[internal], right[internal]]))
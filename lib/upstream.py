@@ -0,0 +1,280 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from lib.metrics import registry, upstream_latency
+
+# Defaults for every upstream client, overridable per client
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', '3.05'))
+UPSTREAM_READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', '30'))
+UPSTREAM_MAX_RETRIES = int(os.getenv('UPSTREAM_MAX_RETRIES', '2'))
+UPSTREAM_POOL_SIZE = int(os.getenv('UPSTREAM_POOL_SIZE', '10'))
+UPSTREAM_RETRY_BUDGET = float(os.getenv('UPSTREAM_RETRY_BUDGET', '0.1'))
+# Circuit breaker for clients created with one: consecutive failures to open, seconds before a probe
+UPSTREAM_BREAKER_FAILURES = int(os.getenv('UPSTREAM_BREAKER_FAILURES', '5'))
+UPSTREAM_BREAKER_RESET = float(os.getenv('UPSTREAM_BREAKER_RESET', '30'))
+
+# Status codes worth retrying: the upstream (or its proxy) never handled the request
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+# Methods that are safe to resend after the upstream may already have acted on them
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of overall traffic.
+
+    Every request deposits ``ratio`` tokens and every retry spends one, so
+    under a sustained outage retries cannot multiply the load on the upstream.
+    ``min_tokens`` keeps a few retries available for low-traffic periods.
+    """
+
+    def __init__(self, ratio=0.1, min_tokens=3.0, max_tokens=100.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after ``failure_threshold`` consecutive failures.
+
+    While open, calls fail immediately for ``reset_timeout`` seconds. The
+    breaker then goes half-open and lets a single probe through: success
+    closes it, failure opens it for another ``reset_timeout``. Each worker
+    process keeps its own breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        self.failure_threshold = failure_threshold if failure_threshold is not None else UPSTREAM_BREAKER_FAILURES
+        self.reset_timeout = reset_timeout if reset_timeout is not None else UPSTREAM_BREAKER_RESET
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow(self):
+        """True if a call may go out now; in half-open only one probe at a time is allowed."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats["opened"] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, state=self._current_state(), failures=self._failures)
+
+
+class UpstreamClient:
+    """Keep-alive HTTP client for one upstream service.
+
+    Wraps a pooled ``requests.Session`` with separate connect/read timeouts,
+    jittered exponential backoff on connection errors and 502/503/504
+    responses, a shared retry budget and latency counters. Non-idempotent
+    requests (POST unless ``idempotent=True``) are only retried when the
+    upstream cannot have received them: a failed connect or a 502/503, not
+    a read timeout or a 504. With a
+    ``breaker``, a call (including its retries) that ends in an exception or
+    a 5xx counts as one failure, and calls raise CircuitOpenError while the
+    breaker is open.
+    """
+
+    def __init__(self, name, connect_timeout=None, read_timeout=None, max_retries=None,
+                 backoff=0.2, pool_size=None, retry_budget=None, breaker=None):
+        self.name = name
+        self.connect_timeout = connect_timeout if connect_timeout is not None else UPSTREAM_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout if read_timeout is not None else UPSTREAM_READ_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else UPSTREAM_MAX_RETRIES
+        self.backoff = backoff
+        self.retry_budget = retry_budget or RetryBudget(UPSTREAM_RETRY_BUDGET)
+        self.breaker = breaker
+
+        pool_size = pool_size or UPSTREAM_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "retries": 0,
+            "retries_denied": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "last_ms": 0.0,
+        }
+
+    def post(self, url, json=None, timeout=None, **kwargs):
+        return self.request('POST', url, json=json, timeout=timeout, **kwargs)
+
+    def get(self, url, timeout=None, **kwargs):
+        return self.request('GET', url, timeout=timeout, **kwargs)
+
+    def request(self, method, url, timeout=None, idempotent=None, **kwargs):
+        """Send a request, retrying transient failures while the budget allows."""
+        timeout = timeout or (self.connect_timeout, self.read_timeout)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        # ConnectTimeout is a ConnectionError; ReadTimeout means the request was sent
+        retryable_errors = (requests.exceptions.ConnectionError, requests.exceptions.Timeout) if idempotent \
+            else requests.exceptions.ConnectionError
+        retryable_statuses = RETRYABLE_STATUS_CODES if idempotent else RETRYABLE_STATUS_CODES - {504}
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+        self.retry_budget.deposit()
+        attempt = 0
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            while True:
+                try:
+                    response = self.session.request(method, url, timeout=timeout, **kwargs)
+                    if response.status_code not in retryable_statuses or not self._may_retry(attempt):
+                        outcome = f"{response.status_code // 100}xx"
+                        if self.breaker is not None:
+                            if response.status_code >= 500:
+                                self.breaker.record_failure()
+                            else:
+                                self.breaker.record_success()
+                        return response
+                    # Release the connection back to the pool before retrying
+                    response.close()
+                except retryable_errors:
+                    if not self._may_retry(attempt):
+                        raise
+                attempt += 1
+                # Full jitter keeps retries from many workers from synchronizing
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+        finally:
+            self._record(start, outcome)
+
+    def _may_retry(self, attempt):
+        if attempt >= self.max_retries:
+            return False
+        if not self.retry_budget.try_spend():
+            with self._lock:
+                self._stats["retries_denied"] += 1
+            return False
+        with self._lock:
+            self._stats["retries"] += 1
+        return True
+
+    def _record(self, start, outcome):
+        elapsed = time.perf_counter() - start
+        upstream_latency.observe(elapsed, self.name, outcome)
+        elapsed_ms = elapsed * 1000.0
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["total_ms"] += elapsed_ms
+            self._stats["last_ms"] = elapsed_ms
+            if elapsed_ms > self._stats["max_ms"]:
+                self._stats["max_ms"] = elapsed_ms
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_ms"] = round(stats["total_ms"] / stats["requests"], 2) if stats["requests"] else 0.0
+        if self.breaker is not None:
+            stats["breaker"] = self.breaker.stats()
+        return stats
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_upstream(name, **kwargs):
+    """Return the shared client for ``name``, creating it on first use."""
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = UpstreamClient(name, **kwargs)
+        return _clients[name]
+
+def upstream_stats():
+    """Latency and retry counters for every upstream client, keyed by name."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.name: client.stats() for client in clients}
+
+def collect_upstream_metrics():
+    """Retry and circuit breaker counters for /metrics; latencies are recorded per call."""
+    retries, denied, breaker_open, opened, rejected = [], [], [], [], []
+    for name, stats in upstream_stats().items():
+        retries.append(({"upstream": name}, stats["retries"]))
+        denied.append(({"upstream": name}, stats["retries_denied"]))
+        breaker = stats.get("breaker")
+        if breaker is not None:
+            breaker_open.append(({"upstream": name}, 0 if breaker["state"] == CircuitBreaker.CLOSED else 1))
+            opened.append(({"upstream": name}, breaker["opened"]))
+            rejected.append(({"upstream": name}, breaker["rejected"]))
+    return [
+        ("upstream_retries_total", "counter", "Retried upstream attempts.", retries),
+        ("upstream_retries_denied_total", "counter", "Retries skipped because the retry budget was spent.", denied),
+        ("upstream_circuit_open", "gauge", "1 while the circuit breaker is open or half-open.", breaker_open),
+        ("upstream_circuit_opened_total", "counter", "Times the circuit breaker opened.", opened),
+        ("upstream_circuit_rejected_total", "counter", "Calls refused by an open circuit breaker.", rejected),
+    ]
+
+registry.register_collector(collect_upstream_metrics)
@@ -0,0 +1,226 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Where rows go: "supabase", "sqlite" (local stand-in database) or "none"
+PERSISTENCE_BACKEND = os.getenv('PERSISTENCE_BACKEND', 'none').lower()
+PERSISTENCE_SQLITE_PATH = os.getenv('PERSISTENCE_SQLITE_PATH', 'cache/persistence.sqlite3')
+PERSISTENCE_BATCH_SIZE = int(os.getenv('PERSISTENCE_BATCH_SIZE', '100'))
+PERSISTENCE_FLUSH_INTERVAL = float(os.getenv('PERSISTENCE_FLUSH_INTERVAL', '2'))
+PERSISTENCE_MAX_QUEUE = int(os.getenv('PERSISTENCE_MAX_QUEUE', '10000'))
+PERSISTENCE_ENQUEUE_TIMEOUT = float(os.getenv('PERSISTENCE_ENQUEUE_TIMEOUT', '0.05'))
+
+
+class SupabaseSink:
+    """Bulk-inserts rows into Supabase tables."""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    def __call__(self, table, rows):
+        if self._client is None:
+            # Imported lazily: lib.supabase connects at import time
+            from lib.supabase import supabase
+            self._client = supabase
+        self._client.table(table).insert(rows).execute()
+
+
+class SQLiteSink:
+    """Local stand-in for Supabase: inserts rows into SQLite tables created on demand."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._columns = {}
+
+    def _connection(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Only the flush thread writes, so a single connection is enough
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        return self._conn
+
+    def __call__(self, table, rows):
+        conn = self._connection()
+        columns = sorted({column for row in rows for column in row})
+        known = self._columns.setdefault(table, set())
+        if not known:
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (created_at REAL DEFAULT (julianday(\'now\')))')
+            known.update(row[1] for row in conn.execute(f'PRAGMA table_info("{table}")'))
+        for column in columns:
+            if column not in known:
+                conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+                known.add(column)
+        placeholders = ", ".join("?" for _ in columns)
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        with conn:
+            conn.executemany(f'INSERT INTO "{table}" ({quoted}) VALUES ({placeholders})',
+                             [tuple(row.get(column) for column in columns) for row in rows])
+
+
+class WriteBehindQueue:
+    """Buffers rows in memory and flushes them to ``sink(table, rows)`` in bulk.
+
+    A background thread flushes once ``batch_size`` rows are waiting or every
+    ``flush_interval`` seconds. The queue holds at most ``max_queue`` rows.
+    When it is full, ``enqueue`` waits up to ``enqueue_timeout`` seconds
+    (backpressure) and then drops the row rather than stall the request.
+    When a bulk insert fails, the batch is retried row by row so a single
+    bad row (a failed constraint, say) loses only itself; rows that still
+    fail are counted as ``failed``. ``close`` drains everything still queued.
+    """
+
+    def __init__(self, sink, batch_size=100, flush_interval=2.0, max_queue=10000, enqueue_timeout=0.05):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "flushes": 0, "errors": 0}
+
+    def _ensure_started(self):
+        # Started lazily so each gunicorn worker gets its own flush thread after fork
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._thread.start()
+
+    def enqueue(self, table, row):
+        """Queue one row for ``table``; returns False if it had to be dropped."""
+        if self._closed:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put((table, row), timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            return False
+        with self._lock:
+            self._stats["enqueued"] += 1
+        return True
+
+    def _take_batch(self, timeout):
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                batch.append(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _write(self, items):
+        by_table = {}
+        for table, row in items:
+            by_table.setdefault(table, []).append(row)
+        for table, rows in by_table.items():
+            try:
+                self.sink(table, rows)
+                with self._lock:
+                    self._stats["written"] += len(rows)
+            except Exception as e:
+                logger.error(f"Write-behind flush to {table} failed ({len(rows)} rows): {str(e)}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                if len(rows) > 1:
+                    self._write_rows(table, rows)
+                else:
+                    with self._lock:
+                        self._stats["failed"] += 1
+        with self._lock:
+            self._stats["flushes"] += 1
+
+    def _write_rows(self, table, rows):
+        written = failed = 0
+        for row in rows:
+            try:
+                self.sink(table, [row])
+                written += 1
+            except Exception as e:
+                logger.warning(f"Write-behind dropped a row for {table}: {str(e)}")
+                failed += 1
+        with self._lock:
+            self._stats["written"] += written
+            self._stats["failed"] += failed
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(self.flush_interval)
+            stop = bool(batch) and batch[-1] is None
+            items = [item for item in batch if item is not None]
+            if items:
+                self._write(items)
+            if stop:
+                return
+
+    def close(self, timeout=10.0):
+        """Stop accepting rows and flush everything still queued."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        return stats
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def build_sink(backend=None):
+    backend = backend or PERSISTENCE_BACKEND
+    if backend == 'supabase':
+        return SupabaseSink()
+    if backend == 'sqlite':
+        return SQLiteSink(PERSISTENCE_SQLITE_PATH)
+    return None
+
+def get_write_behind():
+    """Shared write-behind queue for this process, or None if persistence is disabled."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                sink = build_sink()
+                if sink is None:
+                    return None
+                _writer = WriteBehindQueue(
+                    sink,
+                    batch_size=PERSISTENCE_BATCH_SIZE,
+                    flush_interval=PERSISTENCE_FLUSH_INTERVAL,
+                    max_queue=PERSISTENCE_MAX_QUEUE,
+                    enqueue_timeout=PERSISTENCE_ENQUEUE_TIMEOUT
+                )
+                # Drain on interpreter shutdown, including gunicorn worker exit
+                atexit.register(_writer.close)
+    return _writer
+
+def persist(table, row):
+    """Queue a row for ``table`` if persistence is enabled."""
+    writer = get_write_behind()
+    if writer is not None:
+        writer.enqueue(table, row)
@@ -1,92 +1,255 @@
 import sys
 import os
-from flask import Blueprint, request, jsonify
+import inspect
+import json
+import logging
+import time
+import uuid
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from lib.admin import admin_required
+from lib.upstream import get_upstream
+from lib.cache import SWRCache
+from lib.disk_cache import SQLiteCache, canonical_key
+from lib.fanout import fan_out
+from lib.sessions import ChatSessionStore, SupabaseChatHistory
+from lib.write_behind import get_write_behind
+from lib.metrics import register_cache
+from lib.career_catalog import career_catalog
+from routes.recommendations import career_resolver, catalog_response
 
 # Add recommender-ai to the system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../recommender-ai')))
 
 from chatbot import CareerChatbot
 from gpt_chatbot import handle_chat
+try:
+    # Yields reply fragments as they are generated, if the AI repo provides it
+    from gpt_chatbot import handle_chat_stream
+except ImportError:
+    handle_chat_stream = None
 from career_roadmap import generate_career_roadmap
 from university_summaries import university_summary_generator
 from alternative_careers import AlternativeCareersAnalyzer
 
 chatbot = Blueprint('chatbot', __name__)
+logger = logging.getLogger(__name__)
 career_chatbot = CareerChatbot()
 alternative_careers_analyzer = AlternativeCareersAnalyzer()
 
-@chatbot.route('/api/chatbot-recommend', methods=['POST'])
-def chatbot_recommend():
-    data = request.json
-    career = data.get('career')
+# Bounded pool for /api/analyze-careers so one request cannot flood the analyzer's backend
+ANALYZE_CAREERS_MAX_WORKERS = int(os.getenv('ANALYZE_CAREERS_MAX_WORKERS', '4'))
+ANALYZE_CAREER_TIMEOUT = float(os.getenv('ANALYZE_CAREER_TIMEOUT', '20'))
+ANALYZE_CAREERS_DEADLINE = float(os.getenv('ANALYZE_CAREERS_DEADLINE', '30'))
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYZE_CAREERS_MAX_WORKERS,
+                                       thread_name_prefix="analyze-careers")
 
-    if not career:
-        return jsonify({"error": "Missing career"}), 400
+# Bounded chat session store. Turns are queued for bulk insert into chat_history
+# when write-behind persistence is enabled; CHAT_SESSION_PERSIST also restores
+# evicted sessions from the table. The window is passed to chat handlers that
+# take a ``history`` argument (see session_context).
+CHAT_SESSION_MAX = int(os.getenv('CHAT_SESSION_MAX', '10000'))
+CHAT_SESSION_WINDOW = int(os.getenv('CHAT_SESSION_WINDOW', '20'))
+CHAT_SESSION_IDLE_TIMEOUT = float(os.getenv('CHAT_SESSION_IDLE_TIMEOUT', '1800'))
+CHAT_SESSION_PERSIST = os.getenv('CHAT_SESSION_PERSIST', 'false').lower() == 'true'
 
-    similar_careers = alternative_careers_analyzer.get_similar_careers(career)
-    
-    return jsonify({
-        "similar_careers": similar_careers[:5]  # Limit to top 5 alternatives
+persistence_writer = get_write_behind()
+
+chat_sessions = ChatSessionStore(
+    max_sessions=CHAT_SESSION_MAX,
+    window=CHAT_SESSION_WINDOW,
+    idle_timeout=CHAT_SESSION_IDLE_TIMEOUT,
+    backend=(SupabaseChatHistory(writer=persistence_writer, restore=CHAT_SESSION_PERSIST)
+             if CHAT_SESSION_PERSIST or persistence_writer is not None else None)
+)
+
+# Career details are generated by GPT on the AI service and can take a while
+AI_CAREER_DETAILS_URL = os.getenv('AI_CAREER_DETAILS_URL', 'http://localhost:5001/career-details')
+career_details_service = get_upstream('ai-career-details', read_timeout=60)
+
+# Generated career details are stable per career, so serve them stale-while-revalidate
+CAREER_DETAILS_CACHE_TTL = float(os.getenv('CAREER_DETAILS_CACHE_TTL', '21600'))
+CAREER_DETAILS_STALE_TTL = float(os.getenv('CAREER_DETAILS_STALE_TTL', '86400'))
+CAREER_DETAILS_CACHE_SIZE = int(os.getenv('CAREER_DETAILS_CACHE_SIZE', '512'))
+
+career_details_cache = SWRCache(
+    ttl=CAREER_DETAILS_CACHE_TTL,
+    stale_ttl=CAREER_DETAILS_STALE_TTL,
+    max_size=CAREER_DETAILS_CACHE_SIZE,
+    cacheable=lambda result: result.get('success', True) is not False
+)
+register_cache('career_details', career_details_cache)
+
+# Roadmaps and university summaries are memoized on disk, shared by all workers
+GENERATION_CACHE_PATH = os.getenv(
+    'GENERATION_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'generation_cache.sqlite3')
+)
+GENERATION_CACHE_TTL = float(os.getenv('GENERATION_CACHE_TTL', str(7 * 24 * 3600)))
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv('GENERATION_CACHE_MAX_ENTRIES', '20000'))
+GENERATION_CACHE_MAX_MB = float(os.getenv('GENERATION_CACHE_MAX_MB', '200'))
+# Bucket widths so near-identical grades share a cache entry
+GENERATION_GPA_BUCKET = float(os.getenv('GENERATION_GPA_BUCKET', '0.25'))
+GENERATION_SCORE_BUCKET = float(os.getenv('GENERATION_SCORE_BUCKET', '5'))
+
+generation_cache = SQLiteCache(
+    GENERATION_CACHE_PATH,
+    ttl=GENERATION_CACHE_TTL,
+    max_entries=GENERATION_CACHE_MAX_ENTRIES,
+    max_bytes=int(GENERATION_CACHE_MAX_MB * 1024 * 1024)
+)
+register_cache('generation', generation_cache)
+
+def bucket_value(value, width):
+    """Round a numeric value down to its bucket; non-numeric values are normalized strings."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return str(value).strip().upper() if value is not None else None
+    return round((number // width) * width, 4)
+
+def roadmap_cache_key(career, subject_grades, gpa):
+    grades = subject_grades if isinstance(subject_grades, dict) else {}
+    return canonical_key('roadmap', {
+        "career": career.strip().casefold(),
+        "subject_grades": {str(subject).strip().lower(): bucket_value(grade, GENERATION_SCORE_BUCKET)
+                           for subject, grade in grades.items()},
+        "gpa": bucket_value(gpa, GENERATION_GPA_BUCKET)
+    })
+
+def university_summary_cache_key(university_name, additional_info):
+    return canonical_key('university-summary', {
+        "university": university_name.strip().casefold(),
+        "additional_info": additional_info
     })
 
+def is_successful(result):
+    return not (isinstance(result, dict) and result.get('success') is False)
+
+def fetch_career_details(career):
+    """Ask the AI service to generate details for a career."""
+    logger.debug("Forwarding career details request to AI service", extra={"career": career})
+    response = career_details_service.post(
+        AI_CAREER_DETAILS_URL,
+        json={"career": career}
+    )
+    response.raise_for_status()
+    result = response.json()
+    logger.debug("Received career details from AI service", extra={"success": result.get('success', False)})
+    return result
+
+def get_cached_career_details(career):
+    """Career details from the cache, calling the AI service at most once per career."""
+    key = career.strip().casefold()
+    return career_details_cache.get_or_load(key, lambda: fetch_career_details(career))
+
+def career_details_body(career):
+    """Details for a career as /api/career-details serves them.
+
+    Catalog careers, and any career the AI service fails on, get the
+    pre-encoded catalog bytes; the rest get the AI service's (cached) dict.
+    """
+    # Catalog careers are served pre-encoded; only the rest go to the AI service
+    if career in career_catalog:
+        return career_catalog.details_for(career)[0]
+    try:
+        return get_cached_career_details(career)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to get career details, using generic details: {str(e)}")
+        return career_catalog.details_for(career)[0]
+
+def career_roadmap_body(career, subject_grades, gpa):
+    """Roadmap for a career as /api/career-roadmap serves it: generated and memoized, or the template bytes."""
+    try:
+        # Memoized on disk per career and bucketed grades, shared by all workers
+        result = generation_cache.get_or_compute(
+            roadmap_cache_key(career, subject_grades, gpa),
+            lambda: generate_career_roadmap(career, subject_grades, gpa),
+            cacheable=is_successful
+        )
+    except Exception as e:
+        logger.error(f"Failed to generate career roadmap: {str(e)}")
+        result = None
+    if not isinstance(result, dict) or not is_successful(result):
+        # The pre-encoded template roadmap keeps the page usable when generation fails
+        return career_catalog.roadmap_for(career)
+    return result
+
+def body_response(body):
+    return catalog_response(body) if isinstance(body, bytes) else jsonify(body)
+
+def analyze_career_matches(careers, academic_scores, predicted_career, deadline=None):
+    """Analyze careers in parallel, best match first.
+
+    Careers that miss their deadline go last with ``timed_out`` set. Tasks
+    are keyed by position, so a career listed twice gets two entries.
+    Returns ``(analyzed_careers, partial)``.
+    """
+    results = fan_out(
+        analysis_executor,
+        {index: (lambda career=career: alternative_careers_analyzer.analyze_career_match(
+            career,
+            academic_scores,
+            predicted_career
+        )) for index, career in enumerate(careers)},
+        task_timeout=ANALYZE_CAREER_TIMEOUT,
+        overall_timeout=ANALYZE_CAREERS_DEADLINE if deadline is None else deadline
+    )
+
+    analyzed_careers = []
+    timed_out = []
+    for index, result in results.items():
+        career = careers[index]
+        if result.timed_out:
+            timed_out.append({"career": career, "matching_score": None, "timed_out": True})
+            continue
+        if result.error is not None:
+            raise result.error
+        analysis = result.value
+        analyzed_careers.append({
+            "career": career,
+            "matching_score": analysis["matching_score"],
+            "explanation": analysis["explanation"],
+            "key_skills": analysis["key_skills"],
+            "timed_out": False
+        })
+
+    # Sort by matching score; careers that missed their deadline go last
+    analyzed_careers.sort(key=lambda x: x["matching_score"], reverse=True)
+    if timed_out:
+        logger.warning("Career analysis timed out", extra={"careers": [entry['career'] for entry in timed_out]})
+    return analyzed_careers + timed_out, bool(timed_out)
+
 @chatbot.route('/api/analyze-careers', methods=['POST'])
 def analyze_careers():
     data = request.json
     careers = data.get('careers', [])
+    if isinstance(careers, list):
+        careers = [career_resolver.resolve(career) for career in careers]
     academic_scores = data.get('academic_scores', {})
-    predicted_career = data.get('predicted_career')
+    predicted_career = career_resolver.resolve(data.get('predicted_career'))
 
     if not careers or not academic_scores or not predicted_career:
         return jsonify({"error": "Missing required data"}), 400
 
     try:
-        analyzed_careers = []
-        for career in careers:
-            analysis = alternative_careers_analyzer.analyze_career_match(
-                career, 
-                academic_scores, 
-                predicted_career
-            )
-            analyzed_careers.append({
-                "career": career,
-                "matching_score": analysis["matching_score"],
-                "explanation": analysis["explanation"],
-                "key_skills": analysis["key_skills"]
-            })
-
-        # Sort by matching score
-        analyzed_careers.sort(key=lambda x: x["matching_score"], reverse=True)
-        
+        analyzed_careers, partial = analyze_career_matches(careers, academic_scores, predicted_career)
         return jsonify({
             "success": True,
-            "analyzed_careers": analyzed_careers
+            "analyzed_careers": analyzed_careers,
+            "partial": partial
         })
     except Exception as e:
         error_msg = f"Failed to analyze careers: {str(e)}"
-        print(f"Error: {error_msg}")
+        logger.error(error_msg)
         return jsonify({"error": error_msg, "success": False}), 500
 
-@chatbot.route('/api/chat', methods=['POST'])
-def chat():
-
-sys.path.append('recommender-ai')
-
-from chatbot import CareerChatbot
-from gpt_chatbot import handle_chat
-
-chatbot = Blueprint('chatbot', __name__)
-career_chatbot = CareerChatbot()
-
-@chatbot.route('/api/chatbot-recommend', methods=['POST', 'OPTIONS'])
+@chatbot.route('/api/chatbot-recommend', methods=['POST'])
 def chatbot_recommend():
-    # Handle OPTIONS requests for CORS preflight
-    if request.method == 'OPTIONS':
-        return '', 200
-        
     data = request.json
     gpa = data.get('gpa')
-    career = data.get('career')
+    career = career_resolver.resolve(data.get('career'))
 
     if not gpa or not career:
         return jsonify({"error": "Missing GPA or career"}), 400
@@ -98,74 +261,122 @@ def chatbot_recommend():
         "similar_careers": similar_careers
     })
 
-@chatbot.route('/api/chat', methods=['POST', 'OPTIONS'])
+def session_context(handler, session_id):
+    """``{"history": turns}`` for a chat handler that takes the session window, else ``{}``.
+
+    Handlers without a ``history`` parameter keep their own state per
+    session_id; for them the store is a bounded, persisted transcript only.
+    """
+    try:
+        takes_history = 'history' in inspect.signature(handler).parameters
+    except (TypeError, ValueError):
+        takes_history = False
+    return {"history": chat_sessions.history(session_id)} if takes_history else {}
+
+@chatbot.route('/api/chat', methods=['POST'])
 def chat():
-    # Handle OPTIONS requests for CORS preflight
-    if request.method == 'OPTIONS':
-        return '', 200
-        
     data = request.json
     message = data.get('message')
-    career = data.get('career')
+    career = career_resolver.resolve(data.get('career'))
     gpa = data.get('gpa')
     subject_grades = data.get('subject_grades', {})
-    session_id = data.get('session_id', 'default')
+    # Anonymous users get their own session instead of sharing 'default'
+    session_id = data.get('session_id') or uuid.uuid4().hex
     
     if not message:
         return jsonify({"error": "Missing message"}), 400
+
+    # Stream fragments as Server-Sent Events when the client asks for it
+    if data.get('stream') or request.accept_mimetypes.best == 'text/event-stream':
+        return stream_chat(message, career, gpa, subject_grades, session_id)
     
     # Call the handle_chat function with all parameters including subject_grades
-    response = handle_chat(message, career, gpa, subject_grades, session_id)
+    response = handle_chat(message, career, gpa, subject_grades, session_id,
+                           **session_context(handle_chat, session_id))
+    chat_sessions.append(session_id, message, response)
     
-    return jsonify({"response": response})
+    return jsonify({"response": response, "session_id": session_id})
+
+# Transcripts are readable by operators only: session IDs are not bound to a caller
+@chatbot.route('/api/chat/history/<session_id>', methods=['GET'])
+@admin_required
+def chat_history(session_id):
+    return jsonify({"session_id": session_id, "history": chat_sessions.history(session_id)})
+
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def chat_fragments(message, career, gpa, subject_grades, session_id):
+    """Reply fragments from the streaming chat handler, or the whole reply as one fragment."""
+    if handle_chat_stream is not None:
+        return handle_chat_stream(message, career, gpa, subject_grades, session_id,
+                                  **session_context(handle_chat_stream, session_id))
+    return iter([handle_chat(message, career, gpa, subject_grades, session_id,
+                             **session_context(handle_chat, session_id))])
+
+def stream_chat(message, career, gpa, subject_grades, session_id):
+    """Server-Sent Events response: one ``chunk`` event per fragment, then ``done``.
+
+    The ``done`` event carries the full reply plus time-to-first-byte and total
+    generation time, so both can be tracked separately.
+    """
+    def generate():
+        start = time.perf_counter()
+        ttfb_ms = None
+        parts = []
+        try:
+            for fragment in chat_fragments(message, career, gpa, subject_grades, session_id):
+                if not fragment:
+                    continue
+                if ttfb_ms is None:
+                    ttfb_ms = (time.perf_counter() - start) * 1000.0
+                parts.append(fragment)
+                yield sse_event("chunk", {"delta": fragment})
+        except Exception as e:
+            logger.exception("Chat stream failed")
+            yield sse_event("error", {"error": str(e)})
+            return
+        total_ms = (time.perf_counter() - start) * 1000.0
+        chat_sessions.append(session_id, message, "".join(parts))
+        logger.debug("Chat streamed", extra={"ttfb_ms": round(ttfb_ms or total_ms, 1), "total_ms": round(total_ms, 1)})
+        yield sse_event("done", {
+            "response": "".join(parts),
+            "session_id": session_id,
+            "ttfb_ms": round(ttfb_ms if ttfb_ms is not None else total_ms, 2),
+            "total_ms": round(total_ms, 2)
+        })
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop proxies (nginx, fly.io) from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
 
 @chatbot.route('/api/career-details', methods=['POST'])
 def get_career_details():
     data = request.json
-    career = data.get('career')
+    career = career_resolver.resolve(data.get('career'))
     
-    print(f"Career details requested for: {career}")
+    logger.debug("Career details requested", extra={"career": career})
 
     if not career:
         return jsonify({"error": "Missing career"}), 400
 
-    try:
-        print(f"Forwarding request to AI service for career: {career}")
-        # Forward the request to the AI service
-        response = requests.post(
-            'http://localhost:5001/career-details',
-            json={"career": career},
-            timeout=60  # Increased timeout for GPT responses
-        )
-        response.raise_for_status()
-        result = response.json()
-        print(f"Received response from AI service: {result.get('success', False)}")
-        return jsonify(result)
-    except requests.exceptions.RequestException as e:
-        error_msg = f"Failed to get career details: {str(e)}"
-        print(f"Error: {error_msg}")
-        return jsonify({"error": error_msg, "success": False}), 500
+    return body_response(career_details_body(career))
 
 @chatbot.route('/api/career-roadmap', methods=['POST'])
 def get_career_roadmap():
     data = request.json
-    career = data.get('career')
+    career = career_resolver.resolve(data.get('career'))
     subject_grades = data.get('subject_grades', {})
     gpa = data.get('gpa')
     
-    print(f"Career roadmap requested for: {career}")
+    logger.debug("Career roadmap requested", extra={"career": career})
 
     if not career:
         return jsonify({"error": "Missing career", "success": False}), 400
 
-    try:
-        # Call the generate_career_roadmap function
-        result = generate_career_roadmap(career, subject_grades, gpa)
-        return jsonify(result)
-    except Exception as e:
-        error_msg = f"Failed to generate career roadmap: {str(e)}"
-        print(f"Error: {error_msg}")
-        return jsonify({"error": error_msg, "success": False}), 500
+    return body_response(career_roadmap_body(career, subject_grades, gpa))
 
 @chatbot.route('/api/university-summary', methods=['POST'])
 def get_university_summary():
@@ -177,7 +388,10 @@ def get_university_summary():
         return jsonify({"error": "Missing university name", "success": False}), 400
 
     try:
-        summary = university_summary_generator.generate_summary(university_name, additional_info)
+        summary = generation_cache.get_or_compute(
+            university_summary_cache_key(university_name, additional_info),
+            lambda: university_summary_generator.generate_summary(university_name, additional_info)
+        )
         return jsonify({
             "success": True,
             "summary": {
@@ -190,5 +404,5 @@ def get_university_summary():
         })
     except Exception as e:
         error_msg = f"Failed to generate university summary: {str(e)}"
-        print(f"Error: {error_msg}")
+        logger.error(error_msg)
         return jsonify({"error": error_msg, "success": False}), 500
@@ -0,0 +1,128 @@
+import os
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify
+from lib.fanout import fan_out
+from routes.recommendations import PredictionError, career_resolver, predict_career
+from routes import chatbot as chatbot_routes
+
+profile = Blueprint('profile', __name__)
+logger = logging.getLogger(__name__)
+
+# One results page in one round-trip: predict, then fetch every section concurrently.
+# Each section has its own budget so a slow analyzer cannot hold up the rest. Details
+# and roadmap may call the AI service on a cache miss, so they get an upstream budget.
+PROFILE_MAX_WORKERS = int(os.getenv('PROFILE_MAX_WORKERS', '16'))
+PROFILE_DEADLINE = float(os.getenv('PROFILE_DEADLINE', '25'))
+PROFILE_SECTION_TIMEOUTS = {
+    "details": float(os.getenv('PROFILE_DETAILS_TIMEOUT', '15')),
+    "roadmap": float(os.getenv('PROFILE_ROADMAP_TIMEOUT', '15')),
+    "similar": float(os.getenv('PROFILE_SIMILAR_TIMEOUT', '10')),
+    "analysis": float(os.getenv('PROFILE_ANALYSIS_TIMEOUT', '20')),
+}
+# Why a section that needs more input than the request gave was not computed
+SKIPPED_SECTION_REASONS = {
+    "similar": "Missing gpa",
+    "analysis": "Missing gpa or careers",
+}
+profile_executor = ThreadPoolExecutor(max_workers=PROFILE_MAX_WORKERS, thread_name_prefix="career-profile")
+
+def run_once(fn):
+    """Wrap ``fn`` so concurrent callers share a single call and its result."""
+    lock = threading.Lock()
+    result = []
+
+    def wrapper():
+        with lock:
+            if not result:
+                result.append(fn())
+        return result[0]
+    return wrapper
+
+def decoded(body):
+    """A section body as a dict, whether the route helper returned pre-encoded bytes or a dict."""
+    return json.loads(body) if isinstance(body, bytes) else body
+
+def similar_careers_for(gpa, career):
+    unis, similar_careers = chatbot_routes.career_chatbot.recommend(float(gpa), career)
+    return {"recommended_universities": unis, "similar_careers": similar_careers}
+
+def career_analysis(similar, careers, scores, career):
+    # Without an explicit list, compare against the similar careers (computed once for both sections)
+    careers = careers or similar()["similar_careers"]
+    analyzed_careers, partial = chatbot_routes.analyze_career_matches(
+        careers, scores, career, deadline=PROFILE_SECTION_TIMEOUTS["analysis"]
+    )
+    return {"analyzed_careers": analyzed_careers, "partial": partial}
+
+@profile.route('/api/career-profile', methods=['POST'])
+def get_career_profile():
+    """Prediction, details, roadmap, similar careers and match analysis in one response.
+
+    Sections that fail or miss their timeout come back as null, with the reason
+    under ``errors``; ``timings_ms`` has the time spent on each section.
+    """
+    start = time.perf_counter()
+    data = request.json or {}
+    scores = data.get('scores')
+    gpa = data.get('gpa')
+    careers = data.get('careers') or []
+    subject_grades = data.get('subject_grades', {})
+
+    if not isinstance(scores, dict) or not scores:
+        return jsonify({"error": "Missing scores", "success": False}), 400
+
+    try:
+        prediction = predict_career(scores)
+    except PredictionError as e:
+        return jsonify({"error": str(e), "success": False}), e.status
+    except Exception as e:
+        logger.exception("Career profile prediction failed")
+        return jsonify({"error": str(e), "success": False}), 500
+    timings_ms = {"prediction": round((time.perf_counter() - start) * 1000.0, 2)}
+
+    career = career_resolver.resolve(data.get('career') or prediction.get('career') or prediction.get('predicted_career'))
+    if not career:
+        return jsonify({"error": "Prediction returned no career", "success": False}), 502
+    logger.debug("Building career profile", extra={"career": career})
+
+    similar = run_once(lambda: similar_careers_for(gpa, career))
+    tasks = {
+        # The same helpers, and caches, as /api/career-details and /api/career-roadmap
+        "details": lambda: decoded(chatbot_routes.career_details_body(career)),
+        "roadmap": lambda: decoded(chatbot_routes.career_roadmap_body(career, subject_grades, gpa))["data"],
+    }
+    if gpa:
+        tasks["similar"] = similar
+    if gpa or careers:
+        tasks["analysis"] = lambda: career_analysis(similar, careers, scores, career)
+
+    results = fan_out(profile_executor, tasks,
+                      task_timeout=PROFILE_SECTION_TIMEOUTS,
+                      overall_timeout=PROFILE_DEADLINE)
+
+    body = {"success": True, "career": career, "prediction": prediction}
+    errors = {}
+    for section in PROFILE_SECTION_TIMEOUTS:
+        result = results.get(section)
+        body[section] = None
+        if result is None:
+            errors[section] = SKIPPED_SECTION_REASONS[section]
+            continue
+        timings_ms[section] = round(result.elapsed_ms, 2)
+        if result.ok:
+            body[section] = result.value
+        elif result.timed_out:
+            errors[section] = "Timed out"
+        else:
+            logger.error(f"Career profile section {section} failed: {str(result.error)}")
+            errors[section] = str(result.error)
+    timings_ms["total"] = round((time.perf_counter() - start) * 1000.0, 2)
+
+    body["errors"] = errors
+    body["partial"] = bool(errors)
+    body["timings_ms"] = timings_ms
+    return jsonify(body), 200
@@ -1,31 +1,62 @@
-from flask import Blueprint, request, jsonify
-import requests
+from flask import Blueprint, Response, request, jsonify
 import os
+import sys
 import json
+import logging
+import math
+import numpy as np
+import pandas as pd
+import random
+import threading
+import time
+from lib.batching import MicroBatcher
+from lib.upstream import CircuitBreaker, get_upstream
+from lib.cache import TTLCache, MISSING
+from lib.admin import admin_required
+from lib.career_catalog import CAREER_ALIASES, career_catalog
+from lib.career_index import CareerResolver
+from lib.write_behind import persist
+from lib.models import rss_mb
+from lib.model_registry import ModelRegistry
+from lib.tree_engine import TreeEnsemble
+from lib.metrics import inference_latency, register_cache, registry
+from lib.log import log_payload
+
+# Add the recommender-ai directory to the Python path
+sys.path.append('recommender-ai')
 
 recommendation = Blueprint('recommendation', __name__)
+logger = logging.getLogger(__name__)
 
 # Get AI service URL from environment variable or use local development URL
 AI_API_URL = os.getenv('AI_SERVICE_URL', 'http://localhost:5001/predict')
 
-@recommendation.route('/api/predict', methods=['POST'])
-def get_prediction():
+# Shared keep-alive client for the AI prediction service; the breaker stops
+# calls to it after repeated failures and probes it again once per UPSTREAM_BREAKER_RESET
+ai_service = get_upstream('ai-predict', breaker=CircuitBreaker())
 
-import os
-import sys
-import pandas as pd
-import joblib
-import random
+# Order of inference paths for /api/predict: "local-first" (the loaded model,
+# then the AI service), "remote-first", or "local"/"remote" alone
+INFERENCE_ROUTE = os.getenv('INFERENCE_ROUTE', 'local-first').lower()
+# Answer with a random DEFAULT_CAREERS pick when every path failed, instead of a 503
+PREDICTION_RANDOM_FALLBACK = os.getenv('PREDICTION_RANDOM_FALLBACK', 'true').lower() == 'true'
 
-# Add the recommender-ai directory to the Python path
-sys.path.append('recommender-ai')
-
-recommendation = Blueprint('recommendation', __name__)
+inference_served = registry.counter(
+    "predictions_served_total", "Predictions by the path that answered them.", ("path",))
+prediction_fallbacks = registry.counter(
+    "prediction_fallbacks_total", "Random fallback predictions, by why no path answered.", ("reason",))
 
-# Define global variables
-model = None
-scaler = None
-label_encoder = None
+# "eager" loads the artifacts at import, which with gunicorn's preload_app happens
+# once in the master so forked workers share the pages; "lazy" waits for first use
+MODEL_LOADING = os.getenv('MODEL_LOADING', 'eager').lower()
+# "r" memory-maps the NumPy arrays inside the pickles instead of copying them
+MODEL_MMAP_MODE = os.getenv('MODEL_MMAP_MODE') or None
+# Watch <model dir>/versions/ for new artifact sets and swap them in without a restart
+MODEL_HOT_RELOAD = os.getenv('MODEL_HOT_RELOAD', 'true').lower() == 'true'
+MODEL_RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', '30'))
+# "sklearn" runs the pickled model as-is; "native" converts it (and the scaler)
+# into lib.tree_engine's NumPy arrays, skipping the library call overhead
+INFERENCE_ENGINE = os.getenv('INFERENCE_ENGINE', 'sklearn').lower()
 
 # Load model directly instead of making HTTP requests
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -36,48 +67,63 @@ possible_model_dirs = [
     os.path.join(base_dir, "recommender-models"),  # Docker container path
     os.path.join(base_dir, "recommender-models-main"),  # Local development path
 ]
+if os.getenv('MODEL_DIR'):
+    possible_model_dirs.insert(0, os.path.join(base_dir, os.getenv('MODEL_DIR')))
 
-# Try to find models in one of the possible directories
-model_dir = None
-for dir_path in possible_model_dirs:
-    print(f"Checking for models in: {dir_path}")
-    if os.path.exists(dir_path):
-        try:
-            # Check if the directory contains model files
-            model_files = [f for f in os.listdir(dir_path) if f.endswith('.pkl')]
-            if model_files:
-                model_dir = dir_path
-                print(f"✅ Found models in: {model_dir}")
-                print(f"Model files: {model_files}")
-                break
-        except Exception as e:
-            print(f"❌ Error checking directory {dir_path}: {str(e)}")
-
-if not model_dir:
-    print("❌ Could not find a directory with model files.")
-
-# Load the models
-try:
-    if model_dir:
-        model_path = os.path.join(model_dir, "career_xgb.pkl")
-        scaler_path = os.path.join(model_dir, "scaler.pkl")
-        encoder_path = os.path.join(model_dir, "label_encoder.pkl")
-        
-        print(f"Loading model from: {model_path}")
-        model = joblib.load(model_path)
-        
-        print(f"Loading scaler from: {scaler_path}")
-        scaler = joblib.load(scaler_path)
-        
-        print(f"Loading label encoder from: {encoder_path}")
-        label_encoder = joblib.load(encoder_path)
-        
-        print("✅ Models loaded successfully")
-    else:
-        print("⚠️ No model directory found, will use fallback responses")
-except Exception as e:
-    print(f"❌ Error loading models: {str(e)}")
-    # Models will remain None if loading fails
+def build_engine(bundle):
+    """Attach a native tree engine to the bundle, keeping the library path if it cannot match it."""
+    try:
+        engine = TreeEnsemble.from_model(bundle.model, bundle.scaler)
+        # Check agreement on rows spread around the training distribution before trusting it
+        rng = np.random.RandomState(0)
+        sample = engine.mean + rng.normal(scale=2.0, size=(256, len(expected_features))) * engine.scale
+        expected = bundle.model.predict(scale_rows(sample, bundle))
+        if not np.array_equal(engine.predict(sample), np.asarray(expected)):
+            raise ValueError("native predictions differ from the model")
+    except Exception as e:
+        logger.warning(f"Native inference engine unavailable for {bundle.version}, using the model directly: {str(e)}")
+        return
+    bundle.engine = engine
+    logger.info(f"Native inference engine ready for {bundle.version}", extra={"engine": engine.stats()})
+
+def validate_bundle(bundle):
+    """Warm-up inference on a candidate bundle; raises if the artifacts do not work together."""
+    if INFERENCE_ENGINE == 'native' and bundle.engine is None:
+        build_engine(bundle)
+    start = time.perf_counter()
+    careers = predict_matrix([[0.0] * len(expected_features)], bundle)
+    if len(careers) != 1:
+        raise ValueError("Warm-up inference returned no prediction")
+    bundle.warmup_ms = round((time.perf_counter() - start) * 1000.0, 2)
+    logger.info(f"Model {bundle.version} warm-up inference took {bundle.warmup_ms}ms",
+                extra={"warmup_ms": bundle.warmup_ms, "rss_mb": rss_mb()})
+
+# The model, scaler and label encoder are swapped together as one bundle;
+# handlers take a single snapshot so in-flight requests finish on their version
+model_registry = ModelRegistry(
+    possible_model_dirs,
+    validate=validate_bundle,
+    mmap_mode=MODEL_MMAP_MODE,
+    poll_interval=MODEL_RELOAD_INTERVAL if MODEL_HOT_RELOAD else 0
+)
+
+def ensure_models_loaded():
+    model_registry.ensure_loaded()
+    if MODEL_HOT_RELOAD:
+        model_registry.start_watching()
+
+def current_models():
+    """The live ModelBundle, or None when no local artifacts are loaded."""
+    return model_registry.current()
+
+def model_careers():
+    bundle = current_models()
+    return bundle.classes if bundle is not None else None
+
+# Free-text career names -> canonical careers from the catalog and the model's label encoder,
+# so "software engineering" hits the catalog entry and the same cache keys as "Software Engineer"
+career_resolver = CareerResolver(career_catalog.names(), CAREER_ALIASES, model_names=model_careers)
+register_cache('career_names', career_resolver.cache)
 
 # Default career options for fallback
 DEFAULT_CAREERS = [
@@ -91,347 +137,463 @@ expected_features = [
     "chemistry_score", "biology_score", "english_score", "geography_score"
 ]
 
-@recommendation.route('/api/predict', methods=['POST', 'OPTIONS'])
+# Browser/CDN cache lifetime for the GET /api/careers endpoints
+CAREER_CATALOG_MAX_AGE = int(os.getenv('CAREER_CATALOG_MAX_AGE', '3600'))
+
+# Upper bound on records accepted by /api/predict/batch
+PREDICT_BATCH_MAX_SIZE = int(os.getenv('PREDICT_BATCH_MAX_SIZE', '5000'))
+# Largest k accepted by ?top_k= on /api/predict and /api/predict/batch
+PREDICT_TOP_K_MAX = int(os.getenv('PREDICT_TOP_K_MAX', '10'))
+
+# Opt-in micro-batching of concurrent /api/predict calls against the local model
+INFERENCE_BATCHING = os.getenv('INFERENCE_BATCHING', 'false').lower() == 'true'
+INFERENCE_BATCH_MAX_SIZE = int(os.getenv('INFERENCE_BATCH_MAX_SIZE', '32'))
+INFERENCE_BATCH_MAX_WAIT_MS = float(os.getenv('INFERENCE_BATCH_MAX_WAIT_MS', '5'))
+
+prediction_batcher = None
+_batcher_lock = threading.Lock()
+
+# Cache of prediction results keyed on the normalized feature vector
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '10000'))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', '3600'))
+# Decimal places scores are rounded to before keying; empty means exact values
+PREDICTION_CACHE_ROUNDING = os.getenv('PREDICTION_CACHE_ROUNDING', '')
+
+prediction_cache = TTLCache(max_size=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+register_cache('prediction', prediction_cache)
+# (local model version, AI service URL) the cached entries were computed against
+_prediction_cache_models = None
+_prediction_cache_lock = threading.Lock()
+
+def inference_paths(bundle, top_k=None):
+    """Paths to try for one prediction, in order, under INFERENCE_ROUTE."""
+    local = ['local'] if bundle is not None else []
+    if INFERENCE_ROUTE == 'local':
+        return local
+    if INFERENCE_ROUTE == 'remote':
+        return ['remote']
+    if INFERENCE_ROUTE == 'remote-first' and not top_k:
+        return ['remote'] + local
+    # Top-k needs local probabilities, so it always starts locally
+    return local + ['remote']
+
+def serving_version(bundle, top_k=None):
+    """Version of whatever normally answers /api/predict: the local model or the AI service."""
+    paths = inference_paths(bundle, top_k)
+    if not paths:
+        return "none"
+    if paths[0] == 'local':
+        return f"local:{bundle.version}"
+    return f"remote:{AI_API_URL}"
+
+def prediction_cache_key(row, bundle, top_k=None):
+    """Cache key for a feature row under the version that serves it.
+
+    The cache is flushed when the local model or the AI service URL changes,
+    not when requests alternate between paths (top-k and plain under
+    remote-first); the serving version in the key keeps those apart.
+    """
+    global _prediction_cache_models
+    models = (bundle.version if bundle is not None else None, AI_API_URL)
+    if models != _prediction_cache_models:
+        with _prediction_cache_lock:
+            if models != _prediction_cache_models:
+                prediction_cache.clear()
+                _prediction_cache_models = models
+    version = serving_version(bundle, top_k)
+    if PREDICTION_CACHE_ROUNDING:
+        row = [round(value, int(PREDICTION_CACHE_ROUNDING)) for value in row]
+    if top_k:
+        return (version, tuple(row), f"top{top_k}")
+    return (version, tuple(row))
+
+def record_recommendation(result):
+    """Queue a career_recommendations row for write-behind persistence.
+
+    Rows are anonymous: /predict does not authenticate callers, so a
+    ``user_id`` in the body could attribute recommendations to anyone.
+    """
+    career = result.get('career') or result.get('predicted_career')
+    if not career:
+        return
+    persist('career_recommendations', {"recommended_career": career, "confidence_score": result.get('confidence')})
+
+def get_prediction_batcher():
+    """Create the micro-batcher on first use so each gunicorn worker owns its thread."""
+    global prediction_batcher
+    if prediction_batcher is None:
+        with _batcher_lock:
+            if prediction_batcher is None:
+                prediction_batcher = MicroBatcher(
+                    predict_with_version,
+                    max_batch_size=INFERENCE_BATCH_MAX_SIZE,
+                    max_wait_ms=INFERENCE_BATCH_MAX_WAIT_MS
+                )
+    return prediction_batcher
+
+class PredictionError(Exception):
+    """A prediction that failed with a specific HTTP status."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+def predict_locally(data, row, bundle, top_k=None):
+    """Predict on the local model, through the micro-batcher when it is enabled."""
+    if row is None:
+        raise PredictionError("Invalid score values", 400)
+    if top_k:
+        ranked = predict_top_k([row], top_k, bundle)[0]
+        return {"career": ranked[0]["career"], "confidence": ranked[0]["confidence"],
+                "predictions": ranked, "model_version": bundle.version}
+    if INFERENCE_BATCHING:
+        career, version = get_prediction_batcher().submit(row, timeout=10)
+    else:
+        career, version = predict_matrix([row], bundle)[0], bundle.version
+    return {"career": str(career), "model_version": version}
+
+def predict_remotely(data):
+    """Ask the AI service; 4xx answers are the caller's fault and raise PredictionError."""
+    ai_response = ai_service.post(AI_API_URL, json=data)
+
+    if ai_response.status_code != 200:
+        if 400 <= ai_response.status_code < 500:
+            raise PredictionError(f"AI service returned status code {ai_response.status_code}",
+                                  ai_response.status_code)
+        raise RuntimeError(f"AI service returned status code {ai_response.status_code}")
+
+    # Try to parse the JSON response safely
+    try:
+        ai_result = ai_response.json()
+    except json.JSONDecodeError as e:
+        logger.error("Invalid JSON response from AI service", extra={"body": ai_response.text[:500]})
+        raise RuntimeError(f"Invalid JSON response from AI service: {str(e)}")
+    if not isinstance(ai_result, dict):
+        raise RuntimeError("AI service returned a non-object prediction")
+
+    # Sampled DEBUG line; LOG_LEVELS=routes.recommendations=DEBUG turns it on
+    logger.debug("AI predicted career", extra={"result": ai_result})
+    ai_result.setdefault("model_version", "remote")
+    return ai_result
+
+def predict_career(data, top_k=None):
+    """Predict a career for one /api/predict body, via the cache and the INFERENCE_ROUTE paths.
+
+    Each path (the local model, the AI service behind its circuit breaker)
+    is tried in turn; ``served_by`` in the result names the one that
+    answered. A random DEFAULT_CAREERS pick is the last resort when every
+    path failed, and is never cached. With ``top_k`` and a local model, the
+    result also carries the ``top_k`` most likely careers with their
+    probabilities. Raises PredictionError for invalid input.
+    """
+    ensure_models_loaded()
+    bundle = current_models()
+    if bundle is None:
+        # Only the local model exposes probabilities
+        top_k = None
+    paths = inference_paths(bundle, top_k)
+
+    # Serve repeated score sets from the prediction cache
+    try:
+        row = build_feature_row(data)
+    except ValueError:
+        row = None
+    cache_key = prediction_cache_key(row, bundle, top_k) if row is not None else None
+    if cache_key is not None:
+        cached = prediction_cache.get(cache_key)
+        if cached is not MISSING:
+            # Every served recommendation is persisted, cached or not
+            record_recommendation(cached)
+            return cached
+
+    errors = {}
+    for path in paths:
+        try:
+            if path == 'local':
+                result = predict_locally(data, row, bundle, top_k)
+            else:
+                result = predict_remotely(data)
+        except PredictionError:
+            raise
+        except Exception as e:
+            logger.warning(f"{path.capitalize()} inference failed: {str(e)}")
+            errors[path] = str(e)
+            continue
+        result["served_by"] = path
+        inference_served.inc(path)
+        logger.debug("Predicted career", extra={"result": result})
+        # Only the primary path's answers are cached, so a fallback cannot outlive the outage
+        if cache_key is not None and path == paths[0]:
+            prediction_cache.set(cache_key, result)
+        record_recommendation(result)
+        return result
+
+    if not PREDICTION_RANDOM_FALLBACK:
+        raise PredictionError("No inference path is available", 503)
+    reason = "error" if errors else "unavailable"
+    inference_served.inc('fallback')
+    prediction_fallbacks.inc(reason)
+    logger.warning("Using random fallback career", extra={"reason": reason, "errors": errors})
+    return {
+        "career": random.choice(DEFAULT_CAREERS),
+        "model_version": None,
+        "served_by": "fallback",
+        "note": "Using fallback response - no inference path is available"
+    }
+
+@recommendation.route('/api/predict', methods=['POST'])
 def get_prediction():
-    # Handle OPTIONS requests for CORS preflight
-    if request.method == 'OPTIONS':
-        return '', 200
-        
     try:
         # Receive the user's input from the frontend
         data = request.json
-        print("\n✅ User Input Received:", data)
-
-        # send the data to the AI model
-        ai_response = requests.post(AI_API_URL, json=data)
-        
-        # Check if the response status code is successful
-        if ai_response.status_code != 200:
-            return jsonify({"error": f"AI service returned status code {ai_response.status_code}"}), ai_response.status_code
-            
-        # Try to parse the JSON response safely
-        try:
-            ai_result = ai_response.json()
-        except json.JSONDecodeError as e:
-            print("❌ Invalid JSON response from AI service:", ai_response.text)
-            return jsonify({"error": f"Invalid JSON response from AI service: {str(e)}"}), 500
-
-        # Added for debugging - important for now, please leave it like this
-        print("🎯 AI Predicted Career:", ai_result)
+        log_payload(logger, "Prediction request", data)
 
-        return jsonify(ai_result), 200
+        return jsonify(predict_career(data, requested_top_k())), 200
 
+    except PredictionError as e:
+        return jsonify({"error": str(e)}), e.status
     except Exception as e:
-        print("❌ Error:", str(e))
+        logger.exception("Prediction failed")
         return jsonify({"error": str(e)}), 500
 
-        # Check if models are loaded
-        if model is None or scaler is None or label_encoder is None:
-            print("⚠️ Models not loaded. Using fallback response.")
-            # Return a random career as fallback
-            random_career = random.choice(DEFAULT_CAREERS)
-            return jsonify({"career": random_career, "note": "Using fallback response - models not loaded"}), 200
-        
-        # Prepare data for prediction
-        features = pd.DataFrame([data])
-        
-        # Ensure all expected fields are present
-        for feature in expected_features:
-            if feature not in features:
-                features[feature] = 0
-                
-        features = features[expected_features]
-        
-        # Convert string values to float
-        for col in features.columns:
-            features[col] = features[col].astype(float)
-        
-        # Scale the features
-        features_scaled = scaler.transform(features)
-        
-        # Predict the career
-        predicted_label = model.predict(features_scaled)[0]
-        predicted_career = label_encoder.inverse_transform([predicted_label])[0]
-        
-        result = {"career": predicted_career}
-        print("🎯 AI Predicted Career:", result)
-        
-        return jsonify(result), 200
+def build_feature_row(record):
+    """Convert one score record into an ordered row of floats.
 
-    except Exception as e:
-        print("❌ Error:", str(e))
-        # Return a fallback response on error
-        random_career = random.choice(DEFAULT_CAREERS)
-        return jsonify({
-            "career": random_career, 
-            "note": f"Error occurred, using fallback. Error: {str(e)}"
-        }), 200
-
-@recommendation.route('/api/career-details', methods=['POST', 'OPTIONS'])
-def get_career_details():
-    # Handle OPTIONS requests for CORS preflight
-    if request.method == 'OPTIONS':
-        return '', 200
-        
+    Missing features default to 0, matching the single prediction path.
+    Raises ValueError if the record is not an object or a score is not a
+    finite number ("nan", "inf" and 1e309 all convert with float()).
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Record must be a JSON object")
+
+    row = []
+    for feature in expected_features:
+        value = record.get(feature, 0)
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for {feature}: {value!r}")
+        if not math.isfinite(number):
+            raise ValueError(f"Invalid value for {feature}: {value!r}")
+        row.append(number)
+    return row
+
+def scale_rows(rows, bundle):
+    features = pd.DataFrame(np.asarray(rows, dtype=float), columns=expected_features)
+    return bundle.scaler.transform(features)
+
+def predict_matrix(rows, bundle=None):
+    """Run scaler, model and label decoding over a 2D array of feature rows."""
+    bundle = bundle or current_models()
+    if bundle is None:
+        raise RuntimeError("Models not loaded")
+    start = time.perf_counter()
+    if bundle.engine is not None:
+        labels = bundle.engine.predict(rows)
+        predicted = time.perf_counter()
+        inference_latency.observe(predicted - start, 'native')
+    else:
+        features_scaled = scale_rows(rows, bundle)
+        scaled = time.perf_counter()
+        labels = bundle.model.predict(features_scaled)
+        predicted = time.perf_counter()
+        inference_latency.observe(scaled - start, 'scale')
+        inference_latency.observe(predicted - scaled, 'predict')
+    careers = bundle.decode(labels)
+    inference_latency.observe(time.perf_counter() - predicted, 'decode')
+    return careers
+
+def predict_top_k(rows, k, bundle=None):
+    """The ``k`` most likely careers per row, best first, from one predict_proba call.
+
+    Returns one list of ``{"career", "confidence"}`` dicts per row.
+    """
+    bundle = bundle or current_models()
+    if bundle is None:
+        raise RuntimeError("Models not loaded")
+    start = time.perf_counter()
+    if bundle.engine is not None:
+        proba = bundle.engine.predict_proba(rows)
+        predicted = time.perf_counter()
+        inference_latency.observe(predicted - start, 'native_proba')
+    else:
+        features_scaled = scale_rows(rows, bundle)
+        scaled = time.perf_counter()
+        proba = np.asarray(bundle.model.predict_proba(features_scaled))
+        predicted = time.perf_counter()
+        inference_latency.observe(scaled - start, 'scale')
+        inference_latency.observe(predicted - scaled, 'predict_proba')
+    k = min(k, proba.shape[1])
+    # argpartition finds the k best columns in linear time; only those k are sorted
+    top = np.argpartition(proba, -k, axis=1)[:, -k:]
+    top_proba = np.take_along_axis(proba, top, axis=1)
+    order = np.argsort(-top_proba, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_proba = np.take_along_axis(top_proba, order, axis=1)
+    careers = bundle.proba_labels[top]
+    inference_latency.observe(time.perf_counter() - predicted, 'rank')
+    return [
+        [{"career": str(career), "confidence": round(float(p), 4)} for career, p in zip(row_careers, row_proba)]
+        for row_careers, row_proba in zip(careers, top_proba)
+    ]
+
+def requested_top_k():
+    """The ``top_k`` query parameter, or None. Raises PredictionError if it is invalid."""
+    value = request.args.get('top_k')
+    if value in (None, ''):
+        return None
     try:
-        data = request.json
-        career = data.get('career')
-        
-        if not career:
-            return jsonify({"error": "Career not specified"}), 400
-            
-        print(f"✅ Fetching details for career: {career}")
-        
-        # Hardcoded career details as fallback
-        career_details = {
-            "Software Engineer": {
-                "description": "Designs, develops, and maintains software systems and applications.",
-                "skills": ["Programming", "Problem Solving", "Algorithms", "Data Structures"],
-                "salary_range": "$70,000 - $150,000",
-                "education": "Bachelor's degree in Computer Science or related field",
-                "difficulty": 7,
-                "job_outlook": "Excellent growth projected over the next decade with increasing demand for software solutions.",
-                "day_to_day": "Writing code, debugging, attending meetings, collaborating with team members, and testing applications.",
-                "advancement": "Can progress to senior developer, technical lead, architect, or management roles.",
-                "work_life_balance": {
-                    "rating": 7,
-                    "explanation": "Generally good balance, though may require occasional overtime during project deadlines."
-                },
-                "pros": ["High demand", "Good compensation", "Remote work options", "Creative problem solving"],
-                "cons": ["Can be stressful during deadlines", "Requires continuous learning", "Some positions have long hours"]
-            },
-            "Data Scientist": {
-                "description": "Analyzes and interprets complex data to help organizations make better decisions.",
-                "skills": ["Statistics", "Machine Learning", "Python/R", "Data Visualization"],
-                "salary_range": "$90,000 - $160,000",
-                "education": "Master's or PhD in Statistics, Computer Science, or related field",
-                "difficulty": 8,
-                "job_outlook": "Strong growth expected as businesses increasingly rely on data-driven decision making.",
-                "day_to_day": "Analyzing data, building models, creating visualizations, presenting findings to stakeholders.",
-                "advancement": "Can advance to senior data scientist, lead data scientist, or management positions.",
-                "work_life_balance": {
-                    "rating": 8,
-                    "explanation": "Generally good work-life balance with flexible hours in many organizations."
-                },
-                "pros": ["Intellectually stimulating", "High demand", "Good compensation", "Opportunity to make business impact"],
-                "cons": ["Requires extensive education", "Can be challenging to explain complex concepts", "May involve cleaning messy data"]
-            },
-            "Doctor": {
-                "description": "Diagnoses and treats illnesses and injuries.",
-                "skills": ["Medical Knowledge", "Diagnostic Skills", "Patient Care", "Communication"],
-                "salary_range": "$150,000 - $300,000+",
-                "education": "Medical Doctor (MD) degree and residency",
-                "difficulty": 9,
-                "job_outlook": "Consistent demand with growth in specialized fields and aging population needs.",
-                "day_to_day": "Patient consultations, diagnoses, treatments, record-keeping, continuing education.",
-                "advancement": "Can specialize in various fields, become a department head, or open a private practice.",
-                "work_life_balance": {
-                    "rating": 5,
-                    "explanation": "Often challenging with long hours, especially during residency and for certain specialties."
-                },
-                "pros": ["Respected profession", "High compensation", "Opportunity to help others", "Job security"],
-                "cons": ["Long training period", "High stress", "Long hours", "High stakes decisions"]
-            },
-            "Lawyer": {
-                "description": "Provides legal advice and representation to individuals and organizations.",
-                "skills": ["Legal Research", "Negotiation", "Analytical Thinking", "Communication"],
-                "salary_range": "$70,000 - $200,000+",
-                "education": "Juris Doctor (JD) degree",
-                "difficulty": 8,
-                "job_outlook": "Steady demand with growth in areas like intellectual property and healthcare law.",
-                "day_to_day": "Client meetings, legal research, drafting documents, negotiations, court appearances.",
-                "advancement": "Can become a partner in a firm, specialize in a legal area, or become a judge.",
-                "work_life_balance": {
-                    "rating": 6,
-                    "explanation": "Often demanding hours, especially in large firms, though some specialties offer better balance."
-                },
-                "pros": ["Intellectually challenging", "Potential for high income", "Prestigious career", "Opportunity to help others"],
-                "cons": ["Long hours", "High stress", "Competitive field", "Extensive education requirements"]
-            },
-            "Architect": {
-                "description": "Designs buildings and structures, creating plans and specifications.",
-                "skills": ["Design", "Spatial Reasoning", "Technical Drawing", "Project Management"],
-                "salary_range": "$60,000 - $130,000",
-                "education": "Bachelor's or Master's degree in Architecture",
-                "difficulty": 7,
-                "job_outlook": "Moderate growth tied to construction industry trends and economic conditions.",
-                "day_to_day": "Creating designs, drafting plans, meeting with clients, coordinating with engineers and contractors.",
-                "advancement": "Can progress to senior architect, partner, or start own firm.",
-                "work_life_balance": {
-                    "rating": 7,
-                    "explanation": "Generally reasonable hours, though deadlines can require occasional overtime."
-                },
-                "pros": ["Creative expression", "Seeing designs become reality", "Varied projects", "Blend of art and science"],
-                "cons": ["Long education and licensure process", "Affected by economic cycles", "Competitive field"]
-            },
-            "Teacher": {
-                "description": "Educates students in various subjects and helps them develop knowledge and skills.",
-                "skills": ["Communication", "Patience", "Organization", "Subject Expertise"],
-                "salary_range": "$40,000 - $90,000",
-                "education": "Bachelor's degree in Education or subject area",
-                "difficulty": 7,
-                "job_outlook": "Stable demand with regional variations; growing need in STEM subjects.",
-                "day_to_day": "Lesson planning, teaching classes, grading assignments, meeting with students and parents.",
-                "advancement": "Can become department head, administrator, curriculum developer, or educational consultant.",
-                "work_life_balance": {
-                    "rating": 7,
-                    "explanation": "Regular schedule with summers off, though often involves after-hours work grading and planning."
-                },
-                "pros": ["Making a difference in students' lives", "Job security", "Regular schedule", "Breaks during the year"],
-                "cons": ["Can be emotionally demanding", "Moderate compensation", "Administrative challenges", "Need to handle difficult classroom situations"]
-            },
-            "Accountant": {
-                "description": "Prepares and examines financial records and ensures accuracy of financial operations.",
-                "skills": ["Mathematics", "Attention to Detail", "Financial Analysis", "Organization"],
-                "salary_range": "$50,000 - $110,000",
-                "education": "Bachelor's degree in Accounting or Finance",
-                "difficulty": 7,
-                "job_outlook": "Stable demand with consistent need for financial expertise in all sectors.",
-                "day_to_day": "Analyzing financial data, preparing reports, ensuring regulatory compliance, auditing records.",
-                "advancement": "Can progress to senior accountant, controller, financial manager, or partner in a firm.",
-                "work_life_balance": {
-                    "rating": 6,
-                    "explanation": "Generally good, though tax season can be demanding with long hours."
-                },
-                "pros": ["Job stability", "Clear career path", "Variety of industries to work in", "Analytical work"],
-                "cons": ["Seasonal workload fluctuations", "Keeping up with changing regulations", "Can be repetitive"]
-            },
-            "Mechanical Engineer": {
-                "description": "Designs, develops, and tests mechanical devices and systems.",
-                "skills": ["Mathematics", "CAD Software", "Problem Solving", "Technical Knowledge"],
-                "salary_range": "$65,000 - $120,000",
-                "education": "Bachelor's degree in Mechanical Engineering",
-                "difficulty": 8,
-                "job_outlook": "Steady demand across manufacturing, automotive, aerospace, and energy sectors.",
-                "day_to_day": "Designing mechanical systems, testing prototypes, analyzing test data, collaborating with other engineers.",
-                "advancement": "Can become senior engineer, engineering manager, or technical specialist.",
-                "work_life_balance": {
-                    "rating": 7,
-                    "explanation": "Generally good balance with standard hours, though project deadlines may require overtime."
-                },
-                "pros": ["Problem-solving challenges", "Tangible results", "Diverse applications", "Good compensation"],
-                "cons": ["Requires continuous learning", "Complex problems", "Manufacturing jobs may be affected by economic cycles"]
-            }
-        }
-        
-        # Return the details for the requested career, or a default response if not found
-        if career in career_details:
-            return jsonify(career_details[career]), 200
-        else:
-            # Generic details for any career not in our hardcoded list
-            return jsonify({
-                "description": f"Professional in the field of {career}.",
-                "skills": ["Relevant technical skills", "Communication", "Problem solving"],
-                "salary_range": "Varies based on experience and location",
-                "education": "Related degree or certification",
-                "difficulty": 7,
-                "job_outlook": "Varies by region and economic conditions.",
-                "day_to_day": "Performing tasks related to the profession, collaborating with colleagues, and developing expertise.",
-                "advancement": "Career progression typically involves gaining expertise and taking on more responsibility.",
-                "work_life_balance": {
-                    "rating": 7,
-                    "explanation": "Balance varies depending on employer and specific role."
-                },
-                "pros": ["Career growth opportunities", "Professional development", "Applying specialized knowledge"],
-                "cons": ["May require continued education", "Competitive job market", "Industry-specific challenges"]
-            }), 200
-            
-    except Exception as e:
-        print(f"❌ Error in career details: {str(e)}")
-        return jsonify({
-            "description": "Information temporarily unavailable.",
-            "skills": ["Information not available"],
-            "salary_range": "Information not available",
-            "education": "Information not available",
-            "difficulty": 5,
-            "job_outlook": "Information not available",
-            "day_to_day": "Information not available",
-            "advancement": "Information not available",
-            "work_life_balance": {
-                "rating": 5,
-                "explanation": "Information not available"
-            },
-            "pros": ["Information not available"],
-            "cons": ["Information not available"]
-        }), 200
-
-@recommendation.route('/api/career-roadmap', methods=['POST', 'OPTIONS'])
-def get_career_roadmap():
-    # Handle OPTIONS requests for CORS preflight
-    if request.method == 'OPTIONS':
-        return '', 200
-        
+        top_k = int(value)
+    except ValueError:
+        raise PredictionError("top_k must be an integer", 400)
+    if not 1 <= top_k <= PREDICT_TOP_K_MAX:
+        raise PredictionError(f"top_k must be between 1 and {PREDICT_TOP_K_MAX}", 400)
+    return top_k
+
+def predict_with_version(rows):
+    """Predict a batch on the live bundle, tagging each career with the version used."""
+    bundle = current_models()
+    return [(career, bundle.version) for career in predict_matrix(rows, bundle)]
+
+@recommendation.route('/api/predict/batch', methods=['POST'])
+def get_batch_prediction():
+    data = request.json
+    records = data.get('records') if isinstance(data, dict) else data
+
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "Expected a non-empty list of records"}), 400
+
+    if len(records) > PREDICT_BATCH_MAX_SIZE:
+        return jsonify({"error": f"Batch too large, max {PREDICT_BATCH_MAX_SIZE} records"}), 413
+
     try:
-        data = request.json
-        career = data.get('career')
-        
-        if not career:
-            return jsonify({"error": "Career not specified"}), 400
-            
-        print(f"✅ Fetching roadmap for career: {career}")
-        
-        # Generate a simple roadmap as fallback
-        roadmap = {
-            "short-term goals": [
-                f"Complete a bachelor's degree in a field related to {career}",
-                "Take relevant courses and gain foundational knowledge",
-                "Build a portfolio of projects or work samples"
-            ],
-            "mid-term goals": [
-                "Obtain entry-level position in the field",
-                "Develop specialization in a particular area",
-                "Build professional network through industry events"
-            ],
-            "long-term goals": [
-                "Advance to senior-level positions",
-                "Become a subject matter expert",
-                "Consider leadership or management roles"
-            ],
-            "education requirements": [
-                f"Bachelor's degree in {career} or related field",
-                "Relevant certifications",
-                "Continuing education to stay current"
-            ],
-            "skills to develop": [
-                "Technical skills specific to the field",
-                "Communication and teamwork",
-                "Problem-solving and critical thinking"
-            ],
-            "experience needed": [
-                "Entry-level positions or internships",
-                "Volunteer work in related areas",
-                "Collaborative projects"
-            ],
-            "industry certifications": [
-                "Professional certifications relevant to the field",
-                "Specialized training programs",
-                "Online courses and workshops"
-            ],
-            "personal development recommendations": [
-                "Develop time management skills",
-                "Work on presentation and public speaking",
-                "Build resilience and adaptability"
-            ],
-            "networking suggestions": [
-                "Join professional associations",
-                "Attend industry conferences",
-                "Connect with professionals on LinkedIn"
-            ],
-            "milestones and checkpoints": [
-                "First year: Complete foundational education",
-                "3-5 years: Gain specialized experience",
-                "5-10 years: Move into advanced roles"
-            ]
-        }
-        
-        return jsonify({
-            "success": True,
-            "data": roadmap
-        }), 200
-            
+        top_k = requested_top_k()
+    except PredictionError as e:
+        return jsonify({"error": str(e)}), e.status
+
+    ensure_models_loaded()
+    bundle = current_models()
+    if bundle is None:
+        return jsonify({"error": "Models not loaded"}), 503
+
+    # Validate every record up front so one bad row does not fail the batch
+    results = [None] * len(records)
+    rows = []
+    row_indexes = []
+    for index, record in enumerate(records):
+        try:
+            rows.append(build_feature_row(record))
+            row_indexes.append(index)
+        except ValueError as e:
+            results[index] = {"index": index, "error": str(e)}
+
+    try:
+        if rows and top_k:
+            for index, ranked in zip(row_indexes, predict_top_k(rows, top_k, bundle)):
+                results[index] = {"index": index, "career": ranked[0]["career"],
+                                  "confidence": ranked[0]["confidence"], "predictions": ranked}
+        elif rows:
+            careers = predict_matrix(rows, bundle)
+            for index, career in zip(row_indexes, careers):
+                results[index] = {"index": index, "career": str(career)}
     except Exception as e:
-        print(f"❌ Error in roadmap: {str(e)}")
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 200
+        logger.exception("Batch prediction failed")
+        return jsonify({"error": str(e)}), 500
+
+    logger.debug("Batch predicted", extra={"predicted": len(rows), "records": len(records)})
+
+    return jsonify({
+        "predictions": results,
+        "count": len(records),
+        "failed": len(records) - len(rows),
+        "model_version": bundle.version
+    }), 200
+
+@recommendation.route('/api/ready', methods=['GET'])
+def readiness():
+    """Ready once the local model has answered a warm-up inference.
+
+    Deployments without local artifacts forward to the AI service and are
+    ready as soon as loading has been attempted. Artifacts that were found
+    but failed to load leave the worker not ready.
+    """
+    ensure_models_loaded()
+    bundle = current_models()
+    ready = not model_registry.load_failed()
+    if bundle is not None and bundle.warmup_ms is None:
+        try:
+            validate_bundle(bundle)
+        except Exception as e:
+            logger.error(f"Model warm-up failed: {str(e)}")
+            ready = False
+    return jsonify({
+        "ready": ready,
+        "models_loaded": bundle is not None,
+        "model_version": bundle.version if bundle is not None else None,
+        "loading_mode": MODEL_LOADING,
+        "mmap_mode": MODEL_MMAP_MODE,
+        "inference_engine": "native" if bundle is not None and bundle.engine is not None else "sklearn",
+        "load_timings_ms": bundle.load_timings_ms if bundle is not None else {},
+        "warmup_ms": bundle.warmup_ms if bundle is not None else None,
+        "pid": os.getpid(),
+        "rss_mb": rss_mb()
+    }), 200 if ready else 503
+
+@recommendation.route('/api/admin/models', methods=['GET'])
+@admin_required
+def get_model_registry():
+    return jsonify(model_registry.stats()), 200
+
+@recommendation.route('/api/admin/models/reload', methods=['POST'])
+@admin_required
+def reload_models():
+    ensure_models_loaded()
+    swapped = model_registry.check_for_update()
+    bundle = current_models()
+    return jsonify({"swapped": swapped, "version": bundle.version if bundle is not None else None}), 200
+
+@recommendation.route('/api/predict/batching-stats', methods=['GET'])
+@admin_required
+def get_batching_stats():
+    if prediction_batcher is None:
+        return jsonify({"enabled": INFERENCE_BATCHING, "stats": None}), 200
+    return jsonify({"enabled": INFERENCE_BATCHING, "stats": prediction_batcher.stats()}), 200
+
+@recommendation.route('/api/admin/prediction-cache', methods=['GET'])
+@admin_required
+def get_prediction_cache_stats():
+    return jsonify({"version": serving_version(current_models()), "stats": prediction_cache.stats()}), 200
+
+@recommendation.route('/api/admin/prediction-cache/clear', methods=['POST'])
+@admin_required
+def clear_prediction_cache():
+    cleared = prediction_cache.clear()
+    logger.info(f"Prediction cache cleared ({cleared} entries)")
+    return jsonify({"cleared": cleared}), 200
+
+def catalog_response(body, etag=None, status=200):
+    """JSON response from pre-encoded bytes, answering If-None-Match with 304."""
+    # Weak comparison, as If-None-Match requires: compressed responses carry W/ ETags
+    if etag is not None and request.if_none_match.contains_weak(etag[1:-1]):
+        response = Response(status=304)
+    else:
+        response = Response(body, status=status, mimetype='application/json')
+    if etag is not None:
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = f"public, max-age={CAREER_CATALOG_MAX_AGE}"
+    return response
+
+@recommendation.route('/api/careers', methods=['GET'])
+def list_careers():
+    body, etag = career_catalog.index()
+    return catalog_response(body, etag)
+
+@recommendation.route('/api/careers/<path:career>', methods=['GET'])
+def get_career(career):
+    body, etag = career_catalog.details_for(career_resolver.resolve(career))
+    return catalog_response(body, etag)
+
+# Load (and warm) the model now, so a preloading gunicorn master does it once for all workers
+if MODEL_LOADING != 'lazy':
+    model_registry.ensure_loaded()
+    career_resolver.index()
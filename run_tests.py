@@ -16,6 +16,9 @@ def setup_mock_dependencies():
     # Mock the imports from other repositories
     sys.modules['chatbot'] = MagicMock()
     sys.modules['gpt_chatbot'] = MagicMock()
+    sys.modules['career_roadmap'] = MagicMock()
+    sys.modules['university_summaries'] = MagicMock()
+    sys.modules['alternative_careers'] = MagicMock()
     
     # Create a proper CareerChatbot mock with recommend method
     career_chatbot_mock = MagicMock()
@@ -24,11 +27,18 @@ def setup_mock_dependencies():
     
     # Mock the chat handler
     sys.modules['gpt_chatbot'].handle_chat = MagicMock(return_value="This is a test response")
+    sys.modules['gpt_chatbot'].handle_chat_stream = MagicMock(side_effect=lambda *args: iter(["This is ", "a test response"]))
 
 def main():
     """
-    Run the tests using pytest.
+    Run the tests using pytest, or the load test with --benchmark.
     """
+    if "--benchmark" in sys.argv[1:]:
+        # The load test installs its own AI stubs instead of MagicMocks
+        sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+        from benchmarks.load_test import main as run_load_test
+        return run_load_test([arg for arg in sys.argv[1:] if arg != "--benchmark"])
+
     print("Running tests for recommender-backend...")
     
     # Set up mocks before importing pytest (which might trigger imports)
@@ -52,4 +62,4 @@ def main():
     return exit_code
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
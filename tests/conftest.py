@@ -1,10 +1,16 @@
+import os
 import pytest
 import sys
+import tempfile
+import numpy as np
 from unittest.mock import MagicMock
 
 # Mock external dependencies before importing app
 sys.modules['chatbot'] = MagicMock()
 sys.modules['gpt_chatbot'] = MagicMock()
+sys.modules['career_roadmap'] = MagicMock()
+sys.modules['university_summaries'] = MagicMock()
+sys.modules['alternative_careers'] = MagicMock()
 
 # Create a proper CareerChatbot mock with recommend method
 career_chatbot_mock = MagicMock()
@@ -13,6 +19,10 @@ sys.modules['chatbot'].CareerChatbot = MagicMock(return_value=career_chatbot_moc
 
 # Mock the chat handler
 sys.modules['gpt_chatbot'].handle_chat = MagicMock(return_value="This is a test response")
+sys.modules['gpt_chatbot'].handle_chat_stream = MagicMock(side_effect=lambda *args: iter(["This is ", "a test response"]))
+
+# Keep the on-disk generation cache out of the working tree
+os.environ.setdefault('GENERATION_CACHE_PATH', os.path.join(tempfile.mkdtemp(), 'generation_cache.sqlite3'))
 
 # Now we can safely import the app
 from app import app as flask_app
@@ -30,4 +40,37 @@ def client(app):
 
 @pytest.fixture
 def runner(app):
-    return app.test_cli_runner() 
\ No newline at end of file
+    return app.test_cli_runner() 
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Keep cached responses from leaking between tests."""
+    from routes import recommendations
+    from routes import chatbot
+    recommendations.prediction_cache.clear()
+    chatbot.generation_cache.clear()
+    # Failures in one test must not leave the AI service's circuit open for the next
+    recommendations.ai_service.breaker.record_success()
+    yield
+
+@pytest.fixture
+def loaded_models(monkeypatch):
+    """Install a small fitted scaler/model/label encoder bundle in the model registry."""
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler, LabelEncoder
+    from sklearn.tree import DecisionTreeClassifier
+    from lib.model_registry import ModelBundle
+    from routes import recommendations
+
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame(rng.uniform(40, 100, size=(200, len(recommendations.expected_features))),
+                     columns=recommendations.expected_features)
+    careers = np.where(X["math_score"] > 70, "Software Engineer", "Teacher")
+
+    scaler = StandardScaler().fit(X)
+    label_encoder = LabelEncoder().fit(careers)
+    model = DecisionTreeClassifier(random_state=0).fit(scaler.transform(X), label_encoder.transform(careers))
+
+    bundle = ModelBundle(model, scaler, label_encoder, "test")
+    monkeypatch.setattr(recommendations.model_registry, '_current', bundle)
+    return model, scaler, label_encoder
@@ -0,0 +1,81 @@
+import json
+import threading
+from lib.batching import MicroBatcher
+
+def test_micro_batcher_groups_concurrent_requests():
+    batch_sizes = []
+
+    def predict(rows):
+        batch_sizes.append(len(rows))
+        return [row * 2 for row in rows]
+
+    batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.submit(i, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: i * 2 for i in range(8)}
+    assert sum(batch_sizes) == 8
+    assert len(batch_sizes) < 8
+
+    stats = batcher.stats()
+    assert stats["items"] == 8
+    assert stats["queue_depth"] == 0
+    assert stats["max_batch_size_seen"] == max(batch_sizes)
+
+def test_micro_batcher_propagates_errors():
+    def predict(rows):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=1)
+    try:
+        batcher.submit([1.0], timeout=5)
+        assert False, "expected the predict error to be raised"
+    except RuntimeError as e:
+        assert "model exploded" in str(e)
+    assert batcher.stats()["errors"] == 1
+
+def test_micro_batcher_fails_every_request_on_a_short_result():
+    batcher = MicroBatcher(lambda rows: rows[:-1], max_batch_size=4, max_wait_ms=50)
+    errors = []
+
+    def worker(i):
+        try:
+            batcher.submit(i, timeout=5)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(errors) == 4
+    assert all("results for" in error for error in errors)
+    assert batcher.stats()["errors"] >= 1
+
+def test_predict_uses_batcher_when_enabled(client, loaded_models, monkeypatch):
+    from routes import recommendations
+    monkeypatch.setattr(recommendations, 'INFERENCE_BATCHING', True)
+    monkeypatch.setattr(recommendations, 'prediction_batcher', None)
+
+    response = client.post('/api/predict',
+                          data=json.dumps({"math_score": 95, "english_score": 60}),
+                          content_type='application/json')
+
+    assert response.status_code == 200
+    assert json.loads(response.data)["career"] == "Software Engineer"
+
+    monkeypatch.setattr('lib.admin.ADMIN_TOKEN', 'secret')
+    assert client.get('/api/predict/batching-stats').status_code == 401
+    stats = json.loads(client.get('/api/predict/batching-stats', headers={'X-Admin-Token': 'secret'}).data)
+    assert stats["enabled"] is True
+    assert stats["stats"]["items"] == 1
@@ -0,0 +1,177 @@
+import json
+import pytest
+import time
+from unittest.mock import patch, MagicMock
+from lib.cache import TTLCache, MISSING
+
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+@patch('lib.cache.time.monotonic')
+def test_ttl_cache_expiry(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    cache = TTLCache(max_size=10, ttl=5)
+    cache.set("a", 1)
+
+    mock_monotonic.return_value = 104.0
+    assert cache.get("a") == 1
+    mock_monotonic.return_value = 106.0
+    assert cache.get("a") is MISSING
+    assert cache.stats()["expirations"] == 1
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_prediction_cache_hit(mock_request, client):
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"predicted_career": "Doctor"}
+    mock_response.status_code = 200
+    mock_request.return_value = mock_response
+
+    scores = {"math_score": 80, "biology_score": 95}
+    for _ in range(3):
+        response = client.post('/api/predict', data=json.dumps(scores), content_type='application/json')
+        assert json.loads(response.data)["predicted_career"] == "Doctor"
+
+    assert mock_request.call_count == 1
+
+def test_prediction_cache_admin_endpoints(client, monkeypatch):
+    monkeypatch.setattr('lib.admin.ADMIN_TOKEN', 'secret')
+
+    assert client.post('/api/admin/prediction-cache/clear').status_code == 401
+
+    response = client.post('/api/admin/prediction-cache/clear', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    assert "cleared" in json.loads(response.data)
+
+    response = client.get('/api/admin/prediction-cache', headers={'X-Admin-Token': 'secret'})
+    assert json.loads(response.data)["stats"]["size"] == 0
+
+def test_non_ascii_admin_token_is_rejected(client, monkeypatch):
+    monkeypatch.setattr('lib.admin.ADMIN_TOKEN', 'secret')
+
+    response = client.get('/api/admin/prediction-cache', headers={'X-Admin-Token': 's\u00e9cret'})
+    assert response.status_code == 401
+
+def test_prediction_cache_flushed_on_model_change(client, loaded_models, monkeypatch):
+    from routes import recommendations
+    monkeypatch.setattr(recommendations, 'INFERENCE_BATCHING', True)
+    monkeypatch.setattr(recommendations, 'prediction_batcher', None)
+    monkeypatch.setattr(recommendations.model_registry.current(), 'version', 'v1')
+
+    client.post('/api/predict', data=json.dumps({"math_score": 95}), content_type='application/json')
+    assert len(recommendations.prediction_cache) == 1
+
+    monkeypatch.setattr(recommendations.model_registry.current(), 'version', 'v2')
+    client.post('/api/predict', data=json.dumps({"math_score": 40}), content_type='application/json')
+    assert len(recommendations.prediction_cache) == 1
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_prediction_cache_survives_alternating_paths(mock_request, client, loaded_models, monkeypatch):
+    from routes import recommendations
+    monkeypatch.setattr(recommendations, 'INFERENCE_ROUTE', 'remote-first')
+    mock_request.return_value = MagicMock(status_code=200)
+    mock_request.return_value.json.return_value = {"career": "Doctor"}
+    scores = json.dumps({"math_score": 95, "physics_score": 80})
+    hits = recommendations.prediction_cache.stats()["hits"]
+
+    for _ in range(2):
+        # Plain requests go to the AI service; top-k ones are answered locally
+        client.post('/api/predict', data=scores, content_type='application/json')
+        client.post('/api/predict?top_k=3', data=scores, content_type='application/json')
+
+    assert mock_request.call_count == 1
+    assert len(recommendations.prediction_cache) == 2
+    assert recommendations.prediction_cache.stats()["hits"] - hits == 2
+
+def test_swr_cache_serves_stale_and_refreshes_once(monkeypatch):
+    from lib.cache import SWRCache
+    clock = [100.0]
+    monkeypatch.setattr('lib.cache.time.monotonic', lambda: clock[0])
+    cache = SWRCache(ttl=10, stale_ttl=100)
+    calls = []
+
+    def loader():
+        calls.append(clock[0])
+        return len(calls)
+
+    assert cache.get_or_load("k", loader) == 1
+    assert cache.get_or_load("k", loader) == 1
+
+    clock[0] = 120.0
+    assert cache.get_or_load("k", loader) == 1  # stale value served immediately
+    cache._executor.shutdown(wait=True)
+    assert len(calls) == 2
+    assert cache.get_or_load("k", loader) == 2
+    assert cache.stats()["stale_hits"] == 1
+
+def test_swr_cache_single_flight():
+    import threading
+    from lib.cache import SWRCache
+    cache = SWRCache(ttl=60, stale_ttl=60)
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "details"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("doctor", loader)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    # Wait for every thread to join the load, but fail rather than hang if one never does
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] + cache.stats()["misses"] < 5 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    stats = cache.stats()
+    release.set()
+    assert stats["coalesced"] + stats["misses"] == 5
+    for t in threads:
+        t.join()
+
+    assert results == ["details"] * 5
+    assert len(calls) == 1
+
+def test_swr_cache_clears_inflight_when_cacheable_raises():
+    from lib.cache import SWRCache
+    cache = SWRCache(ttl=60, stale_ttl=60, cacheable=lambda value: value["success"])
+
+    with pytest.raises(KeyError):
+        cache.get_or_load("k", lambda: {})
+    assert cache.stats()["inflight"] == 0
+    # The next caller loads again instead of joining the failed future
+    assert cache.get_or_load("k", lambda: {"success": True}) == {"success": True}
+
+def test_career_details_proxy_is_cached(client, monkeypatch):
+    from routes import chatbot
+    monkeypatch.setattr(chatbot, 'career_details_cache',
+                        chatbot.SWRCache(ttl=60, stale_ttl=60))
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"success": True, "details": {"description": "Flies planes"}}
+    mock_request = MagicMock(return_value=mock_response)
+    monkeypatch.setattr(chatbot.career_details_service.session, 'request', mock_request)
+
+    first = client.post('/api/career-details', json={"career": "Pilot"})
+    second = client.post('/api/career-details', json={"career": " pilot "})
+    assert json.loads(first.data)["success"] is True
+    assert json.loads(second.data)["details"]["description"] == "Flies planes"
+    assert mock_request.call_count == 1
+
+    # Catalog careers never reach the AI service
+    response = client.post('/api/career-details', json={"career": "Doctor"})
+    assert json.loads(response.data)["salary_range"] == "$150,000 - $300,000+"
+    assert mock_request.call_count == 1
@@ -0,0 +1,96 @@
+import json
+from unittest.mock import MagicMock
+from lib.career_catalog import CAREER_ALIASES, career_catalog
+from lib.career_index import CareerIndex, CareerResolver, normalize, stem
+
+NAMES = ["Software Engineer", "Data Scientist", "Data Analyst", "Doctor", "Teacher",
+         "Civil Engineer", "Mechanical Engineer", "Nurse", "Pharmacist", "Chef"]
+
+def test_normalize_and_stem():
+    assert normalize("  Software-ENGINEER ") == "software engineer"
+    assert normalize("Médecin") == "medecin"
+    assert stem("civil engineering") == stem("civil engineer")
+    assert stem("teaching") == stem("teachers") == stem("teacher")
+
+def test_resolution_tiers():
+    index = CareerIndex(NAMES, {"Physician": "Doctor"})
+    assert index.resolve("Doctor") == ("Doctor", "exact")
+    assert index.resolve("data SCIENTIST") == ("Data Scientist", "normalized")
+    assert index.resolve("physician") == ("Doctor", "alias")
+    assert index.resolve("software engineering") == ("Software Engineer", "stem")
+    assert index.resolve("pharmacy") == ("Pharmacist", "stem")
+    assert index.resolve("data science") == ("Data Scientist", "fuzzy")
+    assert index.resolve("data analysis") == ("Data Analyst", "fuzzy")
+    assert index.resolve("docter") == ("Doctor", "stem")
+    assert index.resolve("sofware enginer") == ("Software Engineer", "fuzzy")
+
+def test_unrelated_and_ambiguous_names_are_not_matched():
+    index = CareerIndex(NAMES)
+    # "engineer" fits three careers equally well
+    assert index.resolve("engineer") == (None, "unmatched")
+    assert index.resolve("chemist") == (None, "unmatched")
+    assert index.resolve("astronaut") == (None, "unmatched")
+    assert index.resolve("   ") == (None, "unmatched")
+
+def test_aliases_to_unknown_careers_are_ignored():
+    index = CareerIndex(NAMES, {"Pilot in command": "Pilot"})
+    assert index.resolve("pilot in command") == (None, "unmatched")
+
+def test_catalog_aliases_point_at_catalog_careers():
+    assert set(CAREER_ALIASES.values()) <= set(career_catalog.names())
+
+def test_resolver_rebuilds_when_model_careers_change():
+    model_careers = [["Software Engineer"]]
+    resolver = CareerResolver(["Doctor"], model_names=lambda: model_careers[0])
+
+    assert resolver.resolve("software engineering") == "Software Engineer"
+    assert resolver.resolve("data science ") == "data science"
+    assert resolver.resolve(None) is None
+
+    model_careers[0] = ["Data Scientist"]
+    assert resolver.resolve("data science") == "Data Scientist"
+    assert resolver.resolve("software engineering") == "software engineering"
+
+def test_resolver_caches_resolutions():
+    resolver = CareerResolver(NAMES)
+    assert resolver.resolve("data science") == "Data Scientist"
+    assert resolver.resolve("data science") == "Data Scientist"
+    stats = resolver.cache.stats()
+    assert stats["hits"] == 1 and stats["size"] == 1
+
+def test_career_details_resolves_variants(client):
+    exact = client.post('/api/career-details', json={"career": "Software Engineer"})
+    variant = client.post('/api/career-details', json={"career": "software engineering"})
+    assert variant.status_code == 200
+    assert variant.data == exact.data
+    assert json.loads(variant.data)["salary_range"] == "$70,000 - $150,000"
+
+def test_career_get_shares_canonical_etag(client):
+    canonical = client.get('/api/careers/Data Scientist')
+    variant = client.get('/api/careers/data science')
+    assert variant.headers['ETag'] == canonical.headers['ETag']
+
+def test_roadmap_uses_canonical_name(client, monkeypatch):
+    from routes import chatbot
+    generate = MagicMock(return_value={"success": True, "roadmap": ["Study"]})
+    monkeypatch.setattr(chatbot, 'generate_career_roadmap', generate)
+
+    client.post('/api/career-roadmap', json={"career": "teaching"})
+    generate.assert_called_once_with("Teacher", {}, None)
+
+def test_model_careers_are_resolved(client, monkeypatch):
+    from routes import chatbot
+    monkeypatch.setattr(chatbot, 'generate_career_roadmap', MagicMock(side_effect=RuntimeError("down")))
+    from sklearn.preprocessing import LabelEncoder
+    from lib.model_registry import ModelBundle
+    from routes import recommendations
+    bundle = ModelBundle(None, None, LabelEncoder().fit(["Marine Biologist", "Teacher"]), "test")
+    monkeypatch.setattr(recommendations.model_registry, '_current', bundle)
+
+    response = client.post('/api/career-roadmap', json={"career": "marine biology"})
+    assert "Marine Biologist" in json.loads(response.data)["data"]["education requirements"][0]
+
+def test_resolutions_are_counted(client):
+    client.post('/api/career-details', json={"career": "attorney"})
+    text = client.get('/metrics').data.decode()
+    assert 'career_name_resolutions_total{method="alias"}' in text
@@ -26,10 +26,10 @@ def test_chat(mock_handle_chat, client):
     data = json.loads(response.data)
     assert data["response"] == "This is a test response"
     
-    # Verify the mock was called with correct data
+    # Verify the mock was called with correct data, the career resolved to its catalog name
     mock_handle_chat.assert_called_once_with(
         test_data["message"], 
-        test_data["career"], 
+        "Software Engineer", 
         test_data["gpa"], 
         test_data["subject_grades"], 
         test_data["session_id"]
@@ -101,4 +101,92 @@ def test_chatbot_recommend_missing_fields(client):
     response = client.post('/api/chatbot-recommend', 
                           data=json.dumps({"gpa": 3.5}),
                           content_type='application/json')
-    assert response.status_code == 400 
\ No newline at end of file
+    assert response.status_code == 400 
+def test_analyze_careers_concurrent_with_timeouts(client, monkeypatch):
+    """Careers are analyzed in parallel; slow ones come back flagged timed_out."""
+    import time
+    import threading
+    from routes import chatbot
+
+    release = threading.Event()
+
+    def analyze(career, academic_scores, predicted_career):
+        if career == "Slow Career":
+            release.wait(5)
+        scores = {"Career A": 60, "Career B": 90, "Slow Career": 99}
+        return {"matching_score": scores[career], "explanation": "fit", "key_skills": ["x"]}
+
+    monkeypatch.setattr(chatbot.alternative_careers_analyzer, 'analyze_career_match', analyze)
+    monkeypatch.setattr(chatbot, 'ANALYZE_CAREER_TIMEOUT', 0.2)
+
+    test_data = {
+        "careers": ["Career A", "Slow Career", "Career B"],
+        "academic_scores": {"math": 90},
+        "predicted_career": "Software Engineer"
+    }
+    started = time.monotonic()
+    response = client.post('/api/analyze-careers',
+                          data=json.dumps(test_data),
+                          content_type='application/json')
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert response.status_code == 200
+    assert elapsed < 2
+    data = json.loads(response.data)
+    assert data["partial"] is True
+    assert [c["career"] for c in data["analyzed_careers"]] == ["Career B", "Career A", "Slow Career"]
+    assert data["analyzed_careers"][2]["timed_out"] is True
+    assert data["analyzed_careers"][0]["timed_out"] is False
+
+def test_analyze_careers_keeps_duplicate_careers(client, monkeypatch):
+    from routes import chatbot
+    monkeypatch.setattr(chatbot.alternative_careers_analyzer, 'analyze_career_match',
+                        lambda career, academic_scores, predicted_career:
+                        {"matching_score": 50, "explanation": "fit", "key_skills": ["x"]})
+
+    response = client.post('/api/analyze-careers',
+                          data=json.dumps({"careers": ["Career A", "Career A", "Career B"],
+                                           "academic_scores": {"math": 90},
+                                           "predicted_career": "Software Engineer"}),
+                          content_type='application/json')
+
+    careers = [c["career"] for c in json.loads(response.data)["analyzed_careers"]]
+    assert sorted(careers) == ["Career A", "Career A", "Career B"]
+
+def parse_sse(body):
+    events = []
+    for block in body.decode().strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_chat_streaming(client):
+    test_data = {"message": "Tell me about nursing", "career": "Nurse", "stream": True}
+
+    response = client.post('/api/chat',
+                          data=json.dumps(test_data),
+                          content_type='application/json')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = parse_sse(response.data)
+    assert [event for event, _ in events] == ["chunk", "chunk", "done"]
+    assert events[0][1]["delta"] == "This is "
+    done = events[-1][1]
+    assert done["response"] == "This is a test response"
+    assert done["ttfb_ms"] <= done["total_ms"]
+
+def test_chat_streaming_falls_back_to_full_reply(client, monkeypatch):
+    from routes import chatbot
+    monkeypatch.setattr(chatbot, 'handle_chat_stream', None)
+    monkeypatch.setattr(chatbot, 'handle_chat', MagicMock(return_value="Whole reply"))
+
+    response = client.post('/api/chat',
+                          data=json.dumps({"message": "Hi"}),
+                          content_type='application/json',
+                          headers={'Accept': 'text/event-stream'})
+
+    events = parse_sse(response.data)
+    assert events[0] == ("chunk", {"delta": "Whole reply"})
+    assert events[-1][1]["response"] == "Whole reply"
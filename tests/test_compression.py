@@ -0,0 +1,77 @@
+import gzip
+import json
+import numpy as np
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from lib import compression
+
+def test_catalog_index_is_gzipped_when_accepted(client):
+    plain = client.get('/api/careers')
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    response = client.get('/api/careers', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(response.data) < len(plain.data)
+    assert gzip.decompress(response.data) == plain.data
+    # The compressed bytes differ from the identity body, so the validator is weakened
+    assert response.headers['ETag'] == 'W/' + plain.headers['ETag']
+
+def test_catalog_index_reuses_precompressed_bytes(client):
+    plain = client.get('/api/careers')
+    variants = compression._precompressed[plain.headers['ETag'].strip('"')]
+
+    response = client.get('/api/careers', headers={'Accept-Encoding': 'gzip'})
+    assert response.data == variants['gzip']
+
+def test_weak_etag_still_revalidates(client):
+    etag = client.get('/api/careers', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = client.get('/api/careers', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 304
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.get('/api/careers/Doctor', headers={'Accept-Encoding': 'gzip'})
+    assert len(response.data) < compression.COMPRESSION_MIN_SIZE
+    assert 'Content-Encoding' not in response.headers
+
+def test_identity_only_client_gets_identity(client):
+    response = client.get('/api/careers', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert json.loads(response.data)['careers']
+
+def test_chat_stream_is_not_compressed(client):
+    response = client.post('/api/chat', json={'message': 'Hello', 'career': 'Nurse', 'stream': True}, headers={'Accept-Encoding': 'gzip'})
+    assert response.mimetype == 'text/event-stream'
+    assert 'Content-Encoding' not in response.headers
+
+def test_brotli_preferred_when_available(client):
+    brotli = pytest.importorskip('brotli')
+    plain = client.get('/api/careers')
+    response = client.get('/api/careers', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == plain.data
+
+def test_orjson_provider_matches_default_output():
+    from lib.json_provider import OrjsonProvider
+    pytest.importorskip('orjson')
+    app = Flask(__name__)
+    payload = {"b": [1, 2.5, None], "a": {"z": "\u00e9", "y": True}, "c": "x"}
+
+    assert json.loads(OrjsonProvider(app).dumps(payload)) == json.loads(DefaultJSONProvider(app).dumps(payload))
+    assert list(json.loads(OrjsonProvider(app).dumps(payload))) == ["a", "b", "c"]
+
+def test_orjson_provider_serializes_numpy_and_falls_back():
+    from lib.json_provider import OrjsonProvider
+    pytest.importorskip('orjson')
+    app = Flask(__name__)
+    provider = OrjsonProvider(app)
+
+    assert json.loads(provider.dumps({"p": np.array([0.25, 0.75]), "k": np.int64(3)})) == {"p": [0.25, 0.75], "k": 3}
+    # orjson rejects integers beyond 64 bits; the default provider does not
+    assert provider.dumps({"n": 2 ** 70}) == '{"n": 1180591620717411303424}'
+    with app.app_context():
+        response = provider.response({"ok": True})
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.data) == {"ok": True}
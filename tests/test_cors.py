@@ -0,0 +1,62 @@
+import re
+from lib import cors
+
+ORIGIN = 'http://localhost:3000'
+
+def preflight(client, path, method='POST', origin=ORIGIN):
+    return client.options(path, headers={
+        'Origin': origin,
+        'Access-Control-Request-Method': method,
+        'Access-Control-Request-Headers': 'content-type'
+    })
+
+def metric_value(text, sample):
+    match = re.search("^" + re.escape(sample) + r" (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+def test_preflight_is_answered_with_cacheable_headers(client):
+    response = preflight(client, '/api/predict')
+    assert response.status_code == 204
+    assert response.data == b''
+    assert response.headers['Access-Control-Allow-Origin'] == ORIGIN
+    assert response.headers['Access-Control-Allow-Credentials'] == 'true'
+    assert 'POST' in response.headers['Access-Control-Allow-Methods']
+    assert 'Content-Type' in response.headers['Access-Control-Allow-Headers']
+    assert response.headers['Access-Control-Max-Age'] == str(cors.CORS_MAX_AGE)
+    assert 'Origin' in response.headers['Vary']
+
+def test_preflight_skips_routing_and_is_counted(client):
+    sample = 'cors_preflight_requests_total{outcome="allowed"}'
+    before = metric_value(client.get('/metrics').data.decode(), sample) or 0
+
+    # Every POST route and even unknown paths are answered without reaching a view
+    for path in ('/api/chat', '/api/career-details', '/api/predict/batch', '/no-such-route'):
+        response = preflight(client, path)
+        assert response.status_code == 204
+        assert 'X-Request-ID' not in response.headers
+
+    text = client.get('/metrics').data.decode()
+    assert metric_value(text, sample) == before + 4
+    assert 'cors_preflight_duration_seconds_count' in text
+    assert 'method="OPTIONS"' not in text
+
+def test_preflight_for_unsupported_method_is_refused(client):
+    response = preflight(client, '/api/predict', method='DELETE')
+    assert response.status_code == 204
+    assert 'Access-Control-Allow-Origin' not in response.headers
+
+def test_preflight_from_unlisted_origin_is_refused(client, monkeypatch):
+    monkeypatch.setattr(cors, 'CORS_ORIGINS', ['https://app.example.com'])
+    assert 'Access-Control-Allow-Origin' not in preflight(client, '/api/predict').headers
+    allowed = preflight(client, '/api/predict', origin='https://app.example.com')
+    assert allowed.headers['Access-Control-Allow-Origin'] == 'https://app.example.com'
+
+def test_plain_options_reaches_flask(client):
+    response = client.options('/api/predict')
+    assert response.status_code == 200
+    assert 'POST' in response.headers['Allow']
+
+def test_actual_response_carries_cors_headers(client):
+    response = client.post('/api/chat', json={'message': 'Hello', 'career': 'Nurse'}, headers={'Origin': ORIGIN})
+    assert response.status_code == 200
+    assert response.headers['Access-Control-Allow-Origin'] == ORIGIN
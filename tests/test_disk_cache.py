@@ -0,0 +1,94 @@
+import json
+import os
+from unittest.mock import MagicMock
+from lib.cache import MISSING
+from lib.disk_cache import SQLiteCache, canonical_key
+
+def test_canonical_key_ignores_key_order():
+    assert canonical_key('x', {"a": 1, "b": 2}) == canonical_key('x', {"b": 2, "a": 1})
+    assert canonical_key('x', {"a": 1}) != canonical_key('y', {"a": 1})
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path).set("k", {"steps": [1, 2, 3]})
+
+    assert SQLiteCache(path).get("k") == {"steps": [1, 2, 3]}
+    assert os.path.exists(path)
+
+def test_sqlite_cache_ttl_and_eviction(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('lib.disk_cache.time.time', lambda: clock[0])
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl=60, max_entries=2, prune_every=1)
+
+    cache.set("a", 1)
+    clock[0] += 1
+    cache.set("b", 2)
+    clock[0] += 1
+    assert cache.get("a") == 1  # "a" is now the most recently read
+    clock[0] += 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+    clock[0] += 120
+    assert cache.get("c") is MISSING
+
+def test_sqlite_cache_unwritable_directory_is_a_miss(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    # makedirs fails with an OSError because a file sits where the directory should be
+    cache = SQLiteCache(str(blocker / "sub" / "cache.sqlite3"))
+
+    cache.set("k", {"a": 1})
+    assert cache.get("k") is MISSING
+    assert cache.get_or_compute("k", lambda: {"a": 1}) == {"a": 1}
+    assert cache.clear() == 0
+    stats = cache.stats()
+    assert stats["size"] == 0 and stats["errors"] >= 4
+
+def test_roadmap_memoized_with_bucketed_grades(client, monkeypatch):
+    from routes import chatbot
+    generate = MagicMock(return_value={"success": True, "roadmap": ["Study"]})
+    monkeypatch.setattr(chatbot, 'generate_career_roadmap', generate)
+
+    assert chatbot.roadmap_cache_key("Doctor", {"math": 91}, 3.61) == \
+        chatbot.roadmap_cache_key(" doctor", {"Math": 93}, 3.70)
+
+    for career, grades, gpa in (("Doctor", {"math": 91}, 3.61), ("doctor", {"Math": 93}, 3.70)):
+        response = client.post('/api/career-roadmap',
+                              data=json.dumps({"career": career, "subject_grades": grades, "gpa": gpa}),
+                              content_type='application/json')
+        assert json.loads(response.data)["roadmap"] == ["Study"]
+    generate.assert_called_once_with("Doctor", {"math": 91}, 3.61)
+
+def test_roadmap_falls_back_to_template_and_is_not_cached(client, monkeypatch):
+    from routes import chatbot
+    generate = MagicMock(side_effect=[RuntimeError("generator down"), {"success": True, "roadmap": ["Study"]}])
+    monkeypatch.setattr(chatbot, 'generate_career_roadmap', generate)
+
+    response = client.post('/api/career-roadmap', data=json.dumps({"career": "Doctor"}),
+                          content_type='application/json')
+    assert json.loads(response.data)["data"]["education requirements"][0] == "Bachelor's degree in Doctor or related field"
+
+    response = client.post('/api/career-roadmap', data=json.dumps({"career": "Doctor"}),
+                          content_type='application/json')
+    assert json.loads(response.data)["roadmap"] == ["Study"]
+    assert generate.call_count == 2
+
+def test_university_summary_memoized(client, monkeypatch):
+    from routes import chatbot
+    summary = {key: key for key in ("overview", "academic_programs", "campus_life",
+                                    "achievements", "unique_features")}
+    generator = MagicMock()
+    generator.generate_summary.return_value = summary
+    monkeypatch.setattr(chatbot, 'university_summary_generator', generator)
+
+    for _ in range(2):
+        response = client.post('/api/university-summary',
+                              data=json.dumps({"university_name": "MIT"}),
+                              content_type='application/json')
+        assert json.loads(response.data)["summary"]["overview"] == "overview"
+
+    assert generator.generate_summary.call_count == 1
@@ -0,0 +1,36 @@
+from benchmarks.ai_stub import AIStub
+from benchmarks.load_test import compare, percentile
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {"routes": {"predict": {"p50_ms": 10, "p95_ms": 20, "rps": 100, "errors": 0, "requests": 200}},
+                "rss_mb": 100}
+    same = {"routes": {"predict": {"p50_ms": 11, "p95_ms": 22, "rps": 95, "errors": 0, "requests": 200}},
+            "rss_mb": 105}
+    slower = {"routes": {"predict": {"p50_ms": 10, "p95_ms": 40, "rps": 60, "errors": 0, "requests": 200}},
+              "rss_mb": 150}
+
+    assert compare(same, baseline, threshold=0.25, slack_ms=1) == []
+    failures = compare(slower, baseline, threshold=0.25, slack_ms=1)
+    assert len(failures) == 3
+    assert failures[0].startswith("predict: p95_ms")
+
+def test_ai_stub_injects_latency_and_errors():
+    import requests
+    stub = AIStub(latency_ms=30, jitter_ms=0, error_rate=0.0).start()
+    try:
+        response = requests.post(f"{stub.url}/predict", json={"math_score": 90}, timeout=5)
+        assert response.status_code == 200
+        assert "career" in response.json()
+        assert response.elapsed.total_seconds() >= 0.03
+
+        stub.error_rate = 1.0
+        assert requests.post(f"{stub.url}/predict", json={}, timeout=5).status_code == 503
+        assert (stub.calls, stub.errors) == (2, 1)
+    finally:
+        stub.stop()
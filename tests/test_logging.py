@@ -0,0 +1,97 @@
+import json
+import logging
+import queue
+import sys
+from lib import log
+
+def make_record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("routes.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_request_id_and_extra_fields():
+    record = make_record(request_id="abc123", career="Doctor")
+
+    entry = json.loads(log.JsonFormatter().format(record))
+
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "routes.test"
+    assert entry["request_id"] == "abc123"
+    assert entry["career"] == "Doctor"
+
+def test_redact_masks_sensitive_keys_recursively():
+    payload = {"math_score": 90, "email": "a@b.c", "profile": {"Password": "x", "gpa": 3.5}, "turns": [{"message": "hi"}]}
+
+    redacted = log.redact(payload)
+
+    assert redacted == {"math_score": 90, "email": "[redacted]", "profile": {"Password": "[redacted]", "gpa": 3.5},
+                        "turns": [{"message": "[redacted]"}]}
+    # The original payload is untouched
+    assert payload["email"] == "a@b.c"
+
+def test_log_payload_is_off_by_default(monkeypatch, caplog):
+    logger = logging.getLogger("routes.test")
+    caplog.set_level(logging.DEBUG, logger="routes.test")
+
+    log.log_payload(logger, "Prediction request", {"email": "a@b.c"})
+    assert not caplog.records
+
+    monkeypatch.setattr(log, 'LOG_PAYLOADS', True)
+    log.log_payload(logger, "Prediction request", {"email": "a@b.c", "math_score": 90})
+    assert caplog.records[0].payload == {"email": "[redacted]", "math_score": 90}
+
+def test_filter_samples_debug_records_only():
+    drop_all = log.RequestContextFilter(sample_rate=0.0)
+
+    assert drop_all.filter(make_record(logging.DEBUG)) is False
+    assert drop_all.filter(make_record(logging.INFO)) is True
+    assert log.RequestContextFilter(sample_rate=1.0).filter(make_record(logging.DEBUG)) is True
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = log.NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+    handler.handle(make_record())
+    handler.handle(make_record())
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+    # The queued record carries a resolved message so the writer thread needs no args
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "hello world" and queued.args is None
+
+def test_queue_handler_formats_tracebacks_before_queueing():
+    handler = log.NonBlockingQueueHandler(queue.Queue())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("routes.test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+
+    handler.handle(record)
+
+    queued = handler.queue.get_nowait()
+    assert queued.exc_info is None
+    assert "ValueError: boom" in queued.exc_text
+
+def test_parse_levels():
+    assert log.parse_levels("routes.chatbot=debug, lib.upstream=WARNING,") == {
+        "routes.chatbot": "DEBUG", "lib.upstream": "WARNING"}
+
+def test_request_id_is_generated_and_echoed(client):
+    response = client.get('/api/careers')
+    generated = response.headers.get('X-Request-ID')
+    assert generated and len(generated) == 32
+
+    response = client.get('/api/careers', headers={'X-Request-ID': 'frontend-42'})
+    assert response.headers['X-Request-ID'] == 'frontend-42'
+
+    # Header values that could inject into log lines are replaced
+    response = client.get('/api/careers', headers={'X-Request-ID': 'bad id\" {}'})
+    assert response.headers['X-Request-ID'] != 'bad id\" {}'
+
+def test_filter_stamps_request_id_inside_a_request(app):
+    with app.test_request_context('/api/predict', headers={'X-Request-ID': 'req-1'}):
+        app.preprocess_request()
+        record = make_record()
+        log.RequestContextFilter(sample_rate=1.0).filter(record)
+    assert record.request_id == 'req-1'
@@ -0,0 +1,69 @@
+import json
+import re
+from unittest.mock import patch, MagicMock
+from lib.metrics import MetricsRegistry
+
+def metric_value(text, sample):
+    match = re.search("^" + re.escape(sample) + r" (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("op_seconds", "Op latency.", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, "read")
+
+    text = registry.render()
+
+    assert '# TYPE op_seconds histogram' in text
+    assert 'op_seconds_bucket{op="read",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{op="read",le="1.0"} 2' in text
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 3' in text
+    assert 'op_seconds_count{op="read"} 3' in text
+
+def test_metrics_endpoint_records_routes(client):
+    before = client.get('/metrics').data.decode()
+    sample = 'http_requests_total{method="GET",route="/api/careers/<path:career>",status="200"}'
+    count_before = metric_value(before, sample) or 0
+
+    client.get('/api/careers/Doctor')
+    client.get('/api/careers/Teacher')
+    client.get('/no-such-route')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.data.decode()
+    # Routes are labelled by their rule, not the concrete URL
+    assert metric_value(text, sample) == count_before + 2
+    assert 'route="<unmatched>",status="404"' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/careers/<path:career>",le="+Inf"}' in text
+    assert metric_value(text, 'http_requests_in_flight') == 1
+    assert 'cache_hit_ratio{cache="prediction"}' in text
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_metrics_record_upstream_and_inference(mock_request, client, loaded_models, monkeypatch):
+    monkeypatch.setattr('routes.recommendations.INFERENCE_ROUTE', 'remote')
+    mock_request.return_value = MagicMock(status_code=200)
+    mock_request.return_value.json.return_value = {"career": "Doctor"}
+    client.post('/api/predict', data=json.dumps({"math_score": 91}), content_type='application/json')
+    client.post('/api/predict/batch', data=json.dumps([{"math_score": 91}]), content_type='application/json')
+
+    text = client.get('/metrics').data.decode()
+
+    assert 'upstream_request_duration_seconds_count{upstream="ai-predict",outcome="2xx"}' in text
+    assert 'inference_stage_duration_seconds_count{stage="predict"}' in text
+    assert 'inference_stage_duration_seconds_count{stage="scale"}' in text
+    assert 'predictions_served_total{path="remote"}' in text
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_metrics_count_random_fallbacks(mock_request, client):
+    mock_request.side_effect = Exception("down")
+    sample = 'prediction_fallbacks_total{reason="error"}'
+    before = metric_value(client.get('/metrics').data.decode(), sample) or 0
+
+    client.post('/api/predict', data=json.dumps({"math_score": 91}), content_type='application/json')
+
+    text = client.get('/metrics').data.decode()
+    assert metric_value(text, sample) == before + 1
+    assert 'upstream_circuit_open{upstream="ai-predict"}' in text
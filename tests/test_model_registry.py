@@ -0,0 +1,135 @@
+import json
+import os
+import time
+import threading
+import joblib
+from lib.model_registry import ModelRegistry
+
+def write_version(root, name, loaded_models, age=60):
+    """Dump the fixture artifacts into <root>/versions/<name>/ with mtimes ``age`` seconds old."""
+    model, scaler, label_encoder = loaded_models
+    path = root / "versions" / name
+    path.mkdir(parents=True)
+    stamp = time.time() - age
+    for filename, obj in (("career_xgb.pkl", model), ("scaler.pkl", scaler), ("label_encoder.pkl", label_encoder)):
+        joblib.dump(obj, path / filename)
+        os.utime(path / filename, (stamp, stamp))
+    return path
+
+def test_registry_loads_newest_version_and_hot_swaps(tmp_path, loaded_models):
+    write_version(tmp_path, "2024-01", loaded_models, age=120)
+    validated = []
+    registry = ModelRegistry([str(tmp_path)], validate=lambda bundle: validated.append(bundle.version))
+
+    registry.ensure_loaded()
+    old = registry.current()
+    assert old.version == "2024-01"
+
+    write_version(tmp_path, "2024-02", loaded_models, age=60)
+    assert registry.check_for_update() is True
+
+    # A request holding the old snapshot keeps using it
+    assert old.version == "2024-01"
+    assert registry.current().version == "2024-02"
+    assert validated == ["2024-01", "2024-02"]
+    assert registry.check_for_update() is False
+    assert [entry["version"] for entry in registry.stats()["history"]] == ["2024-01", "2024-02"]
+
+def test_registry_keeps_live_version_when_validation_fails(tmp_path, loaded_models):
+    write_version(tmp_path, "good", loaded_models, age=120)
+
+    def validate(bundle):
+        if bundle.version == "bad":
+            raise ValueError("warm-up failed")
+    registry = ModelRegistry([str(tmp_path)], validate=validate)
+    registry.ensure_loaded()
+
+    write_version(tmp_path, "bad", loaded_models, age=60)
+    assert registry.check_for_update() is False
+    assert registry.current().version == "good"
+    assert registry.stats()["failed_versions"] == {"bad": "warm-up failed"}
+
+def test_registry_skips_versions_still_being_written(tmp_path, loaded_models):
+    write_version(tmp_path, "v1", loaded_models, age=120)
+    registry = ModelRegistry([str(tmp_path)], settle_seconds=30)
+    registry.ensure_loaded()
+
+    write_version(tmp_path, "v2", loaded_models, age=0)
+    (tmp_path / "versions" / "partial").mkdir()
+    assert registry.check_for_update() is False
+    assert registry.current().version == "v1"
+    assert [name for name, _ in registry.available_versions()] == ["v1"]
+
+def test_concurrent_callers_wait_for_the_initial_load(tmp_path, loaded_models):
+    write_version(tmp_path, "v1", loaded_models)
+    started = threading.Event()
+
+    def validate(bundle):
+        started.set()
+        time.sleep(0.2)
+    registry = ModelRegistry([str(tmp_path)], validate=validate)
+
+    loader = threading.Thread(target=registry.ensure_loaded)
+    loader.start()
+    assert started.wait(5)
+    registry.ensure_loaded()
+
+    # The second caller returned only once the first caller's bundle was live
+    assert registry.current().version == "v1"
+    loader.join()
+
+def test_failed_initial_load_makes_the_worker_unready(client, tmp_path, monkeypatch):
+    from routes import recommendations
+    (tmp_path / "career_xgb.pkl").write_bytes(b"not a pickle")
+    registry = ModelRegistry([str(tmp_path)], poll_interval=0)
+    monkeypatch.setattr(recommendations, 'model_registry', registry)
+
+    response = client.get('/api/ready')
+
+    assert registry.load_failed() is True
+    assert response.status_code == 503
+    data = json.loads(response.data)
+    assert data["ready"] is False
+    assert data["models_loaded"] is False
+
+def test_concurrent_reloads_install_a_new_version_once(tmp_path, loaded_models):
+    write_version(tmp_path, "v1", loaded_models, age=120)
+    validated = []
+
+    def validate(bundle):
+        validated.append(bundle.version)
+        time.sleep(0.1)
+    registry = ModelRegistry([str(tmp_path)], validate=validate)
+    registry.ensure_loaded()
+
+    write_version(tmp_path, "v2", loaded_models, age=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.check_for_update())) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [False, True]
+    assert validated == ["v1", "v2"]
+    assert [entry["version"] for entry in registry.stats()["history"]] == ["v1", "v2"]
+
+def test_predictions_report_model_version(client, loaded_models):
+    response = client.post('/api/predict/batch',
+                          data=json.dumps([{"math_score": 90}]),
+                          content_type='application/json')
+    assert json.loads(response.data)["model_version"] == "test"
+
+def test_admin_reload_swaps_version(client, tmp_path, loaded_models, monkeypatch):
+    from routes import recommendations
+    monkeypatch.setattr('lib.admin.ADMIN_TOKEN', 'secret')
+    monkeypatch.setattr(recommendations.model_registry, 'model_dir', str(tmp_path))
+    monkeypatch.setattr(recommendations.model_registry, '_history', [])
+    write_version(tmp_path, "v2", loaded_models)
+
+    response = client.post('/api/admin/models/reload', headers={'X-Admin-Token': 'secret'})
+
+    assert json.loads(response.data) == {"swapped": True, "version": "v2"}
+    stats = json.loads(client.get('/api/admin/models', headers={'X-Admin-Token': 'secret'}).data)
+    assert stats["version"] == "v2"
+    assert stats["warmup_ms"] is not None
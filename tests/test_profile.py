@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+SCORES = {"math_score": 95, "history_score": 60, "physics_score": 80, "chemistry_score": 70,
+          "biology_score": 65, "english_score": 75, "geography_score": 60}
+
+def test_career_profile_runs_sections_concurrently(client, loaded_models, monkeypatch):
+    from routes import chatbot, recommendations
+    monkeypatch.setattr(recommendations, 'INFERENCE_BATCHING', True)
+    monkeypatch.setattr(recommendations, 'prediction_batcher', None)
+
+    def recommend(gpa, career):
+        time.sleep(0.2)
+        return ["University A"], ["Data Scientist", "Teacher"]
+
+    def analyze(career, academic_scores, predicted_career):
+        time.sleep(0.2)
+        return {"matching_score": {"Data Scientist": 80, "Teacher": 40}[career],
+                "explanation": "fit", "key_skills": ["x"]}
+
+    monkeypatch.setattr(chatbot.career_chatbot, 'recommend', recommend)
+    monkeypatch.setattr(chatbot.alternative_careers_analyzer, 'analyze_career_match', analyze)
+
+    response = client.post('/api/career-profile',
+                          data=json.dumps({"scores": SCORES, "gpa": 3.7}),
+                          content_type='application/json')
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["career"] == "Software Engineer"
+    assert data["prediction"]["model_version"] == "test"
+    assert data["details"]["description"].startswith("Designs, develops")
+    assert data["roadmap"]["education requirements"]
+    assert data["similar"]["similar_careers"] == ["Data Scientist", "Teacher"]
+    assert [c["career"] for c in data["analysis"]["analyzed_careers"]] == ["Data Scientist", "Teacher"]
+    assert data["errors"] == {} and data["partial"] is False
+    assert set(data["timings_ms"]) == {"prediction", "details", "roadmap", "similar", "analysis", "total"}
+    # Similar careers are shared with the analysis, not fetched twice or serially
+    assert data["timings_ms"]["total"] < 1000
+
+def test_career_profile_section_timeout_is_partial(client, monkeypatch):
+    from routes import chatbot, profile
+    release = threading.Event()
+    monkeypatch.setitem(profile.PROFILE_SECTION_TIMEOUTS, "similar", 0.1)
+    monkeypatch.setitem(profile.PROFILE_SECTION_TIMEOUTS, "analysis", 0.1)
+    monkeypatch.setattr(chatbot.career_chatbot, 'recommend', lambda gpa, career: release.wait(5))
+
+    with patch('routes.recommendations.ai_service.session.request') as mock_request:
+        mock_request.return_value = MagicMock(status_code=200)
+        mock_request.return_value.json.return_value = {"career": "Doctor"}
+        response = client.post('/api/career-profile',
+                              data=json.dumps({"scores": SCORES, "gpa": 3.9, "careers": []}),
+                              content_type='application/json')
+    release.set()
+
+    data = json.loads(response.data)
+    assert response.status_code == 200
+    assert data["details"]["salary_range"] == "$150,000 - $300,000+"
+    assert data["similar"] is None
+    assert data["errors"] == {"similar": "Timed out", "analysis": "Timed out"}
+    assert data["partial"] is True
+
+def test_career_profile_reports_why_sections_were_skipped(client):
+    with patch('routes.recommendations.ai_service.session.request') as mock_request:
+        mock_request.return_value = MagicMock(status_code=200)
+        mock_request.return_value.json.return_value = {"career": "Doctor"}
+        response = client.post('/api/career-profile',
+                              data=json.dumps({"scores": SCORES}),
+                              content_type='application/json')
+
+    data = json.loads(response.data)
+    assert response.status_code == 200
+    assert data["details"] is not None and data["roadmap"] is not None
+    assert data["errors"] == {"similar": "Missing gpa", "analysis": "Missing gpa or careers"}
+
+def test_career_profile_sections_match_standalone_endpoints(client, monkeypatch):
+    from routes import chatbot
+    monkeypatch.setattr(chatbot, 'generate_career_roadmap',
+                        MagicMock(return_value={"success": True, "data": {"steps": ["Study", "Fly"]}}))
+    details = MagicMock(status_code=200)
+    details.json.return_value = {"success": True, "description": "Explores space"}
+
+    with patch('routes.recommendations.ai_service.session.request') as mock_predict, \
+            patch('routes.chatbot.career_details_service.session.request', return_value=details) as mock_details:
+        mock_predict.return_value = MagicMock(status_code=200)
+        mock_predict.return_value.json.return_value = {"career": "Doctor"}
+        profile = json.loads(client.post('/api/career-profile',
+                                         data=json.dumps({"scores": SCORES, "career": "Astronaut", "gpa": 3.6}),
+                                         content_type='application/json').data)
+        standalone_details = json.loads(client.post('/api/career-details', data=json.dumps({"career": "Astronaut"}),
+                                                    content_type='application/json').data)
+        standalone_roadmap = json.loads(client.post('/api/career-roadmap',
+                                                    data=json.dumps({"career": "Astronaut", "gpa": 3.6}),
+                                                    content_type='application/json').data)
+
+    assert profile["career"] == "Astronaut"
+    assert profile["details"] == standalone_details == {"success": True, "description": "Explores space"}
+    assert profile["roadmap"] == standalone_roadmap["data"] == {"steps": ["Study", "Fly"]}
+    # Both came from the caches the profile filled
+    assert mock_details.call_count == 1
+    chatbot.generate_career_roadmap.assert_called_once_with("Astronaut", {}, 3.6)
+
+def test_career_profile_requires_scores(client):
+    response = client.post('/api/career-profile',
+                          data=json.dumps({"gpa": 3.5}),
+                          content_type='application/json')
+    assert response.status_code == 400
@@ -0,0 +1,77 @@
+import threading
+import time
+from lib import profiling
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_sampler_collects_folded_stacks():
+    sampler = profiling.StackSampler(threading.get_ident(), interval=0.001).start()
+    busy_wait(0.05)
+    sampler.stop()
+
+    assert sampler.samples > 0
+    folded = sampler.folded()
+    line = folded.splitlines()[0]
+    stack, count = line.rsplit(" ", 1)
+    assert int(count) > 0
+    # Outermost frame first, innermost last, module-qualified
+    assert "test_profiling:busy_wait" in folded
+    assert stack.index("test_profiling:test_sampler_collects_folded_stacks") < stack.index("test_profiling:busy_wait")
+
+def test_requests_are_not_profiled_by_default(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr('lib.admin.ADMIN_TOKEN', 'secret')
+
+    # The header alone is not enough without the admin token
+    response = client.get('/api/careers', headers={'X-Profile': '1'})
+
+    assert 'X-Profile-Id' not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+def test_admin_header_profiles_request_and_lists_it(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr('lib.admin.ADMIN_TOKEN', 'secret')
+    admin = {'X-Admin-Token': 'secret'}
+
+    response = client.get('/api/careers', headers=dict(admin, **{'X-Profile': '1', 'X-Request-ID': 'req-7'}))
+
+    name = response.headers['X-Profile-Id']
+    assert 'req-7' in name
+    assert (tmp_path / (name + '.folded')).exists()
+
+    listing = client.get('/api/admin/profiles', headers=admin).get_json()
+    assert listing['profiles'][0]['name'] == name
+    assert listing['profiles'][0]['route'] == '/api/careers'
+    assert listing['profiles'][0]['reason'] == 'header'
+    assert listing['profiles'][0]['status'] == 200
+
+    folded = client.get(f'/api/admin/profiles/{name}', headers=admin)
+    assert folded.status_code == 200
+    assert folded.mimetype == 'text/plain'
+
+def test_sample_rate_profiles_without_header(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(profiling, 'PROFILE_SAMPLE_RATE', 1.0)
+
+    response = client.get('/api/careers')
+
+    assert 'X-Profile-Id' in response.headers
+    assert profiling.list_profiles(str(tmp_path))[0]['reason'] == 'sampled'
+
+def test_profiles_endpoint_requires_admin(client, monkeypatch):
+    monkeypatch.setattr('lib.admin.ADMIN_TOKEN', 'secret')
+
+    assert client.get('/api/admin/profiles').status_code == 401
+
+def test_old_profiles_are_pruned(tmp_path):
+    for index in range(5):
+        (tmp_path / f"2024010{index}-x.json").write_text("{}")
+        (tmp_path / f"2024010{index}-x.folded").write_text("")
+
+    profiling.prune_profiles(str(tmp_path), keep=2)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "20240103-x.folded", "20240103-x.json", "20240104-x.folded", "20240104-x.json"]
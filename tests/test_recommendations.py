@@ -1,9 +1,10 @@
 import pytest
 import json
+import requests
 from unittest.mock import patch, MagicMock
 from app import app
 
-@patch('routes.recommendations.requests.post')
+@patch('routes.recommendations.ai_service.session.request')
 def test_get_prediction(mock_post, client):
     # Mock the AI service response
     mock_response = MagicMock()
@@ -32,8 +33,9 @@ def test_get_prediction(mock_post, client):
     args, kwargs = mock_post.call_args
     assert kwargs['json'] == test_data
 
-@patch('routes.recommendations.requests.post')
+@patch('routes.recommendations.ai_service.session.request')
 def test_get_prediction_ai_service_error(mock_post, client):
+    from routes import recommendations
     # Mock the AI service failing
     mock_post.side_effect = Exception("AI service unavailable")
     
@@ -48,10 +50,246 @@ def test_get_prediction_ai_service_error(mock_post, client):
                           data=json.dumps(test_data),
                           content_type='application/json')
     
-    # Check response - should return error 500
-    assert response.status_code == 500
+    # No local model and no AI service: the random fallback answers, flagged as such
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["served_by"] == "fallback"
+    assert data["career"] in recommendations.DEFAULT_CAREERS
+
+def test_batch_prediction(client, loaded_models):
+    records = [
+        {"math_score": 95, "history_score": 60, "physics_score": 80, "chemistry_score": 70,
+         "biology_score": 65, "english_score": 75, "geography_score": 60},
+        {"math_score": "not a number"},
+        {"math_score": 45, "history_score": 90, "physics_score": 50, "chemistry_score": 55,
+         "biology_score": 70, "english_score": 95, "geography_score": 85},
+    ]
+
+    response = client.post('/api/predict/batch',
+                          data=json.dumps({"records": records}),
+                          content_type='application/json')
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["count"] == 3
+    assert data["failed"] == 1
+    predictions = data["predictions"]
+    assert [p["index"] for p in predictions] == [0, 1, 2]
+    assert predictions[0]["career"] == "Software Engineer"
+    assert "error" in predictions[1]
+    assert predictions[2]["career"] == "Teacher"
+
+def test_batch_prediction_rejects_non_finite_scores(client, loaded_models):
+    valid = {"math_score": 95, "history_score": 60}
+    records = [valid, {"math_score": "nan"}, {"physics_score": "inf"}, {"english_score": "-Infinity"}, valid]
+
+    response = client.post('/api/predict/batch',
+                          data=json.dumps({"records": records}),
+                          content_type='application/json')
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["failed"] == 3
+    predictions = data["predictions"]
+    assert [("error" in p) for p in predictions] == [False, True, True, True, False]
+    assert predictions[0]["career"] == predictions[4]["career"] == "Software Engineer"
+
+def test_batch_prediction_models_not_loaded(client, monkeypatch):
+    from routes import recommendations
+    monkeypatch.setattr(recommendations.model_registry, '_current', None)
+
+    response = client.post('/api/predict/batch',
+                          data=json.dumps([{"math_score": 90}]),
+                          content_type='application/json')
+
+    assert response.status_code == 503
+
+def test_batch_prediction_empty(client):
+    response = client.post('/api/predict/batch',
+                          data=json.dumps({"records": []}),
+                          content_type='application/json')
+    assert response.status_code == 400
+
+def test_career_details_known_and_generic(client, monkeypatch):
+    from routes import chatbot
+    # Careers outside the catalog go to the AI service; when it is down they get the generic details
+    monkeypatch.setattr(chatbot.career_details_service.session, 'request',
+                        MagicMock(side_effect=requests.exceptions.ConnectionError("down")))
+
+    response = client.post('/api/career-details',
+                          data=json.dumps({"career": "Doctor"}),
+                          content_type='application/json')
+    assert response.status_code == 200
+    assert json.loads(response.data)["salary_range"] == "$150,000 - $300,000+"
+
+    response = client.post('/api/career-details',
+                          data=json.dumps({"career": "Pilot"}),
+                          content_type='application/json')
+    assert json.loads(response.data)["description"] == "Professional in the field of Pilot."
+
+def test_career_get_honors_etag(client):
+    response = client.get('/api/careers/Data Scientist')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'].startswith('public')
+    etag = response.headers['ETag']
+    assert json.loads(response.data)["difficulty"] == 8
+
+    response = client.get('/api/careers/Data Scientist', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    response = client.get('/api/careers')
+    assert "Teacher" in json.loads(response.data)["careers"]
+
+def test_career_roadmap_template(client, monkeypatch):
+    from routes import chatbot
+    # The template roadmap is served when generation fails
+    monkeypatch.setattr(chatbot, 'generate_career_roadmap', MagicMock(side_effect=RuntimeError("down")))
+    response = client.post('/api/career-roadmap',
+                          data=json.dumps({"career": 'Chef "de cuisine"'}),
+                          content_type='application/json')
+    data = json.loads(response.data)
+    assert data["success"] is True
+    assert data["data"]["education requirements"][0] == 'Bachelor\'s degree in Chef "de cuisine" or related field'
+
+def test_readiness_warms_up_loaded_models(client, loaded_models):
+    response = client.get('/api/ready')
+
+    assert response.status_code == 200
     data = json.loads(response.data)
-    assert "error" in data
+    assert data["ready"] is True
+    assert data["models_loaded"] is True
+    assert data["warmup_ms"] is not None
+    assert data["pid"] > 0
+
+def test_readiness_fails_when_warmup_fails(client, loaded_models, monkeypatch):
+    from routes import recommendations
+    broken = MagicMock()
+    broken.predict.side_effect = RuntimeError("corrupt model")
+    monkeypatch.setattr(recommendations.model_registry.current(), 'model', broken)
+
+    response = client.get('/api/ready')
+
+    assert response.status_code == 503
+    assert json.loads(response.data)["ready"] is False
+
+def test_prediction_top_k(client, loaded_models):
+    scores = {"math_score": 95, "history_score": 60, "physics_score": 80, "chemistry_score": 70,
+              "biology_score": 65, "english_score": 75, "geography_score": 60}
+
+    response = client.post('/api/predict?top_k=5',
+                          data=json.dumps(scores),
+                          content_type='application/json')
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["career"] == "Software Engineer"
+    assert data["model_version"] == "test"
+    # k is capped at the number of classes and results are ranked
+    assert [p["career"] for p in data["predictions"]] == ["Software Engineer", "Teacher"]
+    assert data["confidence"] == data["predictions"][0]["confidence"]
+    assert data["predictions"][0]["confidence"] >= data["predictions"][1]["confidence"]
+
+def test_batch_prediction_top_k_matches_predict(client, loaded_models):
+    import numpy as np
+    import pandas as pd
+    from routes import recommendations
+    model, scaler, label_encoder = loaded_models
+    rows = np.random.RandomState(1).uniform(40, 100, size=(50, len(recommendations.expected_features)))
+    records = [dict(zip(recommendations.expected_features, row)) for row in rows.tolist()]
+
+    response = client.post('/api/predict/batch?top_k=1',
+                          data=json.dumps({"records": records}),
+                          content_type='application/json')
+
+    predictions = json.loads(response.data)["predictions"]
+    features = pd.DataFrame(rows, columns=recommendations.expected_features)
+    expected = label_encoder.inverse_transform(model.predict(scaler.transform(features)))
+    assert [p["career"] for p in predictions] == list(expected)
+    assert all(len(p["predictions"]) == 1 for p in predictions)
+
+def test_prediction_top_k_rejects_invalid_k(client, loaded_models):
+    response = client.post('/api/predict/batch?top_k=0',
+                          data=json.dumps([{"math_score": 90}]),
+                          content_type='application/json')
+    assert response.status_code == 400
+
+def test_load_artifacts_with_mmap(tmp_path, loaded_models):
+    import joblib
+    from lib.models import load_artifacts
+    model, scaler, label_encoder = loaded_models
+    joblib.dump(model, tmp_path / "career_xgb.pkl")
+    joblib.dump(scaler, tmp_path / "scaler.pkl")
+    joblib.dump(label_encoder, tmp_path / "label_encoder.pkl")
+
+    loaded = load_artifacts(str(tmp_path), mmap_mode='r')
+
+    assert list(loaded[2].classes_) == list(label_encoder.classes_)
+    assert len(loaded[3]) == 12
+    assert set(loaded[4]) == {"career_xgb.pkl", "scaler.pkl", "label_encoder.pkl"}
 
 if __name__ == '__main__':
     pytest.main()
+
+SCORES = {"math_score": 95, "history_score": 60, "physics_score": 80, "chemistry_score": 70,
+          "biology_score": 65, "english_score": 75, "geography_score": 60}
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_prediction_is_local_first(mock_request, client, loaded_models):
+    response = client.post('/api/predict', data=json.dumps(SCORES), content_type='application/json')
+
+    data = json.loads(response.data)
+    assert data == {"career": "Software Engineer", "model_version": "test", "served_by": "local"}
+    mock_request.assert_not_called()
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_prediction_falls_back_to_remote_when_local_fails(mock_request, client, loaded_models, monkeypatch):
+    from routes import recommendations
+    def broken(rows, bundle=None):
+        raise RuntimeError("model exploded")
+    monkeypatch.setattr(recommendations, 'predict_matrix', broken)
+    mock_request.return_value = MagicMock(status_code=200)
+    mock_request.return_value.json.return_value = {"career": "Doctor"}
+
+    response = client.post('/api/predict', data=json.dumps(SCORES), content_type='application/json')
+
+    data = json.loads(response.data)
+    assert data == {"career": "Doctor", "model_version": "remote", "served_by": "remote"}
+    # A fallback answer is not cached, so the next request tries the local model again
+    assert recommendations.prediction_cache.stats()["size"] == 0
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_remote_first_skips_open_circuit(mock_request, client, loaded_models, monkeypatch):
+    from routes import recommendations
+    from lib.upstream import CircuitBreaker
+    monkeypatch.setattr(recommendations, 'INFERENCE_ROUTE', 'remote-first')
+    monkeypatch.setattr(recommendations.ai_service, 'breaker', CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    monkeypatch.setattr(recommendations.ai_service, 'max_retries', 0)
+    mock_request.return_value = MagicMock(status_code=503)
+
+    first = json.loads(client.post('/api/predict', data=json.dumps(SCORES), content_type='application/json').data)
+    second = json.loads(client.post('/api/predict', data=json.dumps(dict(SCORES, math_score=40)),
+                                    content_type='application/json').data)
+
+    assert first["served_by"] == "local" and second["served_by"] == "local"
+    # The first failure opened the breaker, so the second request never reached the AI service
+    assert mock_request.call_count == 1
+    assert recommendations.ai_service.breaker.state == CircuitBreaker.OPEN
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_prediction_without_any_path_is_503_when_fallback_disabled(mock_request, client, monkeypatch):
+    from routes import recommendations
+    monkeypatch.setattr(recommendations, 'PREDICTION_RANDOM_FALLBACK', False)
+    mock_request.side_effect = Exception("down")
+
+    response = client.post('/api/predict', data=json.dumps(SCORES), content_type='application/json')
+
+    assert response.status_code == 503
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_remote_client_errors_are_returned(mock_request, client):
+    mock_request.return_value = MagicMock(status_code=422)
+
+    response = client.post('/api/predict', data=json.dumps(SCORES), content_type='application/json')
+
+    assert response.status_code == 422
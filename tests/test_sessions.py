@@ -0,0 +1,70 @@
+import json
+from unittest.mock import MagicMock
+from lib.sessions import ChatSessionStore
+
+def test_session_window_and_lru_cap():
+    store = ChatSessionStore(max_sessions=2, window=2)
+    for i in range(3):
+        store.append("a", f"m{i}", f"r{i}")
+    store.append("b", "hello", "hi")
+    store.append("c", "hey", "yo")
+
+    assert store.history("a") == []
+    assert [turn["message"] for turn in store.history("c")] == ["hey"]
+    stats = store.stats()
+    assert stats["sessions"] == 2
+    assert stats["evicted_lru"] == 1
+
+def test_idle_sessions_are_swept(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr('lib.sessions.time.monotonic', lambda: clock[0])
+    store = ChatSessionStore(idle_timeout=60, sweep_every=1)
+    store.append("old", "m", "r")
+    clock[0] = 120.0
+    store.append("new", "m", "r")
+
+    assert store.stats()["sessions"] == 1
+    assert store.stats()["evicted_idle"] == 1
+
+def test_sessions_persist_and_restore():
+    backend = MagicMock()
+    backend.load_turns.return_value = [{"message": "earlier", "response": "reply"}]
+    store = ChatSessionStore(window=5, backend=backend)
+
+    assert store.history("s1") == [{"message": "earlier", "response": "reply"}]
+    store.append("s1", "next", "answer")
+
+    backend.save_turns.assert_called_once_with([{"session_id": "s1", "message": "next", "response": "answer"}])
+    assert len(store.history("s1")) == 2
+    assert backend.load_turns.call_count == 1
+
+def test_chat_assigns_session_and_records_history(client, monkeypatch):
+    monkeypatch.setattr('lib.admin.ADMIN_TOKEN', 'secret')
+    response = client.post('/api/chat',
+                          data=json.dumps({"message": "Hello"}),
+                          content_type='application/json')
+    data = json.loads(response.data)
+    session_id = data["session_id"]
+    assert session_id and session_id != "default"
+
+    # Transcripts need the admin token
+    assert client.get(f'/api/chat/history/{session_id}').status_code == 401
+
+    response = client.get(f'/api/chat/history/{session_id}', headers={'X-Admin-Token': 'secret'})
+    history = json.loads(response.data)["history"]
+    assert history == [{"message": "Hello", "response": data["response"]}]
+
+def test_chat_passes_the_session_window_to_handlers_that_take_it(client, monkeypatch):
+    from routes import chatbot
+    seen = []
+
+    def handle_chat(message, career, gpa, subject_grades, session_id, history=None):
+        seen.append(list(history))
+        return f"re: {message}"
+    monkeypatch.setattr(chatbot, 'handle_chat', handle_chat)
+
+    for message in ("first", "second"):
+        client.post('/api/chat', data=json.dumps({"message": message, "session_id": "windowed"}),
+                    content_type='application/json')
+
+    assert seen == [[], [{"message": "first", "response": "re: first"}]]
@@ -0,0 +1,62 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import RandomForestClassifier
+from lib.tree_engine import TreeEnsemble
+
+def training_data(n_classes=4, seed=0):
+    rng = np.random.RandomState(seed)
+    X = rng.uniform(40, 100, size=(500, 7))
+    y = (X[:, 0] > 70).astype(int) * (n_classes // 2) + (X[:, 3] > 60).astype(int)
+    return X, y, StandardScaler().fit(X)
+
+@pytest.mark.parametrize("model", [
+    DecisionTreeClassifier(random_state=0),
+    RandomForestClassifier(n_estimators=25, max_depth=6, random_state=0),
+])
+def test_native_engine_matches_sklearn(model):
+    X, y, scaler = training_data()
+    model.fit(scaler.transform(X), y)
+
+    engine = TreeEnsemble.from_model(model, scaler)
+
+    np.testing.assert_array_equal(engine.predict(X), model.predict(scaler.transform(X)))
+    np.testing.assert_allclose(engine.predict_proba(X), model.predict_proba(scaler.transform(X)), atol=1e-12)
+    assert engine.stats()["trees"] == getattr(model, "n_estimators", 1)
+
+def test_native_engine_matches_xgboost():
+    xgboost = pytest.importorskip("xgboost")
+    X, y, scaler = training_data()
+    model = xgboost.XGBClassifier(n_estimators=30, max_depth=4, random_state=0)
+    model.fit(scaler.transform(X), y)
+
+    engine = TreeEnsemble.from_model(model, scaler)
+
+    np.testing.assert_array_equal(engine.predict(X), model.predict(scaler.transform(X)))
+    np.testing.assert_allclose(engine.predict_proba(X), model.predict_proba(scaler.transform(X)), atol=1e-5)
+
+def test_native_engine_rejects_unsupported_models():
+    X, y, scaler = training_data()
+    with pytest.raises(ValueError):
+        TreeEnsemble.from_model(object(), scaler)
+
+def test_predictions_use_native_engine_when_configured(client, loaded_models, monkeypatch):
+    from routes import recommendations
+    monkeypatch.setattr(recommendations, 'INFERENCE_ENGINE', 'native')
+    bundle = recommendations.model_registry.current()
+    recommendations.validate_bundle(bundle)
+    assert bundle.engine is not None
+
+    model, scaler, label_encoder = loaded_models
+    rows = np.random.RandomState(3).uniform(40, 100, size=(20, len(recommendations.expected_features)))
+    response = client.post('/api/predict/batch',
+                          data=json.dumps([dict(zip(recommendations.expected_features, row)) for row in rows.tolist()]),
+                          content_type='application/json')
+
+    expected = label_encoder.inverse_transform(
+        model.predict(scaler.transform(pd.DataFrame(rows, columns=recommendations.expected_features))))
+    assert [p["career"] for p in json.loads(response.data)["predictions"]] == list(expected)
+    assert json.loads(client.get('/api/ready').data)["inference_engine"] == "native"
@@ -0,0 +1,133 @@
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from lib.upstream import UpstreamClient, RetryBudget, CircuitBreaker, CircuitOpenError
+
+def make_response(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return response
+
+@patch('lib.upstream.time.sleep')
+def test_retries_transient_status_then_succeeds(mock_sleep):
+    client = UpstreamClient('test', max_retries=2)
+    client.session.request = MagicMock(side_effect=[make_response(503), make_response(200)])
+
+    response = client.post('http://upstream/predict', json={"a": 1})
+
+    assert response.status_code == 200
+    assert client.session.request.call_count == 2
+    _, kwargs = client.session.request.call_args
+    assert kwargs['timeout'] == (client.connect_timeout, client.read_timeout)
+    stats = client.stats()
+    assert stats["requests"] == 1
+    assert stats["retries"] == 1
+    assert stats["errors"] == 0
+
+@patch('lib.upstream.time.sleep')
+def test_connection_errors_raise_after_max_retries(mock_sleep):
+    client = UpstreamClient('test', max_retries=1)
+    client.session.request = MagicMock(side_effect=requests.exceptions.ConnectionError("refused"))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.post('http://upstream/predict', json={})
+
+    assert client.session.request.call_count == 2
+    assert client.stats()["errors"] == 1
+
+@patch('lib.upstream.time.sleep')
+def test_post_is_not_retried_after_read_timeout(mock_sleep):
+    client = UpstreamClient('test', max_retries=2)
+    client.session.request = MagicMock(side_effect=requests.exceptions.ReadTimeout("slow"))
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.post('http://upstream/predict', json={})
+
+    assert client.session.request.call_count == 1
+    assert client.stats()["retries"] == 0
+
+@patch('lib.upstream.time.sleep')
+def test_post_is_retried_after_connect_timeout(mock_sleep):
+    client = UpstreamClient('test', max_retries=2)
+    client.session.request = MagicMock(side_effect=[requests.exceptions.ConnectTimeout("slow"), make_response(200)])
+
+    response = client.post('http://upstream/predict', json={})
+
+    assert response.status_code == 200
+    assert client.session.request.call_count == 2
+
+@patch('lib.upstream.time.sleep')
+def test_idempotent_requests_are_retried_after_read_timeout(mock_sleep):
+    client = UpstreamClient('test', max_retries=2)
+    client.session.request = MagicMock(side_effect=[requests.exceptions.ReadTimeout("slow"), make_response(200)])
+
+    assert client.get('http://upstream/health').status_code == 200
+    assert client.session.request.call_count == 2
+
+    client.session.request = MagicMock(side_effect=[requests.exceptions.ReadTimeout("slow"), make_response(200)])
+    assert client.post('http://upstream/predict', json={}, idempotent=True).status_code == 200
+    assert client.session.request.call_count == 2
+
+@patch('lib.upstream.time.sleep')
+def test_post_is_not_retried_after_gateway_timeout(mock_sleep):
+    client = UpstreamClient('test', max_retries=2)
+    client.session.request = MagicMock(return_value=make_response(504))
+
+    assert client.post('http://upstream/predict', json={}).status_code == 504
+    assert client.session.request.call_count == 1
+
+@patch('lib.upstream.time.sleep')
+def test_retry_budget_limits_retries(mock_sleep):
+    client = UpstreamClient('test', max_retries=5, retry_budget=RetryBudget(ratio=0.0, min_tokens=1.0))
+    client.session.request = MagicMock(return_value=make_response(502))
+
+    response = client.post('http://upstream/predict', json={})
+
+    assert response.status_code == 502
+    assert client.session.request.call_count == 2
+    assert client.stats()["retries_denied"] == 1
+
+def test_circuit_breaker_opens_and_rejects_calls():
+    client = UpstreamClient('test', max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    client.session.request = MagicMock(return_value=make_response(500))
+
+    client.post('http://upstream/predict', json={})
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    client.post('http://upstream/predict', json={})
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        client.post('http://upstream/predict', json={})
+    assert client.session.request.call_count == 2
+    assert client.stats()["breaker"]["rejected"] == 1
+
+@patch('lib.upstream.time.monotonic')
+def test_circuit_breaker_half_open_probe(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    mock_monotonic.return_value = 131.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # One probe at a time while half-open
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # A failed probe opens the circuit for another reset period
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    mock_monotonic.return_value = 162.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["opened"] == 2
+
+def test_client_errors_do_not_trip_the_breaker():
+    client = UpstreamClient('test', breaker=CircuitBreaker(failure_threshold=1))
+    client.session.request = MagicMock(return_value=make_response(422))
+
+    client.post('http://upstream/predict', json={})
+
+    assert client.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,89 @@
+import json
+import sqlite3
+import threading
+from unittest.mock import patch, MagicMock
+from lib.write_behind import WriteBehindQueue, SQLiteSink
+
+def test_rows_are_flushed_in_bulk_per_table(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    calls = []
+    sink = SQLiteSink(path)
+
+    def recording_sink(table, rows):
+        calls.append((table, len(rows)))
+        sink(table, rows)
+
+    writer = WriteBehindQueue(recording_sink, batch_size=50, flush_interval=0.05)
+    for i in range(10):
+        writer.enqueue('chat_history', {"session_id": "s", "message": f"m{i}", "response": "r"})
+    writer.enqueue('career_recommendations', {"recommended_career": "Doctor", "confidence_score": 0.9})
+    writer.close()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT COUNT(*) FROM chat_history').fetchone()[0] == 10
+    assert conn.execute('SELECT recommended_career FROM career_recommendations').fetchone()[0] == "Doctor"
+    assert len(calls) <= 4
+    assert writer.stats()["written"] == 11
+
+def test_backpressure_drops_when_queue_is_full():
+    release = threading.Event()
+    writer = WriteBehindQueue(lambda table, rows: release.wait(5), batch_size=1,
+                              flush_interval=0.01, max_queue=2, enqueue_timeout=0.01)
+    results = [writer.enqueue('t', {"i": i}) for i in range(10)]
+    release.set()
+    writer.close()
+
+    assert results.count(False) == writer.stats()["dropped"]
+    assert writer.stats()["dropped"] > 0
+
+def test_sink_errors_do_not_stop_the_writer():
+    sink = MagicMock(side_effect=[RuntimeError("db down"), None])
+    writer = WriteBehindQueue(sink, batch_size=1, flush_interval=0.01)
+    writer.enqueue('t', {"i": 1})
+    writer.enqueue('t', {"i": 2})
+    writer.close()
+
+    stats = writer.stats()
+    assert stats["errors"] == 1
+    assert stats["written"] == 1
+
+def test_failed_bulk_insert_loses_only_the_bad_row():
+    def sink(table, rows):
+        if any(row.get("user_id") == "bad" for row in rows):
+            raise RuntimeError("foreign key violation")
+        written.extend(rows)
+
+    written = []
+    writer = WriteBehindQueue(sink, batch_size=10, flush_interval=0.05)
+    for user_id in ("a", "bad", "c"):
+        writer.enqueue('t', {"user_id": user_id})
+    writer.close()
+
+    assert [row["user_id"] for row in written] == ["a", "c"]
+    stats = writer.stats()
+    assert stats["written"] == 2
+    assert stats["failed"] == 1
+
+@patch('routes.recommendations.ai_service.session.request')
+def test_prediction_is_persisted(mock_request, client, tmp_path, monkeypatch):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"career": "Architect"}
+    mock_request.return_value = mock_response
+
+    path = str(tmp_path / "db.sqlite3")
+    writer = WriteBehindQueue(SQLiteSink(path), flush_interval=0.05)
+    monkeypatch.setattr('lib.write_behind._writer', writer)
+
+    # The second, identical request is answered from the prediction cache and still persisted
+    for _ in range(2):
+        client.post('/api/predict', data=json.dumps({"math_score": 70, "user_id": "someone-else"}),
+                    content_type='application/json')
+    writer.close()
+
+    rows = sqlite3.connect(path).execute('SELECT recommended_career FROM career_recommendations').fetchall()
+    assert rows == [("Architect",), ("Architect",)]
+    # Callers are not authenticated, so a user_id from the body is never stored
+    columns = [row[1] for row in sqlite3.connect(path).execute('PRAGMA table_info(career_recommendations)')]
+    assert "user_id" not in columns
+    assert mock_request.call_count == 1